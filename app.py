@@ -26,7 +26,17 @@ from flask_mail import Mail, Message
 from moduller.tracker import save_raw_program_log, logs_file, collect_program_usage, get_program_history_and_save, upload_program_data_to_s3
 # from moduller.tracker import auto_log_every_minute, start_logging, stop_logging, upload_logs_on_app_close  # Disabled old tracker
 from moduller.active_window_tracker import start_active_window_tracking, stop_active_window_tracking, upload_current_activity_to_s3
-from moduller.s3_uploader import upload_screenshot
+from moduller.s3_uploader import upload_screenshot, warm_up_s3_client, get_s3_latency_stats
+from moduller.screenshot_upload_queue import get_screenshot_upload_queue, get_screenshot_upload_metrics
+from moduller.screenshot_scheduler import MonotonicTickScheduler, tick_metadata
+from moduller.screenshot_dedup import ScreenshotDeduplicator, compute_perceptual_hash
+from moduller.screenshot_encoder import ProfiledFrameEncoder, process_screenshot, screenshot_to_image
+from moduller.screenshot_encoder_process import ScreenshotEncoderProcess
+from moduller.screenshot_delta import TileDeltaEncoder
+from moduller.screenshot_timelapse import TimelapseSegmentWriter, TimelapseWriterError
+from moduller.upload_spool import get_upload_spool, get_upload_spool_status
+from moduller.process_sampler import get_process_sampler
+from moduller.session_checkpoint import start_checkpoint_recovery
 
 from flask import Flask, render_template, request, jsonify, send_from_directory
 import requests 
@@ -52,6 +62,7 @@ except ImportError:
     
 import mss
 import threading
+import multiprocessing
 import time
 import pymysql  # Add pymysql import at top level
 import signal   # Add signal import at top level
@@ -100,6 +111,10 @@ LOG_FILE = "session_logs.json"
 recording_active = False
 recording_thread = None
 current_recording_folder = None
+screenshot_scheduler = None
+screenshot_deduplicators = {}
+monitor_stats = {}
+screenshot_encoder = None
 
 # --- Configuration ---
 load_dotenv()
@@ -174,6 +189,38 @@ app.config['MAIL_DEFAULT_SENDER'] = os.getenv('MAIL_USERNAME')
 mail = Mail(app)
 # 🔼 YAHAN TAK SMTP CONFIG END
 
+_background_services_started = False
+
+def init_background_services(use_reloader=False):
+    """
+    Start the app process's background services. Only the real entry points call
+    this. The screenshot encoder process re-imports this file as __mp_main__, and
+    the Werkzeug reloader's watcher runs it too. Neither may start a second spool
+    drainer or recover the app's live checkpoint logs.
+
+    Args:
+        use_reloader: app.run uses the Werkzeug reloader, start only in its serving child
+
+    Returns:
+        bool: True if the services were started by this call
+    """
+    global _background_services_started
+    if _background_services_started:
+        return False
+    if use_reloader and os.environ.get('WERKZEUG_RUN_MAIN') != 'true':
+        return False
+    _background_services_started = True
+
+    # Build the shared S3 client in the background so the first upload doesn't pay the handshake
+    warm_up_s3_client()
+    # Start draining payloads a previous run couldn't upload
+    get_upload_spool()
+    # Scan processes in the background so program history requests read a warm snapshot
+    get_process_sampler()
+    # Upload tracking sessions a crashed or killed previous run left in checkpoint logs
+    start_checkpoint_recovery()
+    return True
+
 
 
 # @app.route('/start_tracking', methods=['POST'])
@@ -619,6 +666,108 @@ def get_screenshot_interval():
             'error': str(e)
         }), 500
 
+@app.route('/api/config/screenshot-profile', methods=['GET'])
+def get_screenshot_profile():
+    """
+    Get the active screenshot encoding profile and its measured cost
+    """
+    try:
+        if screenshot_encoder:
+            status = screenshot_encoder.get_status()
+        else:
+            # Not recording yet: report what the next recording will start with
+            screenshot_config = config_manager.get_screenshot_config()
+            status = ProfiledFrameEncoder(
+                config_manager.get_screenshot_profiles(),
+                profile=screenshot_config.get('profile', 'auto'),
+                cpu_budget_ms=screenshot_config.get('cpu_budget_ms', 250)
+            ).get_status()
+        return jsonify({
+            'success': True,
+            'profile': status
+        })
+    except Exception as e:
+        logging.error(f"Error getting screenshot profile: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+
+
+
+@app.route('/api/s3/stats', methods=['GET'])
+def get_s3_stats():
+    """
+    Get per-call S3 latency counters of the shared client
+    """
+    try:
+        return jsonify({
+            'success': True,
+            'stats': get_s3_latency_stats()
+        })
+    except Exception as e:
+        logging.error(f"Error getting S3 stats: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/upload-spool/status', methods=['GET'])
+def get_upload_spool_status_api():
+    """
+    Get size, oldest payload age and retry counters of the durable upload spool
+    """
+    try:
+        return jsonify({
+            'success': True,
+            'spool': get_upload_spool_status()
+        })
+    except Exception as e:
+        logging.error(f"Error getting upload spool status: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/process-sampler/stats', methods=['GET'])
+def get_process_sampler_stats_api():
+    """
+    Get scan cost, snapshot age and attribute cache hit ratio of the shared process sampler
+    """
+    try:
+        return jsonify({
+            'success': True,
+            'sampler': get_process_sampler().get_stats()
+        })
+    except Exception as e:
+        logging.error(f"Error getting process sampler stats: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/screenshots/upload-queue', methods=['GET'])
+def get_screenshot_upload_queue_status():
+    """
+    Get screenshot upload queue depth, upload-lag, capture-jitter, dedup and per-monitor metrics
+    """
+    try:
+        return jsonify({
+            'success': True,
+            'queue': get_screenshot_upload_metrics(),
+            'scheduler': screenshot_scheduler.get_stats() if screenshot_scheduler else None,
+            'dedup': {f"monitor_{index}": dedup.get_stats() for index, dedup in screenshot_deduplicators.items()},
+            'monitors': {f"monitor_{index}": stats for index, stats in monitor_stats.items()}
+        })
+    except Exception as e:
+        logging.error(f"Error getting screenshot upload queue status: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 
 
 
@@ -768,48 +917,278 @@ def start_screen_recording_api():
 
 def start_screen_recording(folder_path, email, task_name):
     def record():
-        global recording_active
+        global recording_active, screenshot_scheduler, screenshot_deduplicators, screenshot_encoder, monitor_stats
 
         # Get screenshot interval from configuration
         screenshot_interval = config_manager.get_screenshot_interval()
         print(f"🔧 Starting screenshot capture - uploading directly to S3 (interval: {screenshot_interval}s)")
+
+        # Encoded frames go to a bounded queue, uploads happen on worker threads
+        upload_queue = get_screenshot_upload_queue()
+
+        # Captures fire on a fixed monotonic grid, encode/upload time doesn't shift them
+        screenshot_scheduler = MonotonicTickScheduler(screenshot_interval)
+        screenshot_scheduler.start()
+
+        # Capture every display separately in multi-monitor mode, otherwise the primary one
+        screenshot_config = config_manager.get_screenshot_config()
+        multi_monitor = screenshot_config.get('multi_monitor', False)
+
+        # Frames that barely changed since the last upload are skipped (tracked per monitor)
+        dedup_config = config_manager.get_screenshot_dedup_config()
+        screenshot_deduplicators = {}
+        monitor_stats = {}
+
+        # Delta mode uploads only the tiles changed since the monitor's last keyframe
+        delta_config = config_manager.get_screenshot_delta_config()
+        delta_params = {
+            'tile_size': delta_config.get('tile_size', 64),
+            'keyframe_interval': delta_config.get('keyframe_interval', 20),
+            'pixel_threshold': delta_config.get('pixel_threshold', 12),
+            'max_changed_ratio': delta_config.get('max_changed_ratio', 0.5)
+        } if delta_config.get('enabled', False) else None
+        delta_encoders = {}
+        keyframe_files = {}
+        # Monitors whose last keyframe the upload queue dropped: restart them with a keyframe
+        dropped_keyframes = set()
+
+        # Timelapse mode appends frames to rolling per-monitor video segments instead
+        timelapse_config = config_manager.get_screenshot_timelapse_config()
+        timelapse_writers = {}
+
+        def queue_timelapse_segment(index, segment):
+            """Hand a finished video segment and its frame-index sidecar to the upload workers"""
+            deduplicator = screenshot_deduplicators.get(index)
+            upload_queue.put({
+                'image_bytes': segment['video_bytes'],
+                'email': email,
+                'task_name': task_name,
+                'file_extension': segment['file_extension'],
+                'content_type': segment['content_type'],
+                'captured_at': segment['started_at'],
+                'key_suffix': (f"_m{index}" if multi_monitor else "") + "_timelapse",
+                'metadata': {'monitor': index, 'frame-count': len(segment['index']['frames'])},
+                'manifest': segment['index'],
+                'keep': True,
+                # Its frames never reach S3, don't skip the next frames as unchanged
+                'on_drop': deduplicator.discard_reference if deduplicator else None
+            })
+            monitor_stats[index]['segments'] += 1
+            monitor_stats[index]['bytes'] += len(segment['video_bytes'])
+
+        # Encoding follows the configured profile, the output buffer is reused across ticks
+        local_encoder = ProfiledFrameEncoder(
+            config_manager.get_screenshot_profiles(),
+            profile=screenshot_config.get('profile', 'auto'),
+            cpu_budget_ms=screenshot_config.get('cpu_budget_ms', 250)
+        )
+        screenshot_encoder = local_encoder
         
         with mss.mss() as sct:
-            monitor = sct.monitors[1]  # full screen
+            monitors = list(enumerate(sct.monitors[1:], start=1)) if multi_monitor else [(1, sct.monitors[1])]
+            for index, _ in monitors:
+                monitor_stats[index] = {'frames': 0, 'uploaded': 0, 'unchanged': 0, 'bytes': 0,
+                                        'keyframes': 0, 'deltas': 0, 'segments': 0}
+                if delta_params:
+                    delta_encoders[index] = TileDeltaEncoder(**delta_params)
+                if timelapse_config.get('enabled', False):
+                    try:
+                        timelapse_writers[index] = TimelapseSegmentWriter(
+                            segment_seconds=timelapse_config.get('segment_minutes', 15) * 60,
+                            fps=timelapse_config.get('fps', 2),
+                            codec=timelapse_config.get('codec', 'mp4v'),
+                            stream=index
+                        )
+                    except RuntimeError as e:
+                        print(f"⚠️ Timelapse mode unavailable, uploading single frames: {e}")
+                if dedup_config.get('enabled', True):
+                    screenshot_deduplicators[index] = ScreenshotDeduplicator(
+                        max_distance=dedup_config.get('max_distance', 4),
+                        hash_size=dedup_config.get('hash_size', 8)
+                    )
+            print(f"🖥️ Capturing {len(monitors)} monitor(s)")
+
+            # Hash/encode (and optionally grab) in a worker process fed through shared memory,
+            # so the encode doesn't hold this process' GIL while Flask serves the UI
+            encoder_process = None
+            process_config = config_manager.get_screenshot_encoder_process_config()
+            if process_config.get('enabled', True) and not timelapse_writers:
+                encoder_process = ScreenshotEncoderProcess(
+                    config_manager.get_screenshot_profiles(),
+                    profile=screenshot_config.get('profile', 'auto'),
+                    cpu_budget_ms=screenshot_config.get('cpu_budget_ms', 250),
+                    max_frame_bytes=max(m['width'] * m['height'] for _, m in monitors) * 4,
+                    grab_monitor=monitors[0][1] if process_config.get('grab_in_worker') else None
+                )
+                if encoder_process.start():
+                    screenshot_encoder = encoder_process
 
             while recording_active:
-                try:
-                    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-                    sct_img = sct.grab(monitor)
-
-                    if not PIL_AVAILABLE:
-                        logging.warning("⚠️ PIL not available, skipping screenshot processing")
-                        continue
-
-                    # Convert mss image to PIL image and save to bytes buffer
-                    img = Image.frombytes('RGB', sct_img.size, sct_img.rgb)
-                    
-                    # Save to bytes buffer instead of local file
-                    import io
-                    img_buffer = io.BytesIO()
-                    img.save(img_buffer, format="WEBP")
-                    img_bytes = img_buffer.getvalue()
-
-                    print(f"📸 Screenshot captured: {timestamp}.webp")
+                tick = screenshot_scheduler.wait_next_tick(lambda: recording_active)
+                if tick is None:
+                    break
 
-                    # Upload directly to S3 without saving locally
-                    from moduller.s3_uploader import upload_screenshot_direct
-                    result_url = upload_screenshot_direct(img_bytes, email, task_name, "webp")
-                    
-                    if result_url:
-                        print(f"☁️ Screenshot uploaded to S3: {result_url}")
-                    else:
-                        print(f"❌ Failed to upload screenshot to S3")
+                if not PIL_AVAILABLE:
+                    logging.warning("⚠️ PIL not available, skipping screenshot processing")
+                    continue
 
-                    time.sleep(screenshot_interval)  # Use configurable interval
-                except Exception as e:
-                    print(f"❌ Screenshot error: {e}")
-                    break
+                captured_at = tick['actual_at']
+                timestamp = captured_at.strftime("%Y-%m-%d_%H-%M-%S")
+
+                for index, monitor in monitors:
+                    try:
+                        deduplicator = screenshot_deduplicators.get(index)
+                        monitor_stats[index]['frames'] += 1
+
+                        if index in timelapse_writers:
+                            # Raw BGRA goes straight into the video, only the hash needs a PIL image
+                            sct_img = sct.grab(monitor)
+                            frame_hash = None
+                            if deduplicator:
+                                frame_hash = compute_perceptual_hash(screenshot_to_image(sct_img), deduplicator.hash_size)
+                                if deduplicator.is_duplicate(frame_hash, captured_at):
+                                    monitor_stats[index]['unchanged'] += 1
+                                    print(f"⏭️ Monitor {index} unchanged, skipping timelapse frame: {timestamp}")
+                                    continue
+                            try:
+                                segment = timelapse_writers[index].add_frame(sct_img, captured_at, tick)
+                            except TimelapseWriterError as e:
+                                # Writer can't be opened (e.g. resolution the codec rejects): single frames from now on
+                                print(f"⚠️ Timelapse mode failed on monitor {index}, uploading single frames: {e}")
+                                del timelapse_writers[index]
+                                if e.finished:
+                                    queue_timelapse_segment(index, e.finished)
+                            if index in timelapse_writers:
+                                monitor_stats[index]['uploaded'] += 1
+                                if deduplicator:
+                                    deduplicator.record_upload(frame_hash, 0, captured_at)
+                                if segment:
+                                    queue_timelapse_segment(index, segment)
+                                continue
+
+                        # Lower quality if uploads fall behind
+                        profile_quality = screenshot_encoder.current_profile().get('quality', 80)
+                        quality = upload_queue.recommended_quality(profile_quality)
+                        dedup_reference = deduplicator.reference() if deduplicator else None
+                        reset_delta = index in dropped_keyframes
+                        dropped_keyframes.discard(index)
+
+                        if encoder_process and encoder_process.alive:
+                            if encoder_process.grab_monitor:
+                                result = encoder_process.process_frame(None, quality, dedup_reference, monitor=monitor,
+                                                                       delta_config=delta_params, stream=index,
+                                                                       reset_delta=reset_delta)
+                            else:
+                                result = encoder_process.process_frame(sct.grab(monitor), quality, dedup_reference,
+                                                                       delta_config=delta_params, stream=index,
+                                                                       reset_delta=reset_delta)
+                        else:
+                            # In-process fallback: convert mss image to PIL image and save to bytes buffer
+                            screenshot_encoder = local_encoder
+                            if reset_delta and index in delta_encoders:
+                                delta_encoders[index].reset()
+                            sct_img = sct.grab(monitor)
+                            result = process_screenshot(local_encoder, screenshot_to_image(sct_img), quality, dedup_reference,
+                                                        delta_encoders.get(index))
+
+                        if deduplicator and deduplicator.is_duplicate(result['hash'], captured_at):
+                            monitor_stats[index]['unchanged'] += 1
+                            print(f"⏭️ Monitor {index} unchanged, skipping screenshot: {timestamp}")
+                            continue
+
+                        img_bytes, file_extension = result['image_bytes'], result['file_extension']
+                        print(f"📸 Screenshot captured: {timestamp} monitor {index}.{file_extension}")
+
+                        # Hand off to the upload workers without saving locally
+                        metadata = tick_metadata(tick)
+                        metadata['monitor'] = index
+                        key_suffix = f"_m{index}" if multi_monitor else ""
+                        manifest = None
+                        delta = result.get('delta')
+                        if delta and delta['type'] == 'keyframe':
+                            keyframe_files[index] = f"{timestamp}{key_suffix}.{file_extension}"
+                            monitor_stats[index]['keyframes'] += 1
+                        elif delta:
+                            # Only the changed tiles, the manifest places them on the keyframe
+                            key_suffix += "_delta"
+                            manifest = dict(
+                                delta['manifest'],
+                                captured_at=captured_at.isoformat(),
+                                keyframe_file=keyframe_files.get(index),
+                                tiles_file=f"{timestamp}{key_suffix}.{file_extension}"
+                            )
+                            monitor_stats[index]['deltas'] += 1
+                        if delta:
+                            metadata['frame-type'] = delta['type']
+
+                        is_keyframe = bool(delta and delta['type'] == 'keyframe')
+
+                        def on_drop(index=index, deduplicator=deduplicator, frame_hash=result['hash'],
+                                    is_keyframe=is_keyframe):
+                            # Later deltas of this monitor would point at a keyframe that never reaches S3
+                            if is_keyframe:
+                                dropped_keyframes.add(index)
+                            # A frame that never reaches S3 must not stay the dedup reference
+                            if deduplicator:
+                                deduplicator.discard_reference(frame_hash)
+
+                        queued = upload_queue.put({
+                            'image_bytes': img_bytes,
+                            'email': email,
+                            'task_name': task_name,
+                            'file_extension': file_extension,
+                            'captured_at': captured_at,
+                            'key_suffix': key_suffix,
+                            'metadata': metadata,
+                            'manifest': manifest,
+                            'keep': is_keyframe,
+                            'on_drop': on_drop,
+                            'degraded': quality < profile_quality
+                        })
+                        if queued:
+                            monitor_stats[index]['uploaded'] += 1
+                            monitor_stats[index]['bytes'] += len(img_bytes)
+                            # Only a frame handed to the upload workers becomes the dedup reference
+                            if deduplicator:
+                                deduplicator.record_upload(result['hash'], len(img_bytes), captured_at)
+                        else:
+                            print(f"⚠️ Upload queue full, screenshot dropped: {timestamp} monitor {index}")
+                    except Exception as e:
+                        # Keep capturing, a single bad frame must not end the session
+                        print(f"❌ Screenshot error (monitor {index}): {e}")
+
+            if encoder_process:
+                encoder_process.stop()
+
+        # Upload the last, partial timelapse segments
+        for index, writer in timelapse_writers.items():
+            try:
+                segment = writer.flush()
+                if segment:
+                    queue_timelapse_segment(index, segment)
+            except Exception as e:
+                print(f"❌ Error flushing timelapse segment (monitor {index}): {e}")
+
+        # Keep the "unchanged since" markers of skipped frames with the session logs
+        markers = {
+            f"monitor_{index}": {
+                "stats": deduplicator.get_stats(),
+                "unchanged_markers": deduplicator.get_markers()
+            }
+            for index, deduplicator in screenshot_deduplicators.items()
+            if deduplicator.get_markers()
+        }
+        for index, stats in monitor_stats.items():
+            print(f"📊 Monitor {index}: {stats['uploaded']}/{stats['frames']} frames uploaded, {stats['bytes']} bytes")
+        if markers or multi_monitor:
+            try:
+                from moduller.s3_uploader import upload_logs_direct
+                upload_logs_direct({
+                    "bytes_per_monitor": monitor_stats,
+                    "monitors": markers
+                }, email, task_name, "screenshot_markers")
+            except Exception as e:
+                print(f"❌ Error uploading screenshot markers: {e}")
 
     global recording_thread
     recording_thread = threading.Thread(target=record, daemon=True)
@@ -1418,7 +1797,7 @@ def start_task_session():
         
         # 🎯 Start activity window tracking when timer starts
         try:
-            start_active_window_tracking()
+            start_active_window_tracking(email, task_name)
             print(f"🔍 Started activity window tracking for {email}")
         except Exception as e:
             print(f"❌ Error starting activity tracking: {e}")
@@ -1672,26 +2051,25 @@ def upload_log_to_s3():
         return jsonify({"success": False, "message": "Missing email or task name"})
 
     try:
-        from moduller.tracker import get_program_history_and_save, logs_file
+        from moduller.tracker import get_program_history_and_save, logs_file, get_program_intervals
 
         # ✅ Step 1: Save local log
         file_path = get_program_history_and_save(email, task_name)
 
-        # ✅ Step 2: Read raw log
-        with open(file_path, "r", encoding="utf-8") as f:
-            raw_json = f.read()
+        # ✅ Step 2: Read raw log as process run intervals
+        program_history = get_program_intervals(file_path)
+        raw_json = json.dumps(program_history, indent=2, ensure_ascii=False)
 
         # ✅ Step 3: Generate AI summary
         from moduller.ai_summarizer import summarize_program_usage
         ai_summary = summarize_program_usage(raw_json)
 
         # ✅ Step 4: Save summary locally
-        summary_file_path = file_path.replace("_program_raw.json", "_summary.txt")
+        summary_file_path = file_path.replace("_program_raw.jsonl", "_summary.txt")
         with open(summary_file_path, "w", encoding="utf-8") as f:
             f.write(ai_summary)
 
         # ✅ Step 5: Also upload JSON log to S3
-        program_history = json.loads(raw_json)
         upload_program_data_to_s3(email, task_name, program_history)
 
         return jsonify({
@@ -1743,6 +2121,7 @@ def update_log_info():
 
 # Function to run Flask in a separate thread
 def run_flask():
+    init_background_services()
     app.run(debug=True, use_reloader=False, port=5000)
 
 # Start Flask in a separate thread
@@ -1854,6 +2233,9 @@ def find_free_port():
     return 5000  # fallback
 
 if __name__ == "__main__":
+    # Needed by the screenshot encoder process in packaged builds
+    multiprocessing.freeze_support()
+
     # Arka planda loglama başlat
     # threading.Thread(target=auto_log_every_minute, daemon=True).start()  # Disabled old tracker
     
@@ -1867,10 +2249,12 @@ if __name__ == "__main__":
         if getattr(sys, 'frozen', False):
             # Running as PyInstaller bundle
             print("📦 Running as packaged application")
+            init_background_services()
             app.run(debug=False, port=port, host='127.0.0.1', use_reloader=False)
         else:
             # Running as script
             print("🐍 Running as Python script")
+            init_background_services(use_reloader=True)
             app.run(debug=True, port=port, host='127.0.0.1')
             
     except KeyboardInterrupt:
@@ -2306,6 +2690,38 @@ def stop_window_tracking():
         }), 500
 
 
+@app.route('/api/window-tracking/stats', methods=['GET'])
+def get_window_tracking_stats_api():
+    """Get wakeups and CPU time per hour of the window tracker thread, plus pid name cache stats"""
+    try:
+        from moduller.active_window_tracker import get_window_tracking_stats
+        return jsonify({
+            "status": "success",
+            "stats": get_window_tracking_stats()
+        })
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 500
+
+
+@app.route('/api/program-tracking/scheduler', methods=['GET'])
+def get_program_tracking_scheduler_stats():
+    """Get per-session capture counts and lateness of the program tracking scheduler"""
+    try:
+        from moduller.user_program_tracker import get_user_tracking_scheduler_stats
+        return jsonify({
+            "status": "success",
+            "scheduler": get_user_tracking_scheduler_stats()
+        })
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 500
+
+
 @app.route('/get_user_program_data', methods=['POST'])
 def get_user_program_data():
     """Get current program tracking data for a user"""
@@ -2484,6 +2900,7 @@ if __name__ == '__main__':
     except ImportError:
         print("⚠️ Active window tracking not available (install pywin32)")
     
+    init_background_services(use_reloader=True)
     app.run(debug=True)
 
 
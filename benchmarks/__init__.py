@@ -0,0 +1,5 @@
+"""
+Benchmarks comparing the optimised code paths with the layouts they replaced.
+Run from the repository root, e.g.:
+    python -m benchmarks.window_intervals
+"""
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Peak memory and time of the activity export: dict + json.dumps(indent=2)
+against the streaming gzip writer.
+
+    python -m benchmarks.json_stream
+"""
+
+import gzip
+import json
+import time
+import random
+import tracemalloc
+
+from moduller.active_window_tracker import ActiveWindowTracker
+from moduller.json_stream import gzip_json_body
+
+
+def _measure(func):
+    """Time func, then run it again under tracemalloc; returns (result, elapsed ms, peak KB)"""
+    started = time.perf_counter()
+    func()
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    tracemalloc.start()
+    result = func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed_ms, peak / 1024
+
+
+def run_benchmark(switches=30000, windows=400):
+    """
+    Export the same synthetic day of window switches through the dict +
+    json.dumps(indent=2) path and through the streaming gzip writer
+    """
+    rng = random.Random(11)
+    tracker = ActiveWindowTracker(verbose=False)
+    keys = [(f"program_{i % 25}.exe", f"Window {i} – düzenleniyor") for i in range(windows)]
+    clock = time.time() - 8 * 3600
+    for _ in range(switches):
+        process_name, title = rng.choice(keys)
+        duration = rng.expovariate(1 / 1.0)
+        key_id = tracker.intervals.intern(f"{process_name}|{title}", process_name, title, 1, {})
+        tracker.intervals.append(key_id, clock, clock + duration)
+        clock += duration
+
+    def legacy():
+        export = tracker.get_activity_export_data()
+        return json.dumps(export, indent=2, ensure_ascii=False).encode('utf-8')
+
+    def streamed():
+        return gzip_json_body(tracker.get_activity_export_data(stream=True))
+
+    legacy_body, legacy_ms, legacy_kb = _measure(legacy)
+    (stream_body, raw_bytes), stream_ms, stream_kb = _measure(streamed)
+
+    # Same document apart from the export / summary timestamps
+    legacy_doc = json.loads(legacy_body)
+    stream_doc = json.loads(gzip.decompress(stream_body))
+    for doc in (legacy_doc, stream_doc):
+        doc.pop('export_timestamp')
+        doc['summary_by_application'].pop('timestamp', None)
+    assert legacy_doc == stream_doc
+
+    print(f"📊 {switches} switches: peak memory {legacy_kb:.0f} KB → {stream_kb:.0f} KB, "
+          f"time {legacy_ms:.0f} ms → {stream_ms:.0f} ms, "
+          f"body {len(legacy_body) / 1024:.0f} KB → {len(stream_body) / 1024:.0f} KB "
+          f"({raw_bytes / 1024:.0f} KB uncompressed)")
+    return {
+        'switches': switches,
+        'dict_indent_json': {'peak_kb': round(legacy_kb, 1), 'ms': round(legacy_ms, 1),
+                             'body_kb': round(len(legacy_body) / 1024, 1)},
+        'streamed_gzip_json': {'peak_kb': round(stream_kb, 1), 'ms': round(stream_ms, 1),
+                               'body_kb': round(len(stream_body) / 1024, 1),
+                               'uncompressed_kb': round(raw_bytes / 1024, 1)}
+    }
+
+
+if __name__ == "__main__":
+    print("🧪 Benchmarking activity export serialisation")
+    run_benchmark()
+    run_benchmark(switches=100000)
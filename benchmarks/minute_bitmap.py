@@ -0,0 +1,79 @@
+"""
+Set-of-strings vs 1440-bit bitmap minute accounting on a synthetic day:
+build time, memory, per-program totals and a category roll-up.
+    python -m benchmarks.minute_bitmap
+"""
+
+import json
+import time
+import random
+from datetime import datetime, timedelta
+
+from moduller.minute_bitmap import MinuteBitmap, rollup
+
+from .common import deep_size
+
+
+def run_benchmark(hours=10, programs=60, processes_per_minute=150):
+    """
+    Compare set-of-strings and bitmap minute accounting on a synthetic day:
+    build time, memory, per-program totals and a category roll-up.
+    """
+    rng = random.Random(7)
+    names = [f"program_{i}.exe" for i in range(programs)]
+    started = datetime(2026, 1, 5, 8, 0)
+    timestamps = []
+    for minute in range(hours * 60):
+        now = (started + timedelta(minutes=minute, seconds=rng.randint(0, 59))).isoformat()
+        running = rng.sample(names, rng.randint(10, programs))
+        timestamps.extend((rng.choice(running), now) for _ in range(processes_per_minute))
+
+    results = {}
+
+    build_started = time.perf_counter()
+    sets = {}
+    for name, timestamp in timestamps:
+        sets.setdefault(name, set()).add(timestamp[:16])
+    set_build = time.perf_counter() - build_started
+
+    build_started = time.perf_counter()
+    bitmaps = {}
+    for name, timestamp in timestamps:
+        bitmap = bitmaps.get(name)
+        if bitmap is None:
+            bitmap = bitmaps[name] = MinuteBitmap()
+        bitmap.add(timestamp)
+    bitmap_build = time.perf_counter() - build_started
+
+    totals_started = time.perf_counter()
+    set_totals = {name: len(minutes) for name, minutes in sets.items()}
+    set_category = len(set().union(*list(sets.values())[:programs // 2]))
+    set_query = time.perf_counter() - totals_started
+
+    totals_started = time.perf_counter()
+    bitmap_totals = {name: bitmap.count() for name, bitmap in bitmaps.items()}
+    bitmap_category = rollup(list(bitmaps.values())[:programs // 2]).count()
+    bitmap_query = time.perf_counter() - totals_started
+
+    assert set_totals == bitmap_totals and set_category == bitmap_category
+
+    results["sets"] = {
+        "build_ms": round(set_build * 1000, 1),
+        "totals_and_rollup_ms": round(set_query * 1000, 3),
+        "memory_kb": round(deep_size(sets) / 1024, 1)
+    }
+    results["bitmaps"] = {
+        "build_ms": round(bitmap_build * 1000, 1),
+        "totals_and_rollup_ms": round(bitmap_query * 1000, 3),
+        "memory_kb": round(deep_size(bitmaps) / 1024, 1),
+        "persisted_kb": round(len(json.dumps({n: b.to_json() for n, b in bitmaps.items()})) / 1024, 1)
+    }
+    print(f"📊 {hours}h, {programs} programs: memory {results['sets']['memory_kb']} → "
+          f"{results['bitmaps']['memory_kb']} KB, totals+roll-up {results['sets']['totals_and_rollup_ms']} → "
+          f"{results['bitmaps']['totals_and_rollup_ms']} ms")
+    return results
+
+
+if __name__ == "__main__":
+    print("🧪 Benchmarking minute sets vs 1440-bit day bitmaps")
+    print(json.dumps(run_benchmark(), indent=2))
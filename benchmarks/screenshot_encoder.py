@@ -0,0 +1,96 @@
+"""
+Legacy frombytes(sct_img.rgb) vs frombuffer screenshot conversion: CPU per frame
+and peak RSS growth on synthetic frames (no display needed).
+    python -m benchmarks.screenshot_encoder
+"""
+
+import io
+import sys
+import json
+import time
+import subprocess
+
+from PIL import Image
+
+from moduller.screenshot_encoder import FrameEncoder, screenshot_to_image
+
+# Resolutions covered by the benchmark
+BENCHMARK_RESOLUTIONS = {
+    "1080p": (1920, 1080),
+    "1440p": (2560, 1440),
+    "4K": (3840, 2160)
+}
+
+
+def _peak_rss_bytes():
+    """Peak resident set size of this process"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KiB, macOS bytes
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except ImportError:
+        import psutil
+        return psutil.Process().memory_info().peak_wset
+
+
+def _benchmark_path(path, width, height, frames):
+    """Run one capture path on synthetic frames and report CPU per frame and peak RSS growth"""
+    from mss.screenshot import ScreenShot
+
+    # Repeating pattern: compresses like a desktop rather than like noise
+    raw = bytearray((i * 7) & 0xFF for i in range(4096)) * (width * height * 4 // 4096)
+    encoder = FrameEncoder()
+    baseline_rss = _peak_rss_bytes()
+
+    started_cpu = time.process_time()
+    started_wall = time.perf_counter()
+    for _ in range(frames):
+        sct_img = ScreenShot.from_size(raw, width, height)
+        if path == "legacy":
+            img = Image.frombytes('RGB', sct_img.size, sct_img.rgb)
+            img_buffer = io.BytesIO()
+            img.save(img_buffer, format="WEBP", quality=80, method=0)
+            img_bytes = img_buffer.getvalue()
+        else:
+            img = screenshot_to_image(sct_img)
+            img_bytes = encoder.encode(img, "WEBP", quality=80, method=0)
+        del img, img_bytes
+
+    return {
+        'cpu_ms_per_frame': round((time.process_time() - started_cpu) / frames * 1000, 1),
+        'wall_ms_per_frame': round((time.perf_counter() - started_wall) / frames * 1000, 1),
+        'peak_rss_growth_mb': round((_peak_rss_bytes() - baseline_rss) / (1024 * 1024), 1)
+    }
+
+
+def run_benchmark(frames=5):
+    """
+    Compare the legacy frombytes(sct_img.rgb) path with the frombuffer path at
+    1080p, 1440p and 4K. Each measurement runs in a fresh interpreter so peak RSS
+    isn't shared between runs.
+    """
+    results = {}
+    for label, (width, height) in BENCHMARK_RESOLUTIONS.items():
+        results[label] = {}
+        for path in ("legacy", "frombuffer"):
+            output = subprocess.check_output([
+                sys.executable, "-m", "benchmarks.screenshot_encoder",
+                "--benchmark-path", path, str(width), str(height), str(frames)
+            ])
+            results[label][path] = json.loads(output)
+
+        legacy = results[label]["legacy"]
+        optimized = results[label]["frombuffer"]
+        print(f"📊 {label}: CPU/frame {legacy['cpu_ms_per_frame']} → {optimized['cpu_ms_per_frame']} ms, "
+              f"peak RSS growth {legacy['peak_rss_growth_mb']} → {optimized['peak_rss_growth_mb']} MB")
+    return results
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--benchmark-path":
+        path, width, height, frames = sys.argv[2], int(sys.argv[3]), int(sys.argv[4]), int(sys.argv[5])
+        print(json.dumps(_benchmark_path(path, width, height, frames)))
+    else:
+        print("🧪 Benchmarking screenshot conversion paths")
+        print(json.dumps(run_benchmark(), indent=2))
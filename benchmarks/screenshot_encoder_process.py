@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Flask request latency (p50/p99/max) of a /check_idle_state style route while
+screenshots are encoded continuously: without capture, with in-process encoding
+and with the encoder process.
+
+    python -m benchmarks.screenshot_encoder_process
+"""
+
+import json
+import time
+import threading
+import http.client
+import multiprocessing
+
+from flask import Flask, jsonify
+from werkzeug.serving import make_server
+from mss.screenshot import ScreenShot
+
+from moduller.config_manager import config_manager
+from moduller.screenshot_encoder import ProfiledFrameEncoder, process_screenshot, screenshot_to_image
+from moduller.screenshot_encoder_process import ScreenshotEncoderProcess
+
+
+def _percentile(values, percent):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_benchmark(seconds=10, width=3840, height=2160):
+    """
+    Measure Flask request latency (p50/p99/max) of a /check_idle_state style route
+    while screenshots are encoded continuously: without capture, with in-process
+    encoding and with the encoder process.
+    """
+    app = Flask(__name__)
+
+    @app.route('/check_idle_state')
+    def check_idle_state():
+        return jsonify({"idle": False})
+
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    port = server.server_port
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    profiles = config_manager.get_screenshot_profiles()
+    raw = bytearray((i * 7) & 0xFF for i in range(4096)) * (width * height * 4 // 4096)
+    results = {}
+
+    for mode in ("no_capture", "in_process", "worker"):
+        capturing = True
+        worker = None
+        if mode == "worker":
+            worker = ScreenshotEncoderProcess(profiles, profile="standard", max_frame_bytes=len(raw))
+            worker.start()
+
+        def capture_loop():
+            encoder = ProfiledFrameEncoder(profiles, profile="standard")
+            while capturing:
+                sct_img = ScreenShot.from_size(raw, width, height)
+                if worker:
+                    worker.process_frame(sct_img)
+                else:
+                    process_screenshot(encoder, screenshot_to_image(sct_img))
+                time.sleep(0.05)
+
+        capture_thread = None
+        if mode != "no_capture":
+            capture_thread = threading.Thread(target=capture_loop, daemon=True)
+            capture_thread.start()
+
+        latencies = []
+        connection = http.client.HTTPConnection('127.0.0.1', port)
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            connection.request("GET", "/check_idle_state")
+            connection.getresponse().read()
+            latencies.append((time.perf_counter() - started) * 1000)
+            time.sleep(0.01)
+        connection.close()
+
+        capturing = False
+        if capture_thread:
+            capture_thread.join()
+        if worker:
+            worker.stop()
+
+        results[mode] = {
+            'requests': len(latencies),
+            'p50_ms': round(_percentile(latencies, 50), 2),
+            'p99_ms': round(_percentile(latencies, 99), 2),
+            'max_ms': round(max(latencies), 2)
+        }
+        print(f"📊 {mode}: p50 {results[mode]['p50_ms']} ms, p99 {results[mode]['p99_ms']} ms, "
+              f"max {results[mode]['max_ms']} ms ({len(latencies)} requests)")
+
+    server.shutdown()
+    return results
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    print("🧪 Benchmarking Flask latency while capturing screenshots")
+    print(json.dumps(run_benchmark(), indent=2))
@@ -0,0 +1,86 @@
+"""
+Checkpoint logs of a synthetic 10-hour session: per-record append cost and the
+time to replay them into the trackers (no upload).
+    python -m benchmarks.session_checkpoint
+"""
+
+import os
+import json
+import time
+import random
+import tempfile
+from datetime import datetime
+
+from moduller.session_checkpoint import SessionCheckpointLog, CHECKPOINT_SUFFIX
+from moduller.user_program_tracker import UserProgramTracker, rebuild_program_session
+from moduller.active_window_tracker import rebuild_activity_tracker
+
+
+def run_benchmark(hours=10, capture_interval=10, programs=12, switch_every=4):
+    """
+    Write the checkpoint logs of a synthetic session and time the per-tick cost
+    and the recovery (replay into the trackers, no upload)
+    """
+    rng = random.Random(9)
+    directory = tempfile.mkdtemp(prefix="ddsfocus_checkpoint_")
+    names = [f"program_{i}.exe" for i in range(programs)]
+    session_start = time.time() - hours * 3600
+
+    # Program captures: only changed programs per tick
+    program_log = SessionCheckpointLog(os.path.join(directory, f"program_bench{CHECKPOINT_SUFFIX}"))
+    program_log.append({'type': 'start', 'email': 'bench@example.com', 'task_name': 'bench',
+                        'session_start': datetime.fromtimestamp(session_start).isoformat()})
+    totals = {name: 0.0 for name in names}
+    for tick in range(hours * 3600 // capture_interval):
+        changed = {}
+        for name in rng.sample(names, 2):
+            totals[name] += capture_interval / 2
+            changed[name] = {'total_time': totals[name], 'window_titles': [f"{name} window {tick % 7}"],
+                             'browser_domains': []}
+        program_log.append({'type': 'capture', 't': session_start + tick * capture_interval, 'programs': changed})
+    program_log.close()
+
+    # Window focus intervals
+    activity_log = SessionCheckpointLog(os.path.join(directory, f"activity_bench{CHECKPOINT_SUFFIX}"))
+    activity_log.append({'type': 'start', 'email': 'bench@example.com', 'task_name': 'bench',
+                         'tracking_started': datetime.fromtimestamp(session_start).isoformat()})
+    windows = {}
+    clock = session_start
+    while clock < session_start + hours * 3600:
+        key = (rng.choice(names), f"Window {rng.randint(0, 60)}")
+        if key not in windows:
+            windows[key] = len(windows)
+            activity_log.append({'type': 'window', 'k': windows[key], 'process': key[0], 'title': key[1], 'pid': 1})
+        duration = rng.expovariate(1 / switch_every)
+        activity_log.append({'type': 'interval', 'k': windows[key], 's': clock, 'e': clock + duration})
+        clock += duration
+    activity_log.close()
+
+    started = time.perf_counter()
+    session = rebuild_program_session(program_log.path)
+    tracker = UserProgramTracker()
+    tracker.user_sessions['bench'] = session
+    report = tracker._generate_user_report('bench')
+    program_recovery_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    activity_tracker, _ = rebuild_activity_tracker(activity_log.path)
+    export = activity_tracker.get_activity_export_data()
+    activity_recovery_ms = (time.perf_counter() - started) * 1000
+
+    results = {
+        'hours': hours,
+        'program_checkpoint': dict(program_log.get_stats(), recovery_ms=round(program_recovery_ms, 1),
+                                   programs_recovered=report['programs_tracked']),
+        'activity_checkpoint': dict(activity_log.get_stats(), recovery_ms=round(activity_recovery_ms, 1),
+                                    intervals_recovered=len(export['detailed_activities']))
+    }
+    for path in (program_log.path, activity_log.path):
+        os.remove(path)
+    os.rmdir(directory)
+    return results
+
+
+if __name__ == "__main__":
+    print("🧪 Benchmarking session checkpoints (10-hour session)")
+    print(json.dumps(run_benchmark(), indent=2))
@@ -0,0 +1,103 @@
+"""
+Session dicts vs the interval store: memory, logging time and program summary
+cost for the same synthetic day of window switches.
+    python -m benchmarks.window_intervals
+"""
+
+import time
+import random
+from datetime import datetime
+
+from moduller.window_intervals import WindowIntervalStore
+from moduller.active_window_tracker import ActiveWindowTracker
+
+from .common import deep_size
+
+
+def _legacy_session_summary(session_data):
+    """The pre-interval get_session_summary aggregation: walk every window and its sessions"""
+    program_totals = {}
+    for data in session_data.values():
+        if data['total_time'] > 0:
+            program = program_totals.setdefault(data['process_name'], {
+                'total_time': 0, 'window_titles': set(), 'sessions': []
+            })
+            program['total_time'] += data['total_time']
+            program['window_titles'].add(data['window_title'])
+            program['sessions'].extend(data['sessions'])
+    return {name: (program['total_time'], len(program['sessions'])) for name, program in program_totals.items()}
+
+
+def run_benchmark(switches=30000, windows=400, summaries=100):
+    """
+    Log the same synthetic day of window switches into the old per-window
+    lists of session dicts and into the interval store, then build program
+    summaries from both (the store's with ActiveWindowTracker.get_session_summary)
+    """
+    rng = random.Random(3)
+    keys = [(f"program_{i % 25}.exe", f"Window {i}") for i in range(windows)]
+    now = time.time() - 8 * 3600
+    events = []
+    for _ in range(switches):
+        duration = rng.expovariate(1 / 1.0)
+        events.append((rng.choice(keys), now, now + duration))
+        now += duration
+
+    started = time.perf_counter()
+    session_data = {}
+    for (process_name, title), start, end in events:
+        data = session_data.setdefault(f"{process_name}|{title}", {
+            'total_time': 0, 'process_name': process_name, 'window_title': title, 'sessions': []
+        })
+        data['total_time'] += end - start
+        data['sessions'].append({
+            'start_time': datetime.fromtimestamp(start).isoformat(),
+            'end_time': datetime.fromtimestamp(end).isoformat(),
+            'duration': end - start
+        })
+    dict_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    store = WindowIntervalStore()
+    for (process_name, title), start, end in events:
+        store.append(store.intern(f"{process_name}|{title}", process_name, title), start, end)
+    store_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    for _ in range(summaries):
+        legacy_summary = _legacy_session_summary(session_data)
+    legacy_summary_ms = (time.perf_counter() - started) * 1000 / summaries
+
+    tracker = ActiveWindowTracker(verbose=False)
+    tracker.intervals = store
+    started = time.perf_counter()
+    for _ in range(summaries):
+        summary = tracker.get_session_summary()
+    store_summary_ms = (time.perf_counter() - started) * 1000 / summaries
+
+    applications = {application['process_name']: application for application in summary['applications']}
+    for name, (total_time, session_count) in legacy_summary.items():
+        assert abs(total_time - applications[name]['total_time_seconds']) < 0.01
+        assert session_count == applications[name]['session_count']
+
+    dict_kb = deep_size(session_data) / 1024
+    store_kb = (store.memory_bytes() + deep_size(store.windows) + deep_size(store.key_ids)) / 1024
+
+    print(f"📊 {switches} switches over {windows} windows: memory {dict_kb:.0f} KB → {store_kb:.0f} KB, "
+          f"logging {dict_ms:.0f} ms → {store_ms:.0f} ms, "
+          f"summary {legacy_summary_ms:.2f} ms → {store_summary_ms:.3f} ms")
+    return {
+        'switches': switches,
+        'session_dicts': {'memory_kb': round(dict_kb, 1), 'log_ms': round(dict_ms, 1),
+                          'summary_ms': round(legacy_summary_ms, 3)},
+        'interval_store': {'memory_kb': round(store_kb, 1), 'log_ms': round(store_ms, 1),
+                           'summary_ms': round(store_summary_ms, 4)}
+    }
+
+
+if __name__ == "__main__":
+    print("🧪 Benchmarking session dicts vs interval store")
+    run_benchmark()
+    run_benchmark(switches=50000)
+    # Many distinct titles per program
+    run_benchmark(switches=50000, windows=5000)
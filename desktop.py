@@ -2,6 +2,7 @@ import os
 import sys
 import time
 import threading
+import multiprocessing
 import subprocess
 import requests
 import logging
@@ -173,6 +174,8 @@ def start_flask():
                     try:
                         logging.info("[FLASK] Starting Flask application...")
                         spec.loader.exec_module(app_module)
+                        # Not run as __main__: start the app's background services here
+                        app_module.init_background_services()
                     except Exception as e:
                         logging.error(f"[ERROR] Flask app failed: {e}")
                 
@@ -327,6 +330,9 @@ def cleanup_and_exit():
 
 # ------------------ Main Launcher ------------------
 if __name__ == '__main__':
+    # Let packaged builds start the screenshot encoder process
+    multiprocessing.freeze_support()
+
     # Step 1: Open exec terminal first
     logging.info("🚀 Starting DDS Focus Pro with exec terminal...")
     open_exec_terminal()
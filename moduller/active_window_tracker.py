@@ -2,14 +2,24 @@
 """
 Active Window Tracker Module
 Tracks which application/program is currently active and logs time spent
+
+Window changes come from a pluggable event source (see window_events): WinEvent
+hook or polling on Windows, or a recorded trace replayed at any speed. Windows
+and focus intervals are appended to a checkpoint log (see session_checkpoint)
+while a task runs, so the activity of a crashed session is uploaded on next start.
 """
 
+import os
 import time
 import json
 from datetime import datetime
 import threading
 import psutil
-from collections import defaultdict
+
+from .window_intervals import WindowIntervalStore, WINDOW_TITLES_PER_PROGRAM
+from .window_events import create_window_event_source
+from .session_checkpoint import (open_checkpoint, iter_checkpoint, list_checkpoints,
+                                 claim_checkpoint, release_checkpoint)
 
 # Logger setup
 import logging
@@ -27,18 +37,33 @@ except ImportError:
 # Global tracker instance
 window_tracker = None
 
+# Most process names kept in the pid cache
+PROCESS_NAME_CACHE_SIZE = 256
+
 class ActiveWindowTracker:
-    def __init__(self):
+    def __init__(self, event_source=None, verbose=True):
+        """
+        Args:
+            event_source: WindowEventSource to consume (default: the configured one)
+            verbose: Print every window change
+        """
+        self.event_source = event_source
+        self.active_source = None
+        self.verbose = verbose
+        self.lock = threading.RLock()
         self.current_window = None
         self.start_time = None
+        self.current_key_id = None
         self.tracking = False
-        self.session_data = defaultdict(lambda: {
-            'total_time': 0,
-            'window_title': '',
-            'process_name': '',
-            'sessions': []
-        })
+        self.tracking_start_time = None
+        # Focus intervals per window as compact columns, see window_intervals
+        self.intervals = WindowIntervalStore()
         self.tracking_thread = None
+        self.checkpoint = None
+        
+        # pid -> (psutil.Process, name); the Process object re-checks pid + create_time
+        self.process_names = {}
+        self.name_cache_stats = {'hits': 0, 'misses': 0}
         
     def get_active_window_info(self):
         """Get information about the currently active window"""
@@ -57,19 +82,52 @@ class ActiveWindowTracker:
             # Get process ID
             _, process_id = win32process.GetWindowThreadProcessId(hwnd)
             
-            # Get process name
-            try:
-                process = psutil.Process(process_id)
-                process_name = process.name()
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                process_name = "Unknown"
-                
-            return window_title, process_name, process_id
+            return window_title, self._get_process_name(process_id), process_id
             
         except Exception as e:
             print(f"❌ Error getting active window: {e}")
             return None, None, None
     
+    def _get_process_name(self, process_id):
+        """Get process name, cached per pid and validated against its create_time"""
+        cached = self.process_names.get(process_id)
+        # is_running() compares create_time, so a reused pid is not mistaken for the old process
+        if cached and cached[0].is_running():
+            self.name_cache_stats['hits'] += 1
+            return cached[1]
+        
+        self.name_cache_stats['misses'] += 1
+        try:
+            process = psutil.Process(process_id)
+            process_name = process.name()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            self.process_names.pop(process_id, None)
+            return "Unknown"
+        
+        self.process_names.pop(process_id, None)
+        self.process_names[process_id] = (process, process_name)
+        if len(self.process_names) > PROCESS_NAME_CACHE_SIZE:
+            # Drop the least recently added
+            del self.process_names[next(iter(self.process_names))]
+        return process_name
+    
+    def get_tracking_stats(self):
+        """Get event source wakeups and CPU time per hour, plus pid name cache hit ratio"""
+        source = self.active_source
+        lookups = self.name_cache_stats['hits'] + self.name_cache_stats['misses']
+        return {
+            'tracking': self.tracking,
+            'event_source': source.get_stats() if source else None,
+            'process_name_cache': {
+                'entries': len(self.process_names),
+                'hits': self.name_cache_stats['hits'],
+                'misses': self.name_cache_stats['misses'],
+                'hit_ratio': round(self.name_cache_stats['hits'] / lookups, 3) if lookups else 0.0
+            },
+            'windows': len(self.intervals.windows),
+            'intervals': len(self.intervals)
+        }
+    
     def get_browser_tab_info(self, window_title, process_name):
         """Extract browser tab information if it's a browser"""
         browser_info = {
@@ -110,6 +168,8 @@ class ActiveWindowTracker:
             return
             
         self.tracking = True
+        if self.tracking_start_time is None:
+            self.tracking_start_time = datetime.now()
         self.tracking_thread = threading.Thread(target=self._tracking_loop, daemon=True)
         self.tracking_thread.start()
         print("🔍 Active window tracking started")
@@ -117,101 +177,172 @@ class ActiveWindowTracker:
     def stop_tracking(self):
         """Stop tracking active windows"""
         self.tracking = False
-        if self.current_window and self.start_time:
-            self._log_window_time()
+        if self.active_source:
+            self.active_source.stop()
+        self._close_current_window()
         print("⏹️ Active window tracking stopped")
     
+    def start_checkpoint(self, email, task_name):
+        """Start a checkpoint log for the task's activity, seeded with what is tracked so far"""
+        with self.lock:
+            if self.checkpoint:
+                # Previous task not uploaded: keep its log for recovery
+                self.checkpoint.close()
+            self.checkpoint = open_checkpoint('activity', f"{email}|{task_name}", {
+                'email': email,
+                'task_name': task_name,
+                'tracking_started': (self.tracking_start_time or datetime.now()).isoformat()
+            })
+            if not self.checkpoint:
+                return
+            for key_id, window in enumerate(self.intervals.windows):
+                self._checkpoint_window(key_id, window)
+            for position, key_id in enumerate(self.intervals.interval_keys):
+                self.checkpoint.append({
+                    'type': 'interval',
+                    'k': key_id,
+                    's': self.intervals.starts[position],
+                    'e': self.intervals.ends[position]
+                })
+    
+    def discard_checkpoint(self):
+        """Drop the checkpoint log after the activity was uploaded"""
+        with self.lock:
+            if self.checkpoint:
+                self.checkpoint.close(discard=True)
+                self.checkpoint = None
+    
+    def _checkpoint_window(self, key_id, window):
+        self.checkpoint.append({
+            'type': 'window',
+            'k': key_id,
+            'process': window['process_name'],
+            'title': window['window_title'],
+            'pid': window.get('process_id')
+        })
+    
+    def _now(self):
+        """Current time on the event source's clock (trace time during replay)"""
+        return self.active_source.now() if self.active_source else time.time()
+    
     def _tracking_loop(self):
         """Main tracking loop"""
-        check_interval = 1  # Check every 1 second
+        try:
+            self.run_event_source()
+        except Exception as e:
+            print(f"❌ Error in tracking loop: {e}")
+    
+    def run_event_source(self):
+        """Consume window events until the source stops (blocks)"""
+        source = self.event_source or create_window_event_source(self.get_active_window_info, win32gui is not None)
+        if source is None:
+            return
+        self.active_source = source
+        source.run(self._on_window_event)
+        # Source ended on its own (e.g. trace replay finished)
+        self._close_current_window()
+    
+    def _on_window_event(self, event):
+        """Handle one foreground-window change from the event source"""
+        window_title = event['window_title']
+        process_name = event['process_name']
+        if not window_title or not process_name:
+            return
+        current_window_key = f"{process_name}|{window_title}"
         
-        while self.tracking:
-            try:
-                window_title, process_name, process_id = self.get_active_window_info()
-                
-                if window_title and process_name:
-                    current_window_key = f"{process_name}|{window_title}"
-                    
-                    # If window changed
-                    if current_window_key != self.current_window:
-                        # Log time for previous window
-                        if self.current_window and self.start_time:
-                            self._log_window_time()
-                        
-                        # Start tracking new window
-                        self.current_window = current_window_key
-                        self.start_time = time.time()
-                        
-                        # Get browser info if applicable
-                        browser_info = self.get_browser_tab_info(window_title, process_name)
-                        
-                        # Update session data
-                        self.session_data[current_window_key].update({
-                            'window_title': window_title,
-                            'process_name': process_name,
-                            'process_id': process_id,
-                            'browser_info': browser_info
-                        })
-                        
-                        print(f"🔄 Active window: {process_name} - {window_title[:50]}...")
-                
-                time.sleep(check_interval)
-                
-            except Exception as e:
-                print(f"❌ Error in tracking loop: {e}")
-                time.sleep(check_interval)
+        with self.lock:
+            # Same window as before
+            if current_window_key == self.current_window:
+                return
+            
+            # Log time for previous window
+            if self.current_window and self.start_time:
+                self._log_window_time(event['timestamp'])
+            
+            # Start tracking new window
+            self.current_window = current_window_key
+            self.start_time = event['timestamp']
+            
+            # Get browser info if applicable
+            browser_info = self.get_browser_tab_info(window_title, process_name)
+            
+            # Register window (interned once, metadata refreshed)
+            is_new_window = current_window_key not in self.intervals.key_ids
+            self.current_key_id = self.intervals.intern(
+                current_window_key, process_name, window_title, event.get('process_id'), browser_info
+            )
+            if is_new_window and self.checkpoint:
+                self._checkpoint_window(self.current_key_id, self.intervals.windows[self.current_key_id])
+        
+        if self.verbose:
+            print(f"🔄 Active window: {process_name} - {window_title[:50]}...")
+    
+    def _close_current_window(self):
+        """Log the focused window's open interval and forget it"""
+        with self.lock:
+            if self.current_window and self.start_time:
+                self._log_window_time()
+            self.current_window = None
+            self.current_key_id = None
+            self.start_time = None
     
-    def _log_window_time(self):
+    def _log_window_time(self, end_time=None):
         """Log time spent on current window"""
         if not self.current_window or not self.start_time:
             return
             
-        duration = time.time() - self.start_time
-        current_time = datetime.now().isoformat()
-        
-        # Add to total time
-        self.session_data[self.current_window]['total_time'] += duration
-        
-        # Add session entry
-        session_entry = {
-            'start_time': datetime.fromtimestamp(self.start_time).isoformat(),
-            'end_time': current_time,
-            'duration': duration
-        }
-        
-        self.session_data[self.current_window]['sessions'].append(session_entry)
+        # Add focus interval (updates the window's total time)
+        end_time = end_time or self._now()
+        self.intervals.append(self.current_key_id, self.start_time, end_time)
+        if self.checkpoint:
+            try:
+                self.checkpoint.append({'type': 'interval', 'k': self.current_key_id, 's': self.start_time, 'e': end_time})
+            except OSError as e:
+                print(f"❌ Error writing activity checkpoint: {e}")
     
-    def get_activity_export_data(self):
+    def iter_activity_records(self):
+        """Yield one export record per focus interval, grouped by window"""
+        positions_by_key = self.intervals.intervals_by_key()
+        for key_id, data, _ in self.intervals.focused_windows():
+            for position in positions_by_key[key_id]:
+                session = self.intervals.session(position)
+                duration = session['duration']
+                yield {
+                    'window_title': data['window_title'],
+                    'process_name': data['process_name'],
+                    'browser_url': data['browser_info'].get('domain'),
+                    'domain': data['browser_info'].get('domain'),
+                    'tab_title': data['browser_info'].get('tab_title'),
+                    'start_time': session['start_time'],
+                    'end_time': session['end_time'],
+                    'duration_seconds': duration,
+                    'duration_formatted': self._format_duration(duration)
+                }
+    
+    def get_activity_export_data(self, stream=False):
         """
         Get activity data in S3-ready format for export
         Returns dict with complete session data and summary - FOCUS TIME ONLY
+        
+        Args:
+            stream: Leave 'detailed_activities' as a generator for json_stream
+                    instead of building the list of records
         """
         logger.info("📊 [get_activity_export_data] Preparing activity data for S3 export")
         
-        activities = []
-        total_duration = 0
-        
-        # Convert session_data to exportable format (focus time only)
-        for window_key, data in self.session_data.items():
-            if data['total_time'] > 0:  # Only include windows that had focus time
-                
-                # Create activity record for each session
-                for session in data['sessions']:
-                    duration = session['duration']
-                    total_duration += duration
-                    
-                    activity_record = {
-                        'window_title': data['window_title'],
-                        'process_name': data['process_name'],
-                        'browser_url': data['browser_info'].get('domain'),
-                        'domain': data['browser_info'].get('domain'),
-                        'tab_title': data['browser_info'].get('tab_title'),
-                        'start_time': session['start_time'],
-                        'end_time': session['end_time'],
-                        'duration_seconds': duration,
-                        'duration_formatted': self._format_duration(duration)
-                    }
-                    activities.append(activity_record)
+        # Convert focus intervals to exportable format (focus time only)
+        if stream:
+            activities = self.iter_activity_records()
+            activity_count = len(self.intervals)
+            total_duration = 0
+            for _, _, window_total in self.intervals.focused_windows():
+                total_duration += window_total
+        else:
+            activities = list(self.iter_activity_records())
+            activity_count = len(activities)
+            total_duration = 0
+            for activity in activities:
+                total_duration += activity['duration_seconds']
         
         # Get session summary data
         summary = self.get_session_summary()
@@ -220,7 +351,7 @@ class ActiveWindowTracker:
             'export_timestamp': datetime.now().isoformat(),
             'session_duration_seconds': total_duration,
             'session_duration_formatted': self._format_duration(total_duration),
-            'total_applications': len([w for w in self.session_data.values() if w['total_time'] > 0]),
+            'total_applications': sum(1 for _ in self.intervals.focused_windows()),
             'focus_time_tracking': True,  # Indicates this tracks only focus time
             'summary_by_application': summary,
             'detailed_activities': activities,
@@ -229,55 +360,64 @@ class ActiveWindowTracker:
         }
         
         logger.info("📦 Activity export data prepared: %d focus sessions, %.1f minutes total focus time", 
-                   len(activities), total_duration/60)
+                   activity_count, total_duration/60)
         return export_data
 
     def get_session_summary(self):
-        """Get summary of current tracking session"""
-        # Log current window time before generating summary
-        if self.current_window and self.start_time:
-            self._log_window_time()
-            # Restart timing for current window
-            self.start_time = time.time()
-        
-        # Aggregate by process name instead of window key
-        program_totals = defaultdict(lambda: {
-            'total_time': 0,
-            'window_titles': set(),
-            'browser_info': {},
-            'sessions': []
-        })
+        """
+        Get summary of current tracking session
         
-        total_session_time = 0
+        Built from the running per-program aggregates of the interval store, whose
+        title lists and top-K counters are bounded, so it costs O(number of programs).
+        The focused window's open interval is counted up to now without closing it.
+        """
+        # Current window's open interval
+        live_window = None
+        live_seconds = 0
+        if self.current_window and self.start_time and self.current_key_id is not None:
+            live_window = self.intervals.windows[self.current_key_id]
+            live_seconds = max(0, self._now() - self.start_time)
         
-        # Aggregate all window sessions by process name
-        for window_key, data in self.session_data.items():
-            if data['total_time'] > 0:
-                process_name = data['process_name']
-                
-                # Add time to program total
-                program_totals[process_name]['total_time'] += data['total_time']
-                program_totals[process_name]['window_titles'].add(data['window_title'])
-                program_totals[process_name]['sessions'].extend(data['sessions'])
-                
-                # Keep browser info if available
-                if data.get('browser_info', {}).get('is_browser'):
-                    program_totals[process_name]['browser_info'] = data['browser_info']
-                
-                total_session_time += data['total_time']
+        programs = dict(self.intervals.programs)
+        if live_window and live_window['process_name'] not in programs:
+            programs[live_window['process_name']] = self.intervals.program_aggregate()
         
-        # Convert to summary format
         summary = []
-        for process_name, data in program_totals.items():
-            if data['total_time'] > 0:
+        total_session_time = 0
+        for process_name, data in programs.items():
+            total_time = data['total_time']
+            window_titles = list(data['window_titles'])
+            browser_info = data['browser_info']
+            session_count = data['session_count']
+            
+            if live_window and live_seconds > 0 and live_window['process_name'] == process_name:
+                total_time += live_seconds
+                session_count += 1
+                if (live_window['window_title'] not in data['window_titles']
+                        and len(window_titles) < WINDOW_TITLES_PER_PROGRAM):
+                    window_titles.append(live_window['window_title'])
+                if live_window['browser_info'].get('is_browser'):
+                    browser_info = live_window['browser_info']
+            
+            if total_time > 0:
+                total_session_time += total_time
                 entry = {
                     'process_name': process_name,
-                    'window_title': list(data['window_titles'])[0] if data['window_titles'] else '',
-                    'all_window_titles': list(data['window_titles']),
-                    'total_time_seconds': round(data['total_time'], 2),
-                    'total_time_formatted': self._format_duration(data['total_time']),
-                    'browser_info': data['browser_info'],
-                    'session_count': len(data['sessions'])
+                    'window_title': window_titles[0] if window_titles else '',
+                    'all_window_titles': window_titles,
+                    'total_time_seconds': round(total_time, 2),
+                    'total_time_formatted': self._format_duration(total_time),
+                    'browser_info': browser_info,
+                    'session_count': session_count,
+                    # Titles / domains that took the most focus time (closed intervals)
+                    'top_window_titles': [
+                        {'title': title, 'seconds': round(seconds, 1)}
+                        for title, seconds, _ in data['top_titles'].top()
+                    ],
+                    'top_domains': [
+                        {'domain': domain, 'seconds': round(seconds, 1)}
+                        for domain, seconds, _ in data['top_domains'].top()
+                    ]
                 }
                 summary.append(entry)
         
@@ -296,18 +436,18 @@ class ActiveWindowTracker:
         """Get detailed report with all sessions"""
         summary = self.get_session_summary()
         
+        positions_by_key = self.intervals.intervals_by_key()
         detailed_apps = []
-        for window_key, data in self.session_data.items():
-            if data['total_time'] > 0:
-                app_detail = {
-                    'process_name': data['process_name'],
-                    'window_title': data['window_title'],
-                    'total_time_seconds': round(data['total_time'], 2),
-                    'total_time_formatted': self._format_duration(data['total_time']),
-                    'browser_info': data.get('browser_info', {}),
-                    'sessions': data['sessions']
-                }
-                detailed_apps.append(app_detail)
+        for key_id, data, window_total in self.intervals.focused_windows():
+            app_detail = {
+                'process_name': data['process_name'],
+                'window_title': data['window_title'],
+                'total_time_seconds': round(window_total, 2),
+                'total_time_formatted': self._format_duration(window_total),
+                'browser_info': data.get('browser_info', {}),
+                'sessions': [self.intervals.session(position) for position in positions_by_key[key_id]]
+            }
+            detailed_apps.append(app_detail)
         
         # Sort by total time (descending)
         detailed_apps.sort(key=lambda x: x['total_time_seconds'], reverse=True)
@@ -333,8 +473,9 @@ class ActiveWindowTracker:
     
     def reset_session(self):
         """Reset tracking data for new session"""
-        self.session_data.clear()
+        self.intervals.clear()
         self.current_window = None
+        self.current_key_id = None
         self.start_time = None
         print("🔄 Session data reset")
 
@@ -348,11 +489,18 @@ def get_tracker():
         _tracker_instance = ActiveWindowTracker()
     return _tracker_instance
 
-def start_active_window_tracking():
-    """Start active window tracking"""
+def start_active_window_tracking(email=None, task_name=None):
+    """
+    Start active window tracking
+    
+    Args:
+        email, task_name: Owner of the activity; when given, it is checkpointed for crash recovery
+    """
     global window_tracker
     window_tracker = get_tracker()
     window_tracker.start_tracking()
+    if email:
+        window_tracker.start_checkpoint(email, task_name or "General_Activity")
     return window_tracker
 
 def stop_active_window_tracking():
@@ -380,8 +528,8 @@ def upload_current_activity_to_s3(email, task_name="General_Activity"):
         return None
     
     try:
-        # Get activity data for export
-        activity_data = window_tracker.get_activity_export_data()
+        # Get activity data for export, records are streamed into the upload body
+        activity_data = window_tracker.get_activity_export_data(stream=True)
         
         # Import here to avoid circular imports
         from .s3_uploader import upload_activity_data_direct
@@ -391,6 +539,7 @@ def upload_current_activity_to_s3(email, task_name="General_Activity"):
         
         if s3_url:
             logger.info("✅ Activity data uploaded to S3: %s", s3_url)
+            window_tracker.discard_checkpoint()
         else:
             logger.error("❌ Failed to upload activity data to S3")
             
@@ -401,6 +550,70 @@ def upload_current_activity_to_s3(email, task_name="General_Activity"):
         return None
 
 
+def rebuild_activity_tracker(path):
+    """
+    Replay an activity checkpoint log into a stopped tracker
+    
+    Returns:
+        tuple: (ActiveWindowTracker, start record) - start record is None if missing
+    """
+    tracker = ActiveWindowTracker(event_source=None, verbose=False)
+    header = None
+    key_ids = {}
+    for record in iter_checkpoint(path):
+        kind = record.get('type')
+        if kind == 'start':
+            header = record
+            tracker.tracking_start_time = datetime.fromisoformat(record['tracking_started'])
+        elif kind == 'window':
+            process_name, window_title = record['process'], record['title']
+            key_ids[record['k']] = tracker.intervals.intern(
+                f"{process_name}|{window_title}", process_name, window_title, record.get('pid'),
+                tracker.get_browser_tab_info(window_title, process_name)
+            )
+        elif kind == 'interval' and record['k'] in key_ids:
+            tracker.intervals.append(key_ids[record['k']], record['s'], record['e'])
+    return tracker, header
+
+def recover_activity_checkpoints():
+    """
+    Upload activity left in checkpoint logs by a previous run
+    
+    Returns:
+        int: number of sessions recovered and uploaded
+    """
+    active = set()
+    if _tracker_instance and _tracker_instance.checkpoint:
+        active.add(os.path.abspath(_tracker_instance.checkpoint.path))
+    
+    recovered = 0
+    for path in list_checkpoints('activity', exclude=active):
+        # Locked: a running session (possibly in another process) still writes it
+        fd = claim_checkpoint(path)
+        if fd is None:
+            continue
+        uploaded = False
+        try:
+            tracker, header = rebuild_activity_tracker(path)
+            if header is None:
+                # Nothing but a torn header, nothing to upload
+                uploaded = True
+                continue
+            
+            logger.info("♻️ Recovering activity of %s - %s", header['email'], header['task_name'])
+            activity_data = tracker.get_activity_export_data(stream=True)
+            activity_data['recovered_from_checkpoint'] = True
+            
+            from .s3_uploader import upload_activity_data_direct
+            uploaded = bool(upload_activity_data_direct(activity_data, header['email'], header['task_name']))
+            if uploaded:
+                recovered += 1
+        except Exception as e:
+            logger.error("❌ Could not recover activity checkpoint %s: %s", path, e)
+        finally:
+            release_checkpoint(path, fd, remove=uploaded)
+    return recovered
+
 def get_current_activity_summary():
     """Get current activity summary"""
     global window_tracker
@@ -413,6 +626,10 @@ def get_detailed_activity_report():
     tracker = get_tracker()
     return tracker.get_detailed_report()
 
+def get_window_tracking_stats():
+    """Get wakeup, CPU time and name cache stats of the active window tracker"""
+    return get_tracker().get_tracking_stats()
+
 if __name__ == "__main__":
     # Test the tracker
     print("🧪 Testing Active Window Tracker")
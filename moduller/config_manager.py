@@ -63,7 +63,89 @@ class ConfigManager:
                 "quality": 85,
                 "format": "JPEG",
                 "auto_upload": True,
-                "folder_structure": "users_screenshots/{date}/{email}/{task}/"
+                "folder_structure": "users_screenshots/{date}/{email}/{task}/",
+                "upload_queue": {
+                    "max_size": int(os.getenv('SCREENSHOT_UPLOAD_QUEUE_SIZE', 8)),
+                    "workers": int(os.getenv('SCREENSHOT_UPLOAD_WORKERS', 2)),
+                    "policy": os.getenv('SCREENSHOT_BACKPRESSURE_POLICY', 'drop_oldest'),
+                    "pause_timeout_seconds": 30
+                },
+                "dedup": {
+                    "enabled": os.getenv('SCREENSHOT_DEDUP', 'True') == 'True',
+                    "max_distance": int(os.getenv('SCREENSHOT_DEDUP_MAX_DISTANCE', 4)),
+                    "hash_size": 8
+                },
+                # Capture every display as its own frame (key suffix _m<index>) instead of the primary only
+                "multi_monitor": os.getenv('SCREENSHOT_MULTI_MONITOR', 'False') == 'True',
+                # "auto" starts at "standard" (format/quality above) and steps down the
+                # profile list when encoding exceeds cpu_budget_ms per frame
+                "profile": os.getenv('SCREENSHOT_PROFILE', 'auto'),
+                "cpu_budget_ms": int(os.getenv('SCREENSHOT_CPU_BUDGET_MS', 250)),
+                "profiles": {
+                    "balanced": {"format": "WEBP", "quality": 75, "method": 2, "scale": 1.0, "grayscale": False},
+                    "light": {"format": "WEBP", "quality": 65, "method": 0, "scale": 0.75, "grayscale": False},
+                    "minimal": {"format": "WEBP", "quality": 50, "method": 0, "scale": 0.5, "grayscale": True}
+                },
+                # Encode (and optionally grab) in a separate process so Flask stays responsive
+                "encoder_process": {
+                    "enabled": os.getenv('SCREENSHOT_ENCODER_PROCESS', 'True') == 'True',
+                    "grab_in_worker": os.getenv('SCREENSHOT_GRAB_IN_WORKER', 'False') == 'True'
+                },
+                # Upload only the tiles that changed since the last keyframe
+                "delta": {
+                    "enabled": os.getenv('SCREENSHOT_DELTA', 'False') == 'True',
+                    "tile_size": 64,
+                    "keyframe_interval": int(os.getenv('SCREENSHOT_KEYFRAME_INTERVAL', 20)),
+                    "pixel_threshold": 12,
+                    "max_changed_ratio": 0.5
+                },
+                # Append frames to rolling video segments (OpenCV) instead of one object per frame
+                "timelapse": {
+                    "enabled": os.getenv('SCREENSHOT_TIMELAPSE', 'False') == 'True',
+                    "segment_minutes": int(os.getenv('SCREENSHOT_TIMELAPSE_SEGMENT_MINUTES', 15)),
+                    "fps": 2,
+                    "codec": "mp4v"
+                }
+            },
+            # Every S3-bound payload is written here first and retried until uploaded
+            "upload_spool": {
+                "enabled": os.getenv('UPLOAD_SPOOL', 'True') == 'True',
+                "directory": os.getenv('UPLOAD_SPOOL_DIR', 'data/upload_spool'),
+                "max_megabytes": int(os.getenv('UPLOAD_SPOOL_MAX_MB', 500)),
+                "base_backoff_seconds": 5,
+                "max_backoff_seconds": 600
+            },
+            # One shared background process scan for the tracker and the API
+            "process_sampler": {
+                "interval_seconds": int(os.getenv('PROCESS_SAMPLER_INTERVAL', 15)),
+                "max_staleness_seconds": int(os.getenv('PROCESS_SAMPLER_MAX_STALENESS', 30))
+            },
+            # Foreground-window tracking: event source (auto = WinEvent hook where available,
+            # else polling; replay = play back replay_trace) and optional trace recording.
+            # Polling backs off from poll_interval_seconds to max_poll_interval_seconds (the
+            # accuracy bound) while the same window stays focused.
+            "window_tracking": {
+                "event_source": os.getenv('WINDOW_EVENT_SOURCE', 'auto'),
+                "poll_interval_seconds": 1,
+                "max_poll_interval_seconds": float(os.getenv('WINDOW_POLL_MAX_INTERVAL', 5)),
+                "poll_backoff": 1.5,
+                "replay_trace": os.getenv('WINDOW_REPLAY_TRACE', ''),
+                "replay_speed": float(os.getenv('WINDOW_REPLAY_SPEED', 1000)),
+                "record_trace": os.getenv('WINDOW_RECORD_TRACE', '')
+            },
+            # Program tracking sessions upload a rolling delta segment every segment_minutes
+            "program_tracking": {
+                "segment_minutes": float(os.getenv('PROGRAM_SEGMENT_MINUTES', 15))
+            },
+            # Activity exports: compact JSON streamed through gzip (.json.gz) instead of indented .json
+            "activity_export": {
+                "compress": os.getenv('ACTIVITY_EXPORT_COMPRESS', 'True') == 'True'
+            },
+            # Write-ahead logs of running tracking sessions, replayed and uploaded after a crash
+            "checkpoint": {
+                "enabled": os.getenv('SESSION_CHECKPOINT', 'True') == 'True',
+                "directory": os.getenv('SESSION_CHECKPOINT_DIR', 'data/checkpoints'),
+                "fsync_interval_seconds": 30
             },
             "features": {
                 "ai_analysis": True,
@@ -233,6 +315,79 @@ class ConfigManager:
         screenshot_config = self.get_screenshot_config()
         return screenshot_config.get('interval_seconds', 60)
     
+    def get_screenshot_upload_queue_config(self) -> Dict[str, Any]:
+        """Get screenshot upload queue settings (size, workers, backpressure policy)"""
+        screenshot_config = self.get_screenshot_config()
+        return screenshot_config.get('upload_queue', self.default_config['screenshot']['upload_queue'])
+    
+    def get_screenshot_dedup_config(self) -> Dict[str, Any]:
+        """Get screenshot deduplication settings (perceptual hash distance)"""
+        screenshot_config = self.get_screenshot_config()
+        return screenshot_config.get('dedup', self.default_config['screenshot']['dedup'])
+    
+    def get_screenshot_profiles(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get screenshot encoding profiles, ordered from most to least expensive.
+        The "standard" profile is built from the top-level format and quality.
+        """
+        screenshot_config = self.get_screenshot_config()
+        profiles = {
+            "standard": {
+                "format": screenshot_config.get('format', 'JPEG'),
+                "quality": screenshot_config.get('quality', 85),
+                "method": 4,
+                "scale": 1.0,
+                "grayscale": False
+            }
+        }
+        profiles.update(screenshot_config.get('profiles', self.default_config['screenshot']['profiles']))
+        return profiles
+    
+    def get_screenshot_encoder_process_config(self) -> Dict[str, Any]:
+        """Get settings of the separate screenshot encoder process"""
+        screenshot_config = self.get_screenshot_config()
+        return screenshot_config.get('encoder_process', self.default_config['screenshot']['encoder_process'])
+    
+    def get_screenshot_delta_config(self) -> Dict[str, Any]:
+        """Get tile-diff delta encoding settings (tile size, keyframe interval)"""
+        screenshot_config = self.get_screenshot_config()
+        return screenshot_config.get('delta', self.default_config['screenshot']['delta'])
+    
+    def get_screenshot_timelapse_config(self) -> Dict[str, Any]:
+        """Get timelapse container settings (segment length, fps, codec)"""
+        screenshot_config = self.get_screenshot_config()
+        return screenshot_config.get('timelapse', self.default_config['screenshot']['timelapse'])
+    
+    def get_upload_spool_config(self) -> Dict[str, Any]:
+        """Get durable upload spool settings (directory, disk quota, retry backoff)"""
+        config = self.get_config()
+        return config.get('upload_spool', self.default_config['upload_spool'])
+    
+    def get_process_sampler_config(self) -> Dict[str, Any]:
+        """Get shared process sampler settings (scan interval, max snapshot staleness)"""
+        config = self.get_config()
+        return config.get('process_sampler', self.default_config['process_sampler'])
+    
+    def get_window_tracking_config(self) -> Dict[str, Any]:
+        """Get foreground-window tracking settings (event source, polling, trace record/replay)"""
+        config = self.get_config()
+        return config.get('window_tracking', self.default_config['window_tracking'])
+    
+    def get_program_tracking_config(self) -> Dict[str, Any]:
+        """Get program tracking settings (rolling segment length)"""
+        config = self.get_config()
+        return config.get('program_tracking', self.default_config['program_tracking'])
+    
+    def get_activity_export_config(self) -> Dict[str, Any]:
+        """Get activity export settings (gzip streaming)"""
+        config = self.get_config()
+        return config.get('activity_export', self.default_config['activity_export'])
+    
+    def get_checkpoint_config(self) -> Dict[str, Any]:
+        """Get session checkpoint settings (directory, fsync interval)"""
+        config = self.get_config()
+        return config.get('checkpoint', self.default_config['checkpoint'])
+    
     def update_config_cache(self, new_config: Dict[str, Any]):
         """Update the cached configuration"""
         self.config_cache = new_config
@@ -250,7 +405,9 @@ class ConfigManager:
             "screenshot": {
                 "interval_seconds": config.get('screenshot', {}).get('interval_seconds', 60),
                 "quality": config.get('screenshot', {}).get('quality', 85),
-                "format": config.get('screenshot', {}).get('format', 'JPEG')
+                "format": config.get('screenshot', {}).get('format', 'JPEG'),
+                "profile": config.get('screenshot', {}).get('profile', 'auto'),
+                "multi_monitor": config.get('screenshot', {}).get('multi_monitor', False)
             },
             "features": config.get('features', {})
         }
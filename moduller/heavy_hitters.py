@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Heavy Hitters
+Weighted Space-Saving counters: keeps at most `capacity` items and their
+weights (here focus seconds), no matter how many distinct items are offered.
+An item that is not tracked replaces the smallest counter and inherits its
+weight as overestimation error, so every item heavier than total/capacity is
+guaranteed to be kept and the top entries are the ones that took the most time.
+"""
+
+
+class SpaceSaving:
+    __slots__ = ("capacity", "counters", "total")
+
+    def __init__(self, capacity=10):
+        """
+        Args:
+            capacity: Most items tracked at once
+        """
+        self.capacity = max(1, int(capacity))
+        # item -> [weight, error]
+        self.counters = {}
+        self.total = 0.0
+
+    def offer(self, item, weight=1.0):
+        """Add weight to an item, evicting the lightest counter if it is not tracked and the table is full"""
+        if weight <= 0:
+            return
+        self.total += weight
+        counter = self.counters.get(item)
+        if counter is not None:
+            counter[0] += weight
+        elif len(self.counters) < self.capacity:
+            self.counters[item] = [weight, 0.0]
+        else:
+            # O(capacity) scan, capacity is small
+            smallest = min(self.counters, key=lambda key: self.counters[key][0])
+            floor = self.counters.pop(smallest)[0]
+            self.counters[item] = [floor + weight, floor]
+
+    def top(self, n=None):
+        """
+        Heaviest items first
+
+        Returns:
+            list of (item, weight, error) tuples; the true weight lies in [weight - error, weight]
+        """
+        ranked = sorted(self.counters.items(), key=lambda entry: entry[1][0], reverse=True)
+        return [(item, weight, error) for item, (weight, error) in ranked[:n]]
+
+    def __len__(self):
+        return len(self.counters)
+
+    def __contains__(self, item):
+        return item in self.counters
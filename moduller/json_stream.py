@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+JSON Stream
+Generator-based JSON writer for large exports. iter_json() walks a document
+and yields compact JSON text piece by piece; any generator or iterator in it
+(e.g. the detailed activity records) is written as an array without ever being
+materialised as a list, each of its items encoded in one C encoder call. gzip_json_body() pipes those pieces through gzip, so
+the compressed upload body is the only complete copy of the payload in memory,
+instead of the export dict, its indent=2 string and the encoded bytes.
+
+Compare peak memory and time with the dict + json.dumps(indent=2) path:
+    python -m benchmarks.json_stream
+"""
+
+import io
+import gzip
+import json
+
+# Text is handed to gzip in chunks of about this many characters
+STREAM_CHUNK_CHARS = 64 * 1024
+
+_encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+
+
+def iter_json(obj):
+    """
+    Yield the compact JSON text of obj in pieces
+
+    Args:
+        obj: dict / list / tuple / scalar; generators and other iterators are written as arrays
+
+    Returns:
+        generator of str
+    """
+    if isinstance(obj, dict):
+        yield '{'
+        first = True
+        for key, value in obj.items():
+            if not first:
+                yield ','
+            yield _encode(str(key))
+            yield ':'
+            yield from iter_json(value)
+            first = False
+        yield '}'
+    elif isinstance(obj, (str, int, float, bool)) or obj is None:
+        yield _encode(obj)
+    elif hasattr(obj, '__next__'):
+        # Lazy array: items are records, encode each one whole
+        yield '['
+        first = True
+        for item in obj:
+            yield _encode(item) if first else ',' + _encode(item)
+            first = False
+        yield ']'
+    elif isinstance(obj, (list, tuple)):
+        yield '['
+        first = True
+        for item in obj:
+            if not first:
+                yield ','
+            yield from iter_json(item)
+            first = False
+        yield ']'
+    else:
+        # Same failure json.dumps gives for unsupported types
+        yield _encode(obj)
+
+
+def write_json_gzip(obj, fileobj, compresslevel=6):
+    """
+    Stream obj as compact, gzip-compressed UTF-8 JSON into fileobj
+
+    Args:
+        obj: Document for iter_json
+        fileobj: Binary file object written to
+        compresslevel: gzip level (6 is zlib's default speed/size trade-off)
+
+    Returns:
+        int: Uncompressed JSON size in bytes
+    """
+    raw_bytes = 0
+    with gzip.GzipFile(fileobj=fileobj, mode='wb', compresslevel=compresslevel, mtime=0) as gz:
+        buffer = []
+        buffered = 0
+        for piece in iter_json(obj):
+            buffer.append(piece)
+            buffered += len(piece)
+            if buffered >= STREAM_CHUNK_CHARS:
+                data = ''.join(buffer).encode('utf-8')
+                gz.write(data)
+                raw_bytes += len(data)
+                buffer = []
+                buffered = 0
+        if buffer:
+            data = ''.join(buffer).encode('utf-8')
+            gz.write(data)
+            raw_bytes += len(data)
+    return raw_bytes
+
+
+def gzip_json_body(obj, compresslevel=6):
+    """
+    Serialise obj straight into a gzip-compressed upload body
+
+    Returns:
+        tuple: (compressed bytes, uncompressed JSON size in bytes)
+    """
+    body = io.BytesIO()
+    raw_bytes = write_json_gzip(obj, body, compresslevel)
+    return body.getvalue(), raw_bytes
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Minute Bitmaps
+Per-day 1440-bit bitmaps (one bit per minute of the day) stored as Python int
+bitsets. Unique minutes are a popcount, roll-ups a bitwise OR and overlap a
+bitwise AND, instead of sets of "YYYY-MM-DDTHH:MM" strings.
+
+Benchmark against the set-based accounting:
+    python -m benchmarks.minute_bitmap
+"""
+
+MINUTES_PER_DAY = 1440
+
+
+def minute_index(timestamp):
+    """
+    Split an ISO timestamp into its day and minute of the day
+
+    Returns:
+        tuple: ("YYYY-MM-DD", 0..1439)
+    """
+    return timestamp[:10], int(timestamp[11:13]) * 60 + int(timestamp[14:16])
+
+
+class MinuteBitmap:
+    __slots__ = ("days",)
+
+    def __init__(self, days=None):
+        # day "YYYY-MM-DD" -> int with bit n set for minute n of that day
+        self.days = days if days is not None else {}
+
+    def add(self, timestamp):
+        """Mark the minute of an ISO timestamp"""
+        day, minute = minute_index(timestamp)
+        self.days[day] = self.days.get(day, 0) | (1 << minute)
+
+    def count(self):
+        """Number of distinct minutes (popcount over all days)"""
+        return sum(bits.bit_count() for bits in self.days.values())
+
+    def __len__(self):
+        return self.count()
+
+    def __or__(self, other):
+        days = dict(self.days)
+        for day, bits in other.days.items():
+            days[day] = days.get(day, 0) | bits
+        return MinuteBitmap(days)
+
+    def __and__(self, other):
+        return MinuteBitmap({
+            day: bits & other.days[day]
+            for day, bits in self.days.items()
+            if day in other.days and bits & other.days[day]
+        })
+
+    def minutes(self):
+        """Expand back to sorted "YYYY-MM-DDTHH:MM" strings"""
+        return [
+            f"{day}T{minute // 60:02d}:{minute % 60:02d}"
+            for day in sorted(self.days)
+            for minute in range(MINUTES_PER_DAY)
+            if self.days[day] >> minute & 1
+        ]
+
+    def to_json(self):
+        """Compact form: day -> hex string (at most 360 characters per day)"""
+        return {day: format(bits, "x") for day, bits in self.days.items()}
+
+    @classmethod
+    def from_json(cls, data):
+        return cls({day: int(bits, 16) for day, bits in data.items()})
+
+
+def rollup(bitmaps):
+    """OR several bitmaps: minutes in which any of them was active"""
+    result = MinuteBitmap()
+    for bitmap in bitmaps:
+        result = result | bitmap
+    return result
+
+
+def overlap_minutes(bitmap_a, bitmap_b):
+    """Minutes in which both were active (AND + popcount)"""
+    return (bitmap_a & bitmap_b).count()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Process Sampler
+One background sampler for every consumer of the running-process list. It
+rescans on an interval and keeps a versioned snapshot; readers get the cached
+snapshot unless it is older than their staleness limit. Name and exe of a
+process are looked up once per (pid, create_time) and cached, including
+AccessDenied results, so repeated scans only pay for new processes.
+"""
+
+import time
+import threading
+import logging
+from datetime import datetime
+
+import psutil
+
+from .config_manager import config_manager
+
+logger = logging.getLogger(__name__)
+
+
+class ProcessSampler:
+    def __init__(self, interval=15, max_staleness=30):
+        """
+        Args:
+            interval: Seconds between background scans
+            max_staleness: Default maximum snapshot age for readers, older snapshots are rescanned
+        """
+        self.interval = interval
+        self.max_staleness = max_staleness
+
+        self.snapshot = None
+        self.attribute_cache = {}
+        self.scan_lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+        self.stats = {
+            'scans': 0,
+            'on_demand_scans': 0,
+            'cache_hits': 0,
+            'cache_misses': 0,
+            'access_denied': 0,
+            'last_scan_ms': 0.0,
+            'total_scan_ms': 0.0
+        }
+
+    def start(self):
+        """Start background sampling"""
+        if self.thread and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._sample_loop, name="process-sampler", daemon=True)
+        self.thread.start()
+        logger.info("🔎 Process sampler started (every %ss, max staleness %ss)", self.interval, self.max_staleness)
+
+    def stop(self):
+        """Stop background sampling"""
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=5)
+            self.thread = None
+
+    def _sample_loop(self):
+        while not self.stop_event.is_set():
+            try:
+                self.get_snapshot(max_age=self.interval / 2)
+            except Exception as e:
+                logger.error("❌ Process sampler scan failed: %s", e)
+            self.stop_event.wait(self.interval)
+
+    def _lookup(self, proc, key):
+        """Get cached name/exe of a process, querying psutil only for new (pid, create_time)"""
+        attributes = self.attribute_cache.get(key)
+        if attributes is not None:
+            self.stats['cache_hits'] += 1
+            return attributes
+
+        self.stats['cache_misses'] += 1
+        attributes = {'name': None, 'exe': None}
+        try:
+            attributes['name'] = proc.name()
+            attributes['exe'] = proc.exe()
+        except psutil.AccessDenied:
+            # Remembered, so the denied lookup isn't retried every scan
+            self.stats['access_denied'] += 1
+        except (psutil.NoSuchProcess, psutil.ZombieProcess):
+            return None
+        self.attribute_cache[key] = attributes
+        return attributes
+
+    def _scan(self):
+        """Enumerate processes and build a new snapshot (scan_lock held)"""
+        started = time.perf_counter()
+        processes = []
+        seen = set()
+
+        for proc in psutil.process_iter(['pid', 'create_time']):
+            try:
+                key = (proc.info['pid'], proc.info['create_time'])
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+            attributes = self._lookup(proc, key)
+            if attributes is None:
+                continue
+            seen.add(key)
+            processes.append({
+                'pid': key[0],
+                'create_time': key[1],
+                'program': attributes['name'],
+                'path': attributes['exe']
+            })
+
+        # Forget exited processes
+        for key in self.attribute_cache.keys() - seen:
+            del self.attribute_cache[key]
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.stats['scans'] += 1
+        self.stats['last_scan_ms'] = elapsed_ms
+        self.stats['total_scan_ms'] += elapsed_ms
+
+        return {
+            'version': (self.snapshot['version'] + 1) if self.snapshot else 1,
+            'taken_at': datetime.now(),
+            'monotonic': time.monotonic(),
+            'processes': tuple(processes)
+        }
+
+    def get_snapshot(self, max_age=None):
+        """
+        Get the latest process snapshot, rescanning if it is older than max_age
+
+        Args:
+            max_age: Maximum age in seconds (default: configured max staleness)
+
+        Returns:
+            dict with version, taken_at, monotonic and processes (tuple of
+            {pid, create_time, program, path}; treat as read-only)
+        """
+        max_age = self.max_staleness if max_age is None else max_age
+        snapshot = self.snapshot
+        if snapshot and time.monotonic() - snapshot['monotonic'] <= max_age:
+            return snapshot
+
+        with self.scan_lock:
+            # Another caller may have rescanned while we waited
+            snapshot = self.snapshot
+            if snapshot and time.monotonic() - snapshot['monotonic'] <= max_age:
+                return snapshot
+            if threading.current_thread() is not self.thread:
+                self.stats['on_demand_scans'] += 1
+            self.snapshot = self._scan()
+            return self.snapshot
+
+    def get_stats(self):
+        """Get scan counts, scan cost and attribute cache hit ratio"""
+        stats = dict(self.stats)
+        lookups = stats['cache_hits'] + stats['cache_misses']
+        snapshot = self.snapshot
+        return {
+            'interval_seconds': self.interval,
+            'max_staleness_seconds': self.max_staleness,
+            'snapshot_version': snapshot['version'] if snapshot else None,
+            'snapshot_age_seconds': round(time.monotonic() - snapshot['monotonic'], 1) if snapshot else None,
+            'processes': len(snapshot['processes']) if snapshot else 0,
+            'cached_processes': len(self.attribute_cache),
+            'scans': stats['scans'],
+            'on_demand_scans': stats['on_demand_scans'],
+            'cache_hit_ratio': round(stats['cache_hits'] / lookups, 3) if lookups else 0.0,
+            'access_denied': stats['access_denied'],
+            'last_scan_ms': round(stats['last_scan_ms'], 1),
+            'avg_scan_ms': round(stats['total_scan_ms'] / stats['scans'], 1) if stats['scans'] else 0.0
+        }
+
+
+# Global sampler instance
+_sampler_instance = None
+_sampler_lock = threading.Lock()
+
+
+def get_process_sampler():
+    """Get global process sampler (started on first use)"""
+    global _sampler_instance
+    with _sampler_lock:
+        if _sampler_instance is None:
+            sampler_config = config_manager.get_process_sampler_config()
+            _sampler_instance = ProcessSampler(
+                interval=sampler_config.get('interval_seconds', 15),
+                max_staleness=sampler_config.get('max_staleness_seconds', 30)
+            )
+            _sampler_instance.start()
+    return _sampler_instance
@@ -2,6 +2,9 @@
 """
 Program Usage Aggregator
 Creates short, useful summaries of program usage with total time spent
+
+Titles and domains come from the tracker's per-program Space-Saving counters,
+ranked by focus seconds, and only the top few are kept per program.
 """
 
 import json
@@ -10,13 +13,17 @@ from datetime import datetime
 from collections import defaultdict
 from moduller.active_window_tracker import get_current_activity_summary
 
+# Titles / domains kept per program, heaviest by focus time first
+WINDOW_TITLES_KEPT = 3
+BROWSER_DOMAINS_KEPT = 5
+
 class ProgramUsageAggregator:
     def __init__(self):
         self.program_totals = defaultdict(lambda: {
             'total_time': 0,
             'last_seen': None,
-            'window_titles': set(),
-            'browser_domains': set(),
+            'window_titles': [],
+            'browser_domains': [],
             'is_browser': False
         })
         self.session_start = datetime.now()
@@ -38,28 +45,21 @@ class ProgramUsageAggregator:
                 self.program_totals[program_name]['total_time'] = app['total_time_seconds']
                 self.program_totals[program_name]['last_seen'] = current_time.isoformat()
                 
-                # Add all window titles
-                for title in app.get('all_window_titles', [app.get('window_title', '')]):
-                    if title:
-                        window_title = title[:100]  # Limit length
-                        self.program_totals[program_name]['window_titles'].add(window_title)
+                # Window titles that took the most time (limit length)
+                titles = [entry['title'][:100] for entry in app.get('top_window_titles', []) if entry['title']]
+                if not titles and app.get('window_title'):
+                    # Only the still-open first window so far
+                    titles = [app['window_title'][:100]]
+                self.program_totals[program_name]['window_titles'] = titles[:WINDOW_TITLES_KEPT]
                 
                 # Handle browser info
                 browser_info = app.get('browser_info', {})
                 if browser_info.get('is_browser'):
                     self.program_totals[program_name]['is_browser'] = True
-                    if browser_info.get('domain'):
-                        self.program_totals[program_name]['browser_domains'].add(browser_info['domain'])
-                
-                # Keep only last 3 window titles to avoid bloat
-                if len(self.program_totals[program_name]['window_titles']) > 3:
-                    titles_list = list(self.program_totals[program_name]['window_titles'])
-                    self.program_totals[program_name]['window_titles'] = set(titles_list[-3:])
-                
-                # Keep only last 5 domains to avoid bloat
-                if len(self.program_totals[program_name]['browser_domains']) > 5:
-                    domains_list = list(self.program_totals[program_name]['browser_domains'])
-                    self.program_totals[program_name]['browser_domains'] = set(domains_list[-5:])
+                    domains = [entry['domain'] for entry in app.get('top_domains', [])]
+                    if not domains and browser_info.get('domain'):
+                        domains = [browser_info['domain']]
+                    self.program_totals[program_name]['browser_domains'] = domains[:BROWSER_DOMAINS_KEPT]
             
             self.last_update = time.time()
             
@@ -76,19 +76,18 @@ class ProgramUsageAggregator:
         
         for program_name, data in self.program_totals.items():
             if data['total_time'] >= min_time_seconds:
-                # Convert sets to lists for JSON serialization
                 program_entry = {
                     "program": program_name,
                     "total_time_seconds": round(data['total_time'], 1),
                     "time_formatted": self._format_duration(data['total_time']),
-                    "window_titles": list(data['window_titles'])[:2],  # Only show 2 most recent
+                    "window_titles": data['window_titles'][:2],  # Only show the 2 longest-focused
                     "is_browser": data['is_browser'],
                     "last_seen": data['last_seen']
                 }
                 
                 # Add browser domains only if it's a browser
                 if data['is_browser'] and data['browser_domains']:
-                    program_entry["browser_domains"] = list(data['browser_domains'])[:3]  # Top 3 domains
+                    program_entry["browser_domains"] = data['browser_domains'][:3]  # Top 3 domains by time
                 
                 active_programs.append(program_entry)
                 total_session_time += data['total_time']
@@ -1,7 +1,11 @@
 from datetime import datetime
 from pathlib import Path
+from collections import defaultdict
 import logging
+import threading
+import time
 import boto3
+from botocore.config import Config as BotoConfig
 import os
 import io
 import json
@@ -9,16 +13,222 @@ from .config_manager import config_manager
 import io
 import json
 from .config_manager import config_manager
+from .upload_spool import get_upload_spool, SPOOL_PRIORITY_HIGH, SPOOL_PRIORITY_NORMAL, SPOOL_PRIORITY_LOW
+from .json_stream import gzip_json_body
 
 logger = logging.getLogger(__name__)
 
+# Shared S3 client pool settings (one pooled client per credential set)
+S3_MAX_POOL_CONNECTIONS = int(os.getenv("S3_MAX_POOL_CONNECTIONS", 10))
+S3_CONNECT_TIMEOUT = int(os.getenv("S3_CONNECT_TIMEOUT", 5))
+S3_READ_TIMEOUT = int(os.getenv("S3_READ_TIMEOUT", 30))
+
+# Bucket/region used by the helpers that go through get_s3_client() without explicit credentials
+_default_s3_config = config_manager.get_s3_credentials()
+S3_BUCKET_NAME = _default_s3_config.get("bucket_name", "ddsfocustime")
+S3_REGION = _default_s3_config.get("region", "us-east-1")
+
+_s3_clients = {}
+_s3_clients_lock = threading.Lock()
+_s3_stats_lock = threading.Lock()
+_s3_stats = defaultdict(lambda: {
+    'calls': 0,
+    'failures': 0,
+    'total_ms': 0.0,
+    'max_ms': 0.0,
+    'last_ms': 0.0
+})
+
+
+def get_s3_client(access_key=None, secret_key=None, region=None):
+    """
+    Get the shared, thread-safe S3 client for a credential set.
+    Clients are created once per process and reuse their connection pool,
+    so uploads don't pay for client construction and a TLS handshake every call.
+
+    Args:
+        access_key: AWS access key (default: from configuration manager)
+        secret_key: AWS secret key (default: from configuration manager)
+        region: AWS region (default: from configuration manager)
+
+    Returns:
+        botocore S3 client, or None if credentials are missing
+    """
+    if access_key is None and secret_key is None:
+        s3_config = config_manager.get_s3_credentials()
+        access_key = s3_config.get("access_key")
+        secret_key = s3_config.get("secret_key")
+        region = region or s3_config.get("region", "us-east-1")
+    region = region or "us-east-1"
+
+    if not access_key or not secret_key:
+        logger.error("❌ S3 credentials are missing, cannot create client")
+        return None
+
+    client_key = (access_key, secret_key, region)
+    client = _s3_clients.get(client_key)
+    if client is not None:
+        return client
+
+    with _s3_clients_lock:
+        client = _s3_clients.get(client_key)
+        if client is None:
+            started = time.perf_counter()
+            # boto3 sessions are not thread-safe, clients are: build under the lock, share afterwards
+            session = boto3.session.Session(
+                aws_access_key_id=access_key,
+                aws_secret_access_key=secret_key,
+                region_name=region
+            )
+            client = session.client('s3', config=BotoConfig(
+                max_pool_connections=S3_MAX_POOL_CONNECTIONS,
+                connect_timeout=S3_CONNECT_TIMEOUT,
+                read_timeout=S3_READ_TIMEOUT,
+                retries={'max_attempts': 3, 'mode': 'standard'},
+                tcp_keepalive=True
+            ))
+            _s3_clients[client_key] = client
+            _record_s3_latency("client_init", started, True)
+            logger.info("🔌 Created shared S3 client for region %s (pool size %d)", region, S3_MAX_POOL_CONNECTIONS)
+    return client
+
+
+def warm_up_s3_client():
+    """
+    Build the shared S3 client and open a pooled connection in the background,
+    so the first screenshot/log upload doesn't pay the handshake.
+    """
+    def warm_up():
+        try:
+            s3_config = config_manager.get_s3_credentials()
+            bucket = s3_config.get("bucket_name", "ddsfocustime")
+            s3 = get_s3_client()
+            if not s3:
+                return
+            _timed_s3_call("warm_up", s3.head_bucket, Bucket=bucket)
+            logger.info("🔥 S3 client warmed up for bucket %s", bucket)
+        except Exception as e:
+            logger.warning("⚠️ S3 warm-up failed: %s", e)
+
+    thread = threading.Thread(target=warm_up, daemon=True)
+    thread.start()
+    return thread
+
+
+def _record_s3_latency(operation, started, success):
+    """Record the latency of one S3 call under the given operation name"""
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    with _s3_stats_lock:
+        stats = _s3_stats[operation]
+        stats['calls'] += 1
+        if not success:
+            stats['failures'] += 1
+        stats['total_ms'] += elapsed_ms
+        stats['last_ms'] = elapsed_ms
+        stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+
+
+def _timed_s3_call(operation, func, *args, **kwargs):
+    """Run an S3 client call and record its latency under the operation name"""
+    started = time.perf_counter()
+    try:
+        result = func(*args, **kwargs)
+    except Exception:
+        _record_s3_latency(operation, started, False)
+        raise
+    _record_s3_latency(operation, started, True)
+    return result
+
+
+def _spool_payload(spool, operation, bucket, key, body, content_type, metadata, region, priority):
+    """Write a payload the caller uploads itself to the spool; returns the entry id, None if it couldn't"""
+    try:
+        return spool.write(bucket, key, body, content_type, metadata, region,
+                           priority=priority, operation=operation)
+    except OSError as e:
+        logger.error("❌ Could not spool %s, uploading without retry: %s", key, e)
+        return None
+
+
+def _put_object_spooled(operation, s3, bucket, key, body, content_type, metadata=None, region=None,
+                        priority=SPOOL_PRIORITY_NORMAL):
+    """
+    put_object backed by the durable upload spool.
+    HIGH-priority payloads (logs, program tracking) are spooled before the PUT, so
+    a crash mid-upload can't lose them; everything else is uploaded first and only
+    spooled if the upload fails, which keeps the fsyncs off the screenshot path.
+
+    A spooled payload counts as accepted: the drainer retries it until it reaches
+    the same key, so callers report success (their URL) either way.
+
+    Returns:
+        str: spool entry id if the upload failed and the payload was spooled, None if uploaded
+
+    Raises:
+        Exception: the upload error, only when the payload could not be spooled
+    """
+    spool = get_upload_spool()
+    entry_id = None
+    if spool and priority == SPOOL_PRIORITY_HIGH:
+        entry_id = _spool_payload(spool, operation, bucket, key, body, content_type, metadata, region, priority)
+
+    try:
+        if s3 is None:
+            raise RuntimeError("S3 client unavailable")
+        _timed_s3_call(
+            operation,
+            s3.put_object,
+            Bucket=bucket,
+            Key=key,
+            Body=body,
+            ContentType=content_type,
+            Metadata=metadata or {}
+        )
+    except Exception as e:
+        if spool and priority != SPOOL_PRIORITY_HIGH:
+            entry_id = _spool_payload(spool, operation, bucket, key, body, content_type, metadata, region,
+                                      priority)
+        if not entry_id:
+            raise
+        spool.mark_failed(entry_id, e)
+        logger.warning("⚠️ Upload of %s failed, queued for retry: %s", key, e)
+        return entry_id
+
+    if entry_id:
+        spool.remove(entry_id)
+    return None
+
+
+def get_s3_latency_stats():
+    """
+    Get per-operation S3 call latency counters
+
+    Returns:
+        dict: {operation: {calls, failures, avg_ms, max_ms, last_ms, total_ms}, ...}
+    """
+    with _s3_stats_lock:
+        return {
+            operation: {
+                'calls': stats['calls'],
+                'failures': stats['failures'],
+                'avg_ms': round(stats['total_ms'] / stats['calls'], 2) if stats['calls'] else 0.0,
+                'max_ms': round(stats['max_ms'], 2),
+                'last_ms': round(stats['last_ms'], 2),
+                'total_ms': round(stats['total_ms'], 2)
+            }
+            for operation, stats in _s3_stats.items()
+        }
+
 def upload_activity_data_direct(activity_data, email, task_name, file_extension="json"):
     """
     Upload activity tracking data directly to S3 following screenshot pattern
     Structure: logs/{date}/{email}/activity_{task_name}_{timestamp}.json (one file per session)
+    With activity_export.compress the body is compact JSON streamed through gzip
+    (see json_stream) and the key ends in .json.gz
     
     Args:
         activity_data: Dictionary containing activity tracking data
+                       ('detailed_activities' may be a generator)
         email: User email
         task_name: Task name for filename
         file_extension: File extension (default: "json")
@@ -48,41 +258,53 @@ def upload_activity_data_direct(activity_data, email, task_name, file_extension=
     date_folder = datetime.now().strftime("%Y-%m-%d")
     safe_email = email.replace("@", "_at_")
     safe_task_name = task_name.replace(" ", "_").replace("/", "_")
-    filename = f"activity_{safe_task_name}_{timestamp}.{file_extension}"
+    compress = config_manager.get_activity_export_config().get('compress', True)
+    if compress and not isinstance(activity_data, (dict, list)):
+        compress = False
+    filename = f"activity_{safe_task_name}_{timestamp}.{file_extension}{'.gz' if compress else ''}"
     
     # Structure: users_logs/{date}/{email}/{task}/activity_{timestamp}.json (consistent with screenshot structure)
     s3_key = f"users_logs/{date_folder}/{safe_email}/{safe_task_name}/{filename}"
 
     logger.info("👤 Email: %s", email)
     logger.info("📋 Task: %s", task_name)
-    logger.info("📊 Activity Data: %d applications tracked", len(activity_data.get('applications', [])))
+    if isinstance(activity_data, dict):
+        logger.info("📊 Activity Data: %d applications tracked", activity_data.get('total_applications', 0))
     logger.info("☁️ S3 key: %s", s3_key)
 
     try:
         # Convert activity data to JSON
-        if isinstance(activity_data, dict) or isinstance(activity_data, list):
-            activity_content = json.dumps(activity_data, indent=2, ensure_ascii=False)
+        if compress:
+            started = time.perf_counter()
+            activity_bytes, raw_bytes = gzip_json_body(activity_data)
+            content_type = 'application/gzip'
+            logger.info("🗜️ Activity JSON streamed: %d KB → %d KB gzip in %.0f ms",
+                        raw_bytes // 1024, len(activity_bytes) // 1024, (time.perf_counter() - started) * 1000)
         else:
-            activity_content = str(activity_data)
-        
-        activity_bytes = activity_content.encode('utf-8')
+            if isinstance(activity_data, dict) or isinstance(activity_data, list):
+                if isinstance(activity_data, dict) and not isinstance(activity_data.get('detailed_activities', []), list):
+                    activity_data = dict(activity_data, detailed_activities=list(activity_data['detailed_activities']))
+                activity_content = json.dumps(activity_data, indent=2, ensure_ascii=False)
+            else:
+                activity_content = str(activity_data)
+            activity_bytes = activity_content.encode('utf-8')
+            content_type = 'application/json'
 
-        session = boto3.Session(
-            aws_access_key_id=access_key,
-            aws_secret_access_key=secret_key,
-            region_name=region
-        )
-        s3 = session.client('s3')
+        s3 = get_s3_client(access_key, secret_key, region)
+        url = f"https://{bucket}.s3.{region}.amazonaws.com/{s3_key}"
         
         # Upload activity data directly to S3
-        s3.put_object(
-            Bucket=bucket,
-            Key=s3_key,
-            Body=activity_bytes,
-            ContentType='application/json'
+        _put_object_spooled(
+            "upload_activity_data_direct",
+            s3,
+            bucket,
+            s3_key,
+            activity_bytes,
+            content_type,
+            region=region,
+            priority=SPOOL_PRIORITY_HIGH
         )
 
-        url = f"https://{bucket}.s3.{region}.amazonaws.com/{s3_key}"
         logger.info("✅ Activity data upload successful: %s", url)
         return url
     except Exception as e:
@@ -145,19 +367,18 @@ def upload_logs_direct(log_data, email, task_name, log_type="session_log", file_
         
         log_bytes = log_content.encode('utf-8')
 
-        session = boto3.Session(
-            aws_access_key_id=access_key,
-            aws_secret_access_key=secret_key,
-            region_name=region
-        )
-        s3 = session.client('s3')
+        s3 = get_s3_client(access_key, secret_key, region)
         
         # Upload log data directly to S3
-        s3.put_object(
-            Bucket=bucket,
-            Key=s3_key,
-            Body=log_bytes,
-            ContentType='application/json'
+        _put_object_spooled(
+            "upload_logs_direct",
+            s3,
+            bucket,
+            s3_key,
+            log_bytes,
+            'application/json',
+            region=region,
+            priority=SPOOL_PRIORITY_HIGH
         )
 
         url = f"https://{bucket}.s3.{region}.amazonaws.com/{s3_key}"
@@ -168,7 +389,8 @@ def upload_logs_direct(log_data, email, task_name, log_type="session_log", file_
         return None
 
 
-def upload_screenshot_direct(image_bytes, email, task_name, file_extension="webp"):
+def upload_screenshot_direct(image_bytes, email, task_name, file_extension="webp", captured_at=None, metadata=None,
+                             key_suffix="", content_type=None, manifest=None):
     """
     Upload screenshot directly to S3 without saving to local file first
     
@@ -177,9 +399,16 @@ def upload_screenshot_direct(image_bytes, email, task_name, file_extension="webp
         email: User email
         task_name: Task name
         file_extension: File extension (default: webp)
+        captured_at: Capture datetime used for the key (default: now, uploads may be queued)
+        metadata: Optional dict of S3 object metadata
+        key_suffix: Appended to the timestamp in the file name (e.g. "_m2" for monitor 2)
+        content_type: Content type (default: image/<file_extension>)
+        manifest: Optional sidecar dict (delta tiles, timelapse frame index) uploaded after
+                  the object as {timestamp}{key_suffix}.json; if the object's upload fails it
+                  is spooled to follow the object's retry
     
     Returns:
-        str: S3 URL if successful, None if failed
+        str: S3 URL once uploaded or spooled for retry, None if failed
     """
     logger.info("📤 [upload_screenshot_direct] started")
 
@@ -205,36 +434,37 @@ def upload_screenshot_direct(image_bytes, email, task_name, file_extension="webp
         logger.error("❌ region: %s", "Present" if region else "Missing")
         return None
 
-    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    date_folder = datetime.now().strftime("%Y-%m-%d")
+    captured_at = captured_at or datetime.now()
+    timestamp = captured_at.strftime("%Y-%m-%d_%H-%M-%S")
+    date_folder = captured_at.strftime("%Y-%m-%d")
     safe_email = email.replace("@", "_at_")
     safe_task = task_name.replace(" ", "_").replace("/", "_")
-    filename = f"{timestamp}.{file_extension}"
+    filename = f"{timestamp}{key_suffix}.{file_extension}"
     s3_key = f"users_screenshots/{date_folder}/{safe_email}/{safe_task}/{filename}"
+    manifest_key = f"users_screenshots/{date_folder}/{safe_email}/{safe_task}/{timestamp}{key_suffix}.json"
 
     logger.info("👤 Email: %s", email)
     logger.info("📝 Task: %s", task_name)
     logger.info("☁️ S3 key: %s", s3_key)
 
     try:
-        session = boto3.Session(
-            aws_access_key_id=access_key,
-            aws_secret_access_key=secret_key,
-            region_name=region
-        )
-        s3 = session.client('s3')
+        s3 = get_s3_client(access_key, secret_key, region)
         
         # Upload bytes directly to S3
-        s3.put_object(
-            Bucket=bucket,
-            Key=s3_key,
-            Body=image_bytes,
-            ContentType=f'image/{file_extension}'
+        entry_id = _put_object_spooled(
+            "upload_screenshot_direct",
+            s3,
+            bucket,
+            s3_key,
+            image_bytes,
+            content_type or f'image/{file_extension}',
+            metadata={k: str(v) for k, v in (metadata or {}).items()},
+            region=region,
+            priority=SPOOL_PRIORITY_LOW
         )
 
         url = f"https://{bucket}.s3.{region}.amazonaws.com/{s3_key}"
         logger.info("✅ Direct upload successful: %s", url)
-        return url
     except Exception as e:
         if "InvalidAccessKeyId" in str(e):
             logger.error("❌ AWS ACCESS KEY INVALID: %s", str(e))
@@ -246,6 +476,34 @@ def upload_screenshot_direct(image_bytes, email, task_name, file_extension="webp
             logger.error("❌ Direct upload failed: %s", e)
         return None
 
+    # Sidecar manifest after its object, so it never points at a missing object
+    if manifest is None:
+        return url
+    manifest_body = json.dumps(manifest).encode('utf-8')
+    if entry_id:
+        # Object spooled: the drainer uploads the manifest once the object is up
+        try:
+            get_upload_spool().write(bucket, manifest_key, manifest_body, 'application/json',
+                                     region=region, priority=SPOOL_PRIORITY_LOW,
+                                     operation="upload_screenshot_direct", claim=False, after=entry_id)
+        except OSError as e:
+            logger.error("❌ Could not spool screenshot manifest %s: %s", manifest_key, e)
+        return url
+    try:
+        _put_object_spooled(
+            "upload_screenshot_direct",
+            s3,
+            bucket,
+            manifest_key,
+            manifest_body,
+            'application/json',
+            region=region,
+            priority=SPOOL_PRIORITY_LOW
+        )
+    except Exception as e:
+        logger.error("❌ Failed to upload screenshot manifest to S3: %s", e)
+    return url
+
 def upload_screenshot(local_path, email, task_name):
     logger.info("📤 [upload_screenshot] started")
 
@@ -286,13 +544,8 @@ def upload_screenshot(local_path, email, task_name):
     logger.info("☁️ S3 key: %s", s3_key)
 
     try:
-        session = boto3.Session(
-            aws_access_key_id=access_key,
-            aws_secret_access_key=secret_key,
-            region_name=region
-        )
-        s3 = session.client('s3')
-        s3.upload_file(str(local_path), bucket, s3_key)
+        s3 = get_s3_client(access_key, secret_key, region)
+        _timed_s3_call("upload_screenshot", s3.upload_file, str(local_path), bucket, s3_key)
 
         url = f"https://{bucket}.s3.{region}.amazonaws.com/{s3_key}"
         logger.info("✅ Upload successful: %s", url)
@@ -332,11 +585,15 @@ def upload_daily_log_file_to_s3(email, date, daily_log, task_name="general"):
         log_json = json.dumps(daily_log, indent=2, ensure_ascii=False)
         
         # Upload to S3
-        s3_client.put_object(
-            Bucket=S3_BUCKET_NAME,
-            Key=s3_key,
-            Body=log_json.encode('utf-8'),
-            ContentType='application/json'
+        _put_object_spooled(
+            "upload_daily_log_file_to_s3",
+            s3_client,
+            S3_BUCKET_NAME,
+            s3_key,
+            log_json.encode('utf-8'),
+            'application/json',
+            region=S3_REGION,
+            priority=SPOOL_PRIORITY_HIGH
         )
         
         s3_url = f"https://{S3_BUCKET_NAME}.s3.{S3_REGION}.amazonaws.com/{s3_key}"
@@ -369,7 +626,7 @@ def append_to_daily_log_file(email, activity_entry):
         
         try:
             # Try to get existing file
-            response = s3_client.get_object(Bucket=S3_BUCKET_NAME, Key=s3_key)
+            response = _timed_s3_call("append_to_daily_log_file", s3_client.get_object, Bucket=S3_BUCKET_NAME, Key=s3_key)
             existing_log = json.loads(response['Body'].read().decode('utf-8'))
         except s3_client.exceptions.NoSuchKey:
             # File doesn't exist, create new structure
@@ -388,7 +645,9 @@ def append_to_daily_log_file(email, activity_entry):
         log_json = json.dumps(existing_log, indent=2, ensure_ascii=False)
         
         # Upload updated file back to S3
-        s3_client.put_object(
+        _timed_s3_call(
+            "append_to_daily_log_file",
+            s3_client.put_object,
             Bucket=S3_BUCKET_NAME,
             Key=s3_key,
             Body=log_json.encode('utf-8'),
@@ -442,11 +701,15 @@ def upload_activity_log_to_s3(email, activity_log, task_name="general"):
         log_json = json.dumps(activity_log, indent=2, ensure_ascii=False)
         
         # Upload to S3
-        s3_client.put_object(
-            Bucket=S3_BUCKET_NAME,
-            Key=s3_key,
-            Body=log_json.encode('utf-8'),
-            ContentType='application/json'
+        _put_object_spooled(
+            "upload_activity_log_to_s3",
+            s3_client,
+            S3_BUCKET_NAME,
+            s3_key,
+            log_json.encode('utf-8'),
+            'application/json',
+            region=S3_REGION,
+            priority=SPOOL_PRIORITY_HIGH
         )
         
         s3_url = f"https://{S3_BUCKET_NAME}.s3.{S3_REGION}.amazonaws.com/{s3_key}"
@@ -505,23 +768,22 @@ def upload_program_tracking_to_s3(email, tracking_data, task_name="general"):
         # Convert tracking data to JSON
         tracking_json = json.dumps(tracking_data, indent=2, ensure_ascii=False)
         
-        # Create S3 client and upload
-        s3_client = boto3.client(
-            's3',
-            aws_access_key_id=access_key,
-            aws_secret_access_key=secret_key,
-            region_name=region
-        )
+        # Get the shared S3 client and upload
+        s3_client = get_s3_client(access_key, secret_key, region)
+        s3_url = f"https://{bucket}.s3.{region}.amazonaws.com/{s3_key}"
         
         # Upload to S3
-        s3_client.put_object(
-            Bucket=bucket,
-            Key=s3_key,
-            Body=tracking_json.encode('utf-8'),
-            ContentType='application/json'
+        _put_object_spooled(
+            "upload_program_tracking_to_s3",
+            s3_client,
+            bucket,
+            s3_key,
+            tracking_json.encode('utf-8'),
+            'application/json',
+            region=region,
+            priority=SPOOL_PRIORITY_HIGH
         )
         
-        s3_url = f"https://{bucket}.s3.{region}.amazonaws.com/{s3_key}"
         print(f"📊 Program tracking uploaded to S3: {s3_url}")
         return s3_url
         
@@ -532,6 +794,61 @@ def upload_program_tracking_to_s3(email, tracking_data, task_name="general"):
         return None
 
 
+def upload_program_tracking_segment(email, segment_data, task_name="general", sequence=1):
+    """
+    Upload one rolling segment (programs changed since the previous segment) of a
+    running program tracking session
+    Structure: logs/{session_date}/{safe_email}/{safe_task}/session_{start_time}_segments/segment_{sequence}.json
+    The final session_{start_time}_to_{end_time}.json manifest lists the segments.
+    Called from the tracker's segment worker, never the capture scheduler thread.
+    
+    Returns:
+        tuple: (S3 URL, S3 key) once uploaded or spooled, (None, None) if failed
+    """
+    try:
+        s3_config = config_manager.get_s3_credentials()
+        access_key = s3_config.get("access_key")
+        secret_key = s3_config.get("secret_key")
+        bucket = s3_config.get("bucket_name", "ddsfocustime")
+        region = s3_config.get("region", "us-east-1")
+
+        if not all([access_key, secret_key, bucket, region]):
+            print("❌ One or more AWS credentials are missing.")
+            return None, None
+            
+        # Skip the default task selection - use "general" instead
+        if task_name in ["-- İş Emri Seçin --", "-- Select a Task --", "--_İş_Emri_Seçin_--"]:
+            task_name = "general"
+        
+        # Segments of one session stay together even if it runs past midnight
+        session_start = datetime.fromisoformat(segment_data['session_start'].replace('Z', ''))
+        date_folder = session_start.strftime("%Y-%m-%d")
+        safe_email = email.replace('@', '_at_').replace('.', '_')
+        safe_task = task_name.replace(" ", "_").replace("/", "_").replace("-", "_")
+        s3_key = (f"logs/{date_folder}/{safe_email}/{safe_task}/"
+                  f"session_{session_start.strftime('%H-%M-%S')}_segments/segment_{sequence:03d}.json")
+        
+        body = json.dumps(segment_data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+        s3_url = f"https://{bucket}.s3.{region}.amazonaws.com/{s3_key}"
+        
+        _put_object_spooled(
+            "upload_program_tracking_segment",
+            get_s3_client(access_key, secret_key, region),
+            bucket,
+            s3_key,
+            body,
+            'application/json',
+            region=region,
+            priority=SPOOL_PRIORITY_HIGH
+        )
+        print(f"📊 Program tracking segment {sequence} uploaded to S3: {s3_url}")
+        return s3_url, s3_key
+        
+    except Exception as e:
+        print(f"❌ Failed to upload program tracking segment to S3: {e}")
+        return None, None
+
+
 def upload_daily_logs_report(email, report_data, report_type="session_complete"):
     """
     Upload daily logs report to S3 in JSON format
@@ -592,19 +909,18 @@ def upload_daily_logs_report(email, report_data, report_type="session_complete")
         json_data = json.dumps(report_data, indent=2, ensure_ascii=False)
         json_bytes = json_data.encode('utf-8')
 
-        session = boto3.Session(
-            aws_access_key_id=access_key,
-            aws_secret_access_key=secret_key,
-            region_name=region
-        )
-        s3 = session.client('s3')
+        s3 = get_s3_client(access_key, secret_key, region)
         
         # Upload JSON data directly to S3
-        s3.put_object(
-            Bucket=bucket,
-            Key=s3_key,
-            Body=json_bytes,
-            ContentType='application/json'
+        _put_object_spooled(
+            "upload_daily_logs_report",
+            s3,
+            bucket,
+            s3_key,
+            json_bytes,
+            'application/json',
+            region=region,
+            priority=SPOOL_PRIORITY_HIGH
         )
 
         url = f"https://{bucket}.s3.{region}.amazonaws.com/{s3_key}"
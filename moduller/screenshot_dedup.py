@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Screenshot Deduplication
+Skips screenshots that barely changed since the last uploaded frame, using a
+cheap downscaled perceptual hash (dHash) computed with NumPy.
+"""
+
+import threading
+import logging
+
+import numpy as np
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+
+def compute_perceptual_hash(img, hash_size=8):
+    """
+    Compute a difference hash (dHash) of a PIL image
+
+    The image is box-downscaled to (hash_size + 1) x hash_size grayscale and each
+    bit records whether a pixel is brighter than its right neighbour.
+
+    Returns:
+        int: hash_size * hash_size bit hash
+    """
+    small = img.convert('L').resize((hash_size + 1, hash_size), Image.Resampling.BOX)
+    pixels = np.asarray(small, dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def hamming_distance(hash_a, hash_b):
+    """Number of differing bits between two hashes"""
+    return (hash_a ^ hash_b).bit_count()
+
+
+class ScreenshotDeduplicator:
+    def __init__(self, max_distance=4, hash_size=8):
+        self.max_distance = max_distance
+        self.hash_size = hash_size
+        self.last_hash = None
+        self.last_uploaded_at = None
+        self.last_uploaded_bytes = 0
+        self.markers = []
+        self.lock = threading.Lock()
+
+        self.stats = {
+            'frames': 0,
+            'uploaded': 0,
+            'skipped': 0,
+            'bytes_uploaded': 0,
+            'bytes_saved': 0
+        }
+
+    def reference(self):
+        """Get (last_hash, max_distance, hash_size) for hashing frames elsewhere"""
+        with self.lock:
+            return (self.last_hash, self.max_distance, self.hash_size)
+
+    def is_duplicate(self, frame_hash, captured_at):
+        """
+        Check a frame against the last uploaded one. Duplicates are counted and
+        recorded as an "unchanged since" marker instead of being uploaded.
+
+        Returns:
+            bool: True if the frame should be skipped
+        """
+        with self.lock:
+            self.stats['frames'] += 1
+            if self.last_hash is None:
+                return False
+
+            distance = hamming_distance(frame_hash, self.last_hash)
+            if distance > self.max_distance:
+                return False
+
+            self.stats['skipped'] += 1
+            # The frame was never encoded, estimate its size from the last uploaded one
+            self.stats['bytes_saved'] += self.last_uploaded_bytes
+            self.markers.append({
+                'captured_at': captured_at.isoformat(),
+                'unchanged_since': self.last_uploaded_at.isoformat(),
+                'distance': distance
+            })
+            return True
+
+    def record_upload(self, frame_hash, size_bytes, captured_at):
+        """Remember the frame that was sent for upload as the new reference"""
+        with self.lock:
+            self.last_hash = frame_hash
+            self.last_uploaded_at = captured_at
+            self.last_uploaded_bytes = size_bytes
+            self.stats['uploaded'] += 1
+            self.stats['bytes_uploaded'] += size_bytes
+
+    def discard_reference(self, frame_hash=None):
+        """
+        The reference frame was dropped before reaching S3: stop skipping frames like it
+
+        Args:
+            frame_hash: Only discard if this is still the reference (None: always)
+        """
+        with self.lock:
+            if frame_hash is None or frame_hash == self.last_hash:
+                self.last_hash = None
+
+    def get_markers(self):
+        """Get the "unchanged since X" markers recorded for skipped frames"""
+        with self.lock:
+            return list(self.markers)
+
+    def get_stats(self):
+        """Get skip ratio plus bytes and PUTs saved for this session"""
+        with self.lock:
+            stats = dict(self.stats)
+
+        return {
+            'max_distance': self.max_distance,
+            'frames': stats['frames'],
+            'uploaded': stats['uploaded'],
+            'skipped': stats['skipped'],
+            'skip_ratio': round(stats['skipped'] / stats['frames'], 3) if stats['frames'] else 0.0,
+            'puts_saved': stats['skipped'],
+            'bytes_uploaded': stats['bytes_uploaded'],
+            'bytes_saved': stats['bytes_saved']
+        }
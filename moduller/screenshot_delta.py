@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Screenshot Delta Encoding
+Splits each frame into fixed tiles and compares them with the last keyframe
+using vectorised NumPy. Only the changed tiles are uploaded, packed into one
+tile sheet image plus a small JSON manifest; a full keyframe is sent every N
+captures (or when too much of the screen changed for a delta to pay off).
+
+Rebuild a frame from keyframe + delta:
+    python -m moduller.screenshot_delta --manifest frame_delta.json --keyframe key.webp --tiles frame_delta.webp --output frame.png
+    python -m moduller.screenshot_delta --s3-manifest users_screenshots/<date>/<email>/<task>/<timestamp>_delta.json --output frame.png
+"""
+
+import io
+import sys
+import json
+import math
+import logging
+import argparse
+
+import numpy as np
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# Manifest format version, bump when the layout changes
+MANIFEST_VERSION = 1
+
+
+class TileDeltaEncoder:
+    def __init__(self, tile_size=64, keyframe_interval=20, pixel_threshold=12, max_changed_ratio=0.5):
+        """
+        Args:
+            tile_size: Tile edge length in pixels
+            keyframe_interval: Send a full keyframe every N encoded captures
+            pixel_threshold: Largest per-channel difference still treated as unchanged
+            max_changed_ratio: Above this share of changed tiles a keyframe is sent instead
+        """
+        self.tile_size = int(tile_size)
+        self.keyframe_interval = max(1, int(keyframe_interval))
+        self.pixel_threshold = pixel_threshold
+        self.max_changed_ratio = max_changed_ratio
+
+        self.keyframe = None
+        self.keyframe_id = 0
+        self.frames_since_keyframe = 0
+
+        self.stats = {
+            'keyframes': 0,
+            'deltas': 0,
+            'tiles_total': 0,
+            'tiles_changed': 0
+        }
+
+    def _tiles(self, pixels):
+        """Pad an HxWx3 array to whole tiles and view it as (rows, tile, cols, tile, 3)"""
+        height, width = pixels.shape[:2]
+        rows = math.ceil(height / self.tile_size)
+        cols = math.ceil(width / self.tile_size)
+        pad_h = rows * self.tile_size - height
+        pad_w = cols * self.tile_size - width
+        if pad_h or pad_w:
+            pixels = np.pad(pixels, ((0, pad_h), (0, pad_w), (0, 0)), mode='edge')
+        return pixels.reshape(rows, self.tile_size, cols, self.tile_size, pixels.shape[2])
+
+    def encode(self, img):
+        """
+        Decide between keyframe and delta for one frame
+
+        Args:
+            img: RGB PIL image
+
+        Returns:
+            dict with type ("keyframe" or "delta") and keyframe_id, for deltas also
+            tiles_image (PIL image of the changed tiles) and manifest
+        """
+        pixels = np.asarray(img.convert('RGB'))
+        tiles = self._tiles(pixels)
+
+        needs_keyframe = (
+            self.keyframe is None
+            or self.keyframe.shape != tiles.shape
+            or self.frames_since_keyframe >= self.keyframe_interval - 1
+        )
+
+        if not needs_keyframe:
+            # Largest channel difference per tile, one band of tile rows at a time to keep
+            # the int16 temporaries small on 4K frames
+            changed = np.empty(tiles.shape[0:3:2], dtype=bool)
+            for row in range(tiles.shape[0]):
+                diff = np.abs(tiles[row].astype(np.int16) - self.keyframe[row])
+                changed[row] = diff.max(axis=(0, 2, 3)) > self.pixel_threshold
+            changed_count = int(changed.sum())
+            if changed_count / changed.size > self.max_changed_ratio:
+                needs_keyframe = True
+
+        if needs_keyframe:
+            # Copy, the grabbed buffer is reused for the next capture
+            self.keyframe = tiles.copy()
+            self.keyframe_id += 1
+            self.frames_since_keyframe = 0
+            self.stats['keyframes'] += 1
+            return {'type': 'keyframe', 'keyframe_id': self.keyframe_id}
+
+        self.frames_since_keyframe += 1
+        self.stats['deltas'] += 1
+        self.stats['tiles_total'] += changed.size
+        self.stats['tiles_changed'] += changed_count
+
+        positions = np.argwhere(changed)
+        sheet_cols = max(1, math.ceil(math.sqrt(len(positions))))
+        sheet_rows = max(1, math.ceil(len(positions) / sheet_cols))
+        sheet = np.zeros((sheet_rows * self.tile_size, sheet_cols * self.tile_size, 3), dtype=np.uint8)
+        for slot, (row, col) in enumerate(positions):
+            y = (slot // sheet_cols) * self.tile_size
+            x = (slot % sheet_cols) * self.tile_size
+            sheet[y:y + self.tile_size, x:x + self.tile_size] = tiles[row, :, col]
+
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'keyframe_id': self.keyframe_id,
+            'width': pixels.shape[1],
+            'height': pixels.shape[0],
+            'tile_size': self.tile_size,
+            'sheet_columns': sheet_cols,
+            'tiles': positions.tolist()
+        }
+        return {
+            'type': 'delta',
+            'keyframe_id': self.keyframe_id,
+            'tiles_image': Image.fromarray(sheet),
+            'manifest': manifest
+        }
+
+    def reset(self):
+        """Forget the keyframe, the next frame is sent as a new keyframe (e.g. the last one was never uploaded)"""
+        self.keyframe = None
+        self.frames_since_keyframe = 0
+
+    def get_stats(self):
+        """Get keyframe/delta counts and the share of changed tiles"""
+        stats = dict(self.stats)
+        stats['changed_tile_ratio'] = (
+            round(stats['tiles_changed'] / stats['tiles_total'], 3) if stats['tiles_total'] else 0.0
+        )
+        return stats
+
+
+def reconstruct_frame(keyframe_img, tiles_img, manifest):
+    """
+    Rebuild a frame from its keyframe and delta tile sheet
+
+    Keyframe and tile sheet may have been stored downscaled or in grayscale by the
+    encoding profile, they are brought back to the manifest's geometry first.
+
+    Args:
+        keyframe_img: PIL image of the keyframe
+        tiles_img: PIL image of the changed tiles
+        manifest: Delta manifest dict
+
+    Returns:
+        PIL.Image: reconstructed RGB frame
+    """
+    tile_size = manifest['tile_size']
+    width, height = manifest['width'], manifest['height']
+    sheet_cols = manifest['sheet_columns']
+    tiles = manifest['tiles']
+    sheet_rows = max(1, math.ceil(len(tiles) / sheet_cols))
+
+    keyframe_img = keyframe_img.convert('RGB')
+    if keyframe_img.size != (width, height):
+        keyframe_img = keyframe_img.resize((width, height), Image.Resampling.BILINEAR)
+    sheet_size = (sheet_cols * tile_size, sheet_rows * tile_size)
+    tiles_img = tiles_img.convert('RGB')
+    if tiles_img.size != sheet_size:
+        tiles_img = tiles_img.resize(sheet_size, Image.Resampling.BILINEAR)
+
+    rows = math.ceil(height / tile_size)
+    cols = math.ceil(width / tile_size)
+    frame = np.zeros((rows * tile_size, cols * tile_size, 3), dtype=np.uint8)
+    frame[:height, :width] = np.asarray(keyframe_img)
+    sheet = np.asarray(tiles_img)
+
+    for slot, (row, col) in enumerate(tiles):
+        y = (slot // sheet_cols) * tile_size
+        x = (slot % sheet_cols) * tile_size
+        frame[row * tile_size:(row + 1) * tile_size, col * tile_size:(col + 1) * tile_size] = \
+            sheet[y:y + tile_size, x:x + tile_size]
+
+    return Image.fromarray(frame[:height, :width])
+
+
+def reconstruct_from_s3(manifest_key, bucket=None):
+    """
+    Download a delta manifest plus its keyframe and tile sheet from S3 and rebuild the frame
+
+    Args:
+        manifest_key: S3 key of the *_delta.json manifest
+        bucket: Bucket name (default: configured bucket)
+
+    Returns:
+        PIL.Image: reconstructed RGB frame
+    """
+    from .s3_uploader import get_s3_client, _timed_s3_call, S3_BUCKET_NAME
+
+    bucket = bucket or S3_BUCKET_NAME
+    s3 = get_s3_client()
+    prefix = manifest_key.rsplit('/', 1)[0]
+
+    def fetch(key):
+        response = _timed_s3_call("reconstruct_frame", s3.get_object, Bucket=bucket, Key=key)
+        return response['Body'].read()
+
+    manifest = json.loads(fetch(manifest_key))
+    keyframe_img = Image.open(io.BytesIO(fetch(f"{prefix}/{manifest['keyframe_file']}")))
+    tiles_img = Image.open(io.BytesIO(fetch(f"{prefix}/{manifest['tiles_file']}")))
+    return reconstruct_frame(keyframe_img, tiles_img, manifest)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild a screenshot from keyframe + tile delta")
+    parser.add_argument("--manifest", help="Local delta manifest (.json)")
+    parser.add_argument("--keyframe", help="Local keyframe image")
+    parser.add_argument("--tiles", help="Local tile sheet image")
+    parser.add_argument("--s3-manifest", help="S3 key of a delta manifest, keyframe and tiles are fetched alongside")
+    parser.add_argument("--output", required=True, help="Output image path")
+    args = parser.parse_args()
+
+    if args.s3_manifest:
+        frame = reconstruct_from_s3(args.s3_manifest)
+    elif args.manifest and args.keyframe and args.tiles:
+        with open(args.manifest, 'r', encoding='utf-8') as f:
+            frame = reconstruct_frame(Image.open(args.keyframe), Image.open(args.tiles), json.load(f))
+    else:
+        parser.error("either --s3-manifest or --manifest, --keyframe and --tiles are required")
+        sys.exit(2)
+
+    frame.save(args.output)
+    print(f"✅ Frame rebuilt: {args.output}")
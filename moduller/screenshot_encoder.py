@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Screenshot Encoder
+Converts mss grabs to PIL images straight from the raw BGRA buffer and encodes
+them into a reused output buffer, following named encoding profiles.
+
+Benchmark (synthetic frames, no display needed):
+    python -m benchmarks.screenshot_encoder
+"""
+
+import io
+import time
+import logging
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+from .screenshot_dedup import compute_perceptual_hash, hamming_distance
+
+logger = logging.getLogger(__name__)
+
+def screenshot_to_image(sct_img):
+    """
+    Wrap an mss screenshot as an RGB PIL image
+
+    Reads mss' raw BGRA bytearray directly with the BGRX raw mode, so mss never
+    builds its intermediate RGB copy (sct_img.rgb) and PIL unpacks the pixels once.
+    """
+    return Image.frombuffer('RGB', sct_img.size, sct_img.raw, 'raw', 'BGRX', 0, 1)
+
+
+class FrameEncoder:
+    def __init__(self):
+        # Reused across ticks, keeps its grown capacity instead of reallocating every frame
+        self.buffer = io.BytesIO()
+
+    def encode(self, img, image_format="WEBP", **save_params):
+        """
+        Encode an image into the reused buffer
+
+        Returns:
+            bytes: encoded image (a copy, safe to queue while the buffer is reused)
+        """
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        img.save(self.buffer, format=image_format, **save_params)
+        return self.buffer.getvalue()
+
+
+# S3 key extension for each PIL format
+FORMAT_EXTENSIONS = {
+    "WEBP": "webp",
+    "JPEG": "jpeg",
+    "PNG": "png"
+}
+
+# Consecutive over-budget frames before auto mode steps down a profile
+AUTO_STEP_DOWN_FRAMES = 3
+
+
+class ProfiledFrameEncoder(FrameEncoder):
+    def __init__(self, profiles, profile="auto", cpu_budget_ms=250):
+        """
+        Args:
+            profiles: Ordered dict of name -> {format, quality, method, scale, grayscale},
+                      most expensive first
+            profile: Profile name to use, or "auto" to step down the list when over budget
+            cpu_budget_ms: Encoding CPU budget per frame for auto mode
+        """
+        super().__init__()
+        self.profiles = profiles
+        self.profile_names = list(profiles.keys())
+        self.auto = profile == "auto" or profile not in profiles
+        if profile != "auto" and profile not in profiles:
+            logger.warning("⚠️ Unknown screenshot profile '%s', using auto mode", profile)
+        self.active_index = 0 if self.auto else self.profile_names.index(profile)
+        self.cpu_budget_ms = cpu_budget_ms
+        self.over_budget_frames = 0
+        self.costs = {}
+
+    @property
+    def active_profile_name(self):
+        return self.profile_names[self.active_index]
+
+    def current_profile(self):
+        """Get the settings of the active profile"""
+        return self.profiles[self.active_profile_name]
+
+    def encode_frame(self, img, quality=None):
+        """
+        Downscale/convert and encode an image with the active profile
+
+        Args:
+            img: PIL image
+            quality: Override of the profile quality (e.g. lowered under upload backpressure)
+
+        Returns:
+            tuple: (encoded bytes, file extension)
+        """
+        profile_name = self.active_profile_name
+        profile = self.profiles[profile_name]
+        image_format = profile.get('format', 'WEBP').upper()
+
+        started = time.thread_time()
+
+        scale = profile.get('scale', 1.0)
+        if scale < 1.0:
+            factor = 1 / scale
+            if factor == int(factor):
+                img = img.reduce(int(factor))
+            else:
+                img = img.resize((int(img.width * scale), int(img.height * scale)), Image.Resampling.BILINEAR)
+        if profile.get('grayscale'):
+            img = img.convert('L')
+
+        save_params = {'quality': quality if quality is not None else profile.get('quality', 80)}
+        if image_format == "WEBP":
+            save_params['method'] = profile.get('method', 4)
+        img_bytes = self.encode(img, image_format, **save_params)
+
+        cost_ms = (time.thread_time() - started) * 1000
+        self._record_cost(profile_name, cost_ms, len(img_bytes))
+        return img_bytes, FORMAT_EXTENSIONS.get(image_format, image_format.lower())
+
+    def _record_cost(self, profile_name, cost_ms, size_bytes):
+        """Record the encode cost and step down a profile in auto mode when over budget"""
+        cost = self.costs.setdefault(profile_name, {'frames': 0, 'total_ms': 0.0, 'last_ms': 0.0, 'total_bytes': 0})
+        cost['frames'] += 1
+        cost['total_ms'] += cost_ms
+        cost['last_ms'] = cost_ms
+        cost['total_bytes'] += size_bytes
+
+        if not self.auto:
+            return
+
+        self.over_budget_frames = self.over_budget_frames + 1 if cost_ms > self.cpu_budget_ms else 0
+        if self.over_budget_frames >= AUTO_STEP_DOWN_FRAMES and self.active_index < len(self.profile_names) - 1:
+            self.active_index += 1
+            self.over_budget_frames = 0
+            logger.warning("⚠️ Screenshot encoding over %d ms budget, stepping down to profile '%s'",
+                           self.cpu_budget_ms, self.active_profile_name)
+
+    def get_status(self):
+        """Get the active profile and measured encode cost per profile"""
+        return {
+            'mode': 'auto' if self.auto else 'fixed',
+            'active_profile': self.active_profile_name,
+            'settings': self.current_profile(),
+            'cpu_budget_ms': self.cpu_budget_ms,
+            'measured': {
+                name: {
+                    'frames': cost['frames'],
+                    'avg_encode_ms': round(cost['total_ms'] / cost['frames'], 1),
+                    'last_encode_ms': round(cost['last_ms'], 1),
+                    'avg_bytes': cost['total_bytes'] // cost['frames']
+                }
+                for name, cost in self.costs.items()
+            }
+        }
+
+
+def process_screenshot(encoder, img, quality=None, dedup_reference=None, delta_encoder=None):
+    """
+    Hash and encode one screenshot, skipping the encode for unchanged frames
+
+    Args:
+        encoder: ProfiledFrameEncoder
+        img: PIL image
+        quality: Override of the profile quality
+        dedup_reference: (last_hash, max_distance, hash_size) from ScreenshotDeduplicator.reference(),
+                         or None to skip hashing
+        delta_encoder: TileDeltaEncoder to upload only changed tiles, or None for full frames
+
+    Returns:
+        dict with hash, duplicate, image_bytes, file_extension, delta
+        (delta: None for full frames, else type, keyframe_id and the manifest of delta frames)
+    """
+    frame_hash = None
+    if dedup_reference:
+        last_hash, max_distance, hash_size = dedup_reference
+        frame_hash = compute_perceptual_hash(img, hash_size)
+        if last_hash is not None and hamming_distance(frame_hash, last_hash) <= max_distance:
+            return {'hash': frame_hash, 'duplicate': True, 'image_bytes': None, 'file_extension': None, 'delta': None}
+
+    delta = None
+    if delta_encoder:
+        result = delta_encoder.encode(img)
+        delta = {'type': result['type'], 'keyframe_id': result['keyframe_id'], 'manifest': result.get('manifest')}
+        if result['type'] == 'delta':
+            img = result['tiles_image']
+
+    img_bytes, file_extension = encoder.encode_frame(img, quality)
+    return {'hash': frame_hash, 'duplicate': False, 'image_bytes': img_bytes, 'file_extension': file_extension,
+            'delta': delta}
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Screenshot Encoder Process
+Runs screenshot hashing and encoding (and optionally the grab itself) in a
+dedicated worker process, so the GIL-heavy encode never stalls Flask requests.
+Raw BGRA frames are handed over through shared memory, only the small encoded
+result travels back over the pipe.
+
+Benchmark (Flask request latency while capturing):
+    python -m benchmarks.screenshot_encoder_process
+"""
+
+import time
+import threading
+import logging
+import multiprocessing
+from multiprocessing import shared_memory
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for the worker to answer one frame
+WORKER_RESPONSE_TIMEOUT = 30
+
+
+def _worker_main(conn, shm_name, profiles, profile, cpu_budget_ms, grab_monitor):
+    """Worker process entry point: serve frame requests until told to stop"""
+    from PIL import Image
+    from moduller.screenshot_encoder import ProfiledFrameEncoder, process_screenshot
+    from moduller.screenshot_delta import TileDeltaEncoder
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    encoder = ProfiledFrameEncoder(profiles, profile=profile, cpu_budget_ms=cpu_budget_ms)
+    # One keyframe per stream (monitor) when delta encoding is on
+    delta_encoders = {}
+    sct = None
+
+    try:
+        while True:
+            command, request = conn.recv()
+            if command == "stop":
+                break
+
+            try:
+                if grab_monitor is not None:
+                    if sct is None:
+                        import mss
+                        sct = mss.mss()
+                    sct_img = sct.grab(request.get('monitor') or grab_monitor)
+                    width, height = sct_img.size
+                    raw = sct_img.raw
+                else:
+                    width, height = request['width'], request['height']
+                    raw = shm.buf[:width * height * 4]
+
+                img = Image.frombuffer('RGB', (width, height), raw, 'raw', 'BGRX', 0, 1)
+                del raw
+                delta_encoder = None
+                if request.get('delta'):
+                    stream = request.get('stream', 0)
+                    if stream not in delta_encoders:
+                        delta_encoders[stream] = TileDeltaEncoder(**request['delta'])
+                    delta_encoder = delta_encoders[stream]
+                    if request.get('reset_delta'):
+                        delta_encoder.reset()
+                result = process_screenshot(encoder, img, request.get('quality'), request.get('dedup_reference'),
+                                            delta_encoder)
+                result['ok'] = True
+                result['status'] = encoder.get_status()
+            except Exception as e:
+                result = {'ok': False, 'error': str(e)}
+            conn.send(result)
+    finally:
+        if sct is not None:
+            sct.close()
+        shm.close()
+
+
+class ScreenshotEncoderProcess:
+    def __init__(self, profiles, profile="auto", cpu_budget_ms=250, max_frame_bytes=3840 * 2160 * 4,
+                 grab_monitor=None):
+        """
+        Args:
+            profiles: Encoding profiles (see ConfigManager.get_screenshot_profiles)
+            profile: Profile name or "auto"
+            cpu_budget_ms: Encoding CPU budget per frame for auto mode
+            max_frame_bytes: Shared memory size, the largest BGRA frame that will be sent
+            grab_monitor: mss monitor dict to grab inside the worker, None to grab in the caller
+        """
+        self.profiles = profiles
+        self.profile = profile
+        self.cpu_budget_ms = cpu_budget_ms
+        self.max_frame_bytes = max_frame_bytes
+        self.grab_monitor = grab_monitor
+
+        self.process = None
+        self.conn = None
+        self.shm = None
+        self.alive = False
+        self.lock = threading.Lock()
+        self.frames = 0
+        self.round_trip_ms = 0.0
+        self.status = {
+            'mode': 'auto' if profile == 'auto' else 'fixed',
+            'active_profile': next(iter(profiles)) if profile == 'auto' else profile,
+            'settings': profiles.get(profile, next(iter(profiles.values()))),
+            'cpu_budget_ms': cpu_budget_ms,
+            'measured': {}
+        }
+
+    def start(self):
+        """Start the worker process, returns False if it could not be started"""
+        try:
+            # spawn: no forked copies of Flask/threads, same behaviour on Windows and macOS
+            context = multiprocessing.get_context("spawn")
+            self.shm = shared_memory.SharedMemory(create=True, size=self.max_frame_bytes)
+            self.conn, child_conn = context.Pipe()
+            self.process = context.Process(
+                target=_worker_main,
+                args=(child_conn, self.shm.name, self.profiles, self.profile, self.cpu_budget_ms, self.grab_monitor),
+                name="screenshot-encoder",
+                daemon=True
+            )
+            self.process.start()
+            child_conn.close()
+            self.alive = True
+            logger.info("🧵 Screenshot encoder process started (pid %s)", self.process.pid)
+        except Exception as e:
+            logger.error("❌ Could not start screenshot encoder process: %s", e)
+            self._release()
+        return self.alive
+
+    def stop(self):
+        """Stop the worker process and free the shared memory"""
+        with self.lock:
+            if self.alive:
+                try:
+                    self.conn.send(("stop", None))
+                except Exception:
+                    pass
+            if self.process:
+                self.process.join(timeout=5)
+                if self.process.is_alive():
+                    self.process.terminate()
+            self._release()
+        logger.info("⏹️ Screenshot encoder process stopped")
+
+    def _release(self):
+        self.alive = False
+        if self.conn:
+            self.conn.close()
+            self.conn = None
+        if self.shm:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def current_profile(self):
+        """Get the settings of the worker's active profile (as of the last frame)"""
+        return self.status['settings']
+
+    def process_frame(self, sct_img=None, quality=None, dedup_reference=None, monitor=None,
+                      delta_config=None, stream=0, reset_delta=False):
+        """
+        Hash and encode one frame in the worker process
+
+        Args:
+            sct_img: mss screenshot to encode, None when the worker grabs itself
+            quality: Override of the profile quality
+            dedup_reference: See screenshot_encoder.process_screenshot
+            monitor: mss monitor dict the worker grabs, defaults to grab_monitor
+            delta_config: TileDeltaEncoder settings to upload only changed tiles, None for full frames
+            stream: Stream (monitor) index, the worker keeps one keyframe per stream
+            reset_delta: Start the stream over with a keyframe (its last keyframe was dropped)
+
+        Returns:
+            dict with hash, duplicate, image_bytes, file_extension, delta
+        """
+        request = {'quality': quality, 'dedup_reference': dedup_reference, 'monitor': monitor,
+                   'delta': delta_config, 'stream': stream, 'reset_delta': reset_delta}
+
+        with self.lock:
+            if not self.alive:
+                raise RuntimeError("Screenshot encoder process is not running")
+
+            started = time.perf_counter()
+            if sct_img is not None:
+                frame_bytes = len(sct_img.raw)
+                if frame_bytes > self.max_frame_bytes:
+                    raise ValueError(f"Frame of {frame_bytes} bytes exceeds shared memory ({self.max_frame_bytes})")
+                self.shm.buf[:frame_bytes] = sct_img.raw
+                request['width'], request['height'] = sct_img.size
+
+            try:
+                self.conn.send(("frame", request))
+                # Waiting on the pipe releases the GIL, Flask keeps serving meanwhile
+                if not self.conn.poll(WORKER_RESPONSE_TIMEOUT):
+                    raise TimeoutError("Screenshot encoder process did not answer")
+                result = self.conn.recv()
+            except Exception:
+                logger.error("❌ Screenshot encoder process failed, falling back to in-process encoding")
+                self.alive = False
+                raise
+
+            self.frames += 1
+            self.round_trip_ms = (time.perf_counter() - started) * 1000
+
+        if not result.get('ok'):
+            raise RuntimeError(result.get('error', 'Unknown encoder process error'))
+        self.status = result.pop('status')
+        return result
+
+    def get_status(self):
+        """Get the active profile, measured encode cost and process info"""
+        status = dict(self.status)
+        status['process'] = {
+            'alive': self.alive,
+            'pid': self.process.pid if self.process else None,
+            'grab_in_worker': self.grab_monitor is not None,
+            'frames': self.frames,
+            'last_round_trip_ms': round(self.round_trip_ms, 1)
+        }
+        return status
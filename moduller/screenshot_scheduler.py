@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Screenshot Scheduler
+Fires capture ticks on a fixed monotonic grid (start + n * interval), so
+encode/upload time never pushes later captures back. Missed ticks after a
+stall are skipped, not burst.
+"""
+
+import time
+import math
+import threading
+import logging
+from collections import deque
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+# Longest single sleep, so a stop request is noticed quickly
+MAX_SLEEP_SLICE = 1.0
+
+
+class MonotonicTickScheduler:
+    def __init__(self, interval, history_size=100):
+        self.interval = float(interval)
+        self.start_monotonic = None
+        self.start_wall = None
+        self.next_index = 0
+        self.lateness_history = deque(maxlen=history_size)
+
+        self.stats = {
+            'ticks': 0,
+            'skipped_ticks': 0,
+            'total_lateness': 0.0,
+            'max_lateness': 0.0,
+            'last_lateness': 0.0
+        }
+        self.lock = threading.Lock()
+
+    def start(self):
+        """Anchor the grid at the current time, the first tick fires immediately"""
+        self.start_monotonic = time.monotonic()
+        self.start_wall = datetime.now()
+        self.next_index = 0
+
+    def wait_next_tick(self, should_continue=lambda: True):
+        """
+        Sleep until the next grid point and return its timing info
+
+        Args:
+            should_continue: Callable checked while sleeping, returning False aborts the wait
+
+        Returns:
+            dict with tick_index, planned_at, actual_at, lateness_seconds, skipped_ticks,
+            or None if should_continue() turned False
+        """
+        if self.start_monotonic is None:
+            self.start()
+
+        planned = self.start_monotonic + self.next_index * self.interval
+        while True:
+            if not should_continue():
+                return None
+            remaining = planned - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(remaining, MAX_SLEEP_SLICE))
+
+        actual = time.monotonic()
+        lateness = actual - planned
+
+        # After a stall, jump to the latest grid point that has passed instead of bursting
+        skipped = 0
+        if lateness >= self.interval:
+            latest_index = int(math.floor((actual - self.start_monotonic) / self.interval))
+            skipped = latest_index - self.next_index
+            self.next_index = latest_index
+            planned = self.start_monotonic + latest_index * self.interval
+            lateness = actual - planned
+            logger.warning("⚠️ Screenshot scheduler stalled, skipped %d ticks", skipped)
+
+        tick = {
+            'tick_index': self.next_index,
+            'planned_at': self.start_wall + timedelta(seconds=planned - self.start_monotonic),
+            'actual_at': self.start_wall + timedelta(seconds=actual - self.start_monotonic),
+            'lateness_seconds': lateness,
+            'skipped_ticks': skipped
+        }
+        self.next_index += 1
+        self._record(tick)
+        return tick
+
+    def _record(self, tick):
+        """Record tick lateness statistics"""
+        with self.lock:
+            self.stats['ticks'] += 1
+            self.stats['skipped_ticks'] += tick['skipped_ticks']
+            self.stats['total_lateness'] += tick['lateness_seconds']
+            self.stats['last_lateness'] = tick['lateness_seconds']
+            self.stats['max_lateness'] = max(self.stats['max_lateness'], tick['lateness_seconds'])
+            self.lateness_history.append(round(tick['lateness_seconds'] * 1000, 1))
+
+    def get_stats(self):
+        """Get tick count, skipped ticks and lateness (jitter) statistics"""
+        with self.lock:
+            stats = dict(self.stats)
+            history = list(self.lateness_history)
+
+        return {
+            'interval_seconds': self.interval,
+            'started_at': self.start_wall.isoformat() if self.start_wall else None,
+            'ticks': stats['ticks'],
+            'skipped_ticks': stats['skipped_ticks'],
+            'avg_lateness_ms': round(stats['total_lateness'] / stats['ticks'] * 1000, 1) if stats['ticks'] else 0.0,
+            'max_lateness_ms': round(stats['max_lateness'] * 1000, 1),
+            'last_lateness_ms': round(stats['last_lateness'] * 1000, 1),
+            'recent_lateness_ms': history
+        }
+
+
+def tick_metadata(tick):
+    """Build S3 object metadata carrying a tick's planned and actual capture time"""
+    return {
+        'planned-capture-time': tick['planned_at'].isoformat(),
+        'actual-capture-time': tick['actual_at'].isoformat(),
+        'capture-lateness-ms': f"{tick['lateness_seconds'] * 1000:.1f}",
+        'tick-index': tick['tick_index']
+    }
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Screenshot Timelapse
+Appends captured frames to a per-session video with OpenCV instead of uploading
+every screenshot as its own object. The video is cut into rolling segments
+(every 15 minutes by default); each segment is uploaded as one object with a
+frame-index sidecar JSON mapping frame numbers to capture timestamps for seeking.
+"""
+
+import os
+import tempfile
+import logging
+
+import numpy as np
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+logger = logging.getLogger(__name__)
+
+# Container extension and content type for each fourcc
+CODEC_CONTAINERS = {
+    "mp4v": ("mp4", "video/mp4"),
+    "avc1": ("mp4", "video/mp4"),
+    "MJPG": ("avi", "video/x-msvideo"),
+    "VP80": ("webm", "video/webm")
+}
+
+
+class TimelapseWriterError(RuntimeError):
+    """The video writer could not be opened; finished carries a segment completed just before"""
+
+    def __init__(self, message, finished=None):
+        super().__init__(message)
+        self.finished = finished
+
+
+class TimelapseSegmentWriter:
+    def __init__(self, segment_seconds=900, fps=2, codec="mp4v", stream=""):
+        """
+        Args:
+            segment_seconds: Length of a segment in capture time before it is flushed
+            fps: Playback frame rate of the video
+            codec: OpenCV fourcc, see CODEC_CONTAINERS
+            stream: Label of the captured stream (e.g. monitor index) for the sidecar
+        """
+        if cv2 is None:
+            raise RuntimeError("OpenCV (cv2) is not available, timelapse mode needs opencv-python")
+
+        self.segment_seconds = segment_seconds
+        self.fps = fps
+        self.codec = codec if codec in CODEC_CONTAINERS else "mp4v"
+        self.file_extension, self.content_type = CODEC_CONTAINERS[self.codec]
+        self.stream = stream
+
+        self.writer = None
+        self.path = None
+        self.size = None
+        self.segment_started_at = None
+        self.frame_index = []
+        self.segments_flushed = 0
+
+        # Fail here, not on the first frame, if this OpenCV build can't write the codec
+        self._probe()
+
+    def _probe(self):
+        """Open and discard a tiny writer with the configured codec"""
+        fd, path = tempfile.mkstemp(prefix="ddsfocus_timelapse_probe_", suffix=f".{self.file_extension}")
+        os.close(fd)
+        try:
+            writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*self.codec), self.fps, (64, 64))
+            opened = writer.isOpened()
+            writer.release()
+        finally:
+            os.remove(path)
+        if not opened:
+            raise TimelapseWriterError(f"OpenCV could not open a {self.codec} video writer")
+
+    def add_frame(self, sct_img, captured_at, tick=None):
+        """
+        Append an mss screenshot to the current segment
+
+        Args:
+            sct_img: mss screenshot (raw BGRA)
+            captured_at: Capture datetime
+            tick: Optional scheduler tick, its planned time and index go into the sidecar
+
+        Returns:
+            dict: the finished segment (see flush) if this frame started a new one, else None
+
+        Raises:
+            TimelapseWriterError: the next segment's writer could not be opened
+        """
+        finished = None
+        if self.segment_started_at and (captured_at - self.segment_started_at).total_seconds() >= self.segment_seconds:
+            finished = self.flush()
+
+        # mss' raw buffer is BGRA, OpenCV wants BGR: one conversion, no PIL round trip
+        width, height = sct_img.size
+        frame = np.frombuffer(sct_img.raw, dtype=np.uint8).reshape(height, width, 4)
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
+
+        if self.writer is None:
+            try:
+                self._open(width, height, captured_at)
+            except TimelapseWriterError as e:
+                raise TimelapseWriterError(str(e), finished) from e
+        elif (width, height) != self.size:
+            # Resolution changed mid-segment, keep the segment's geometry
+            frame = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+
+        self.writer.write(frame)
+        entry = {
+            'frame': len(self.frame_index),
+            'offset_seconds': round(len(self.frame_index) / self.fps, 3),
+            'captured_at': captured_at.isoformat()
+        }
+        if tick:
+            entry['planned_at'] = tick['planned_at'].isoformat()
+            entry['tick_index'] = tick['tick_index']
+        self.frame_index.append(entry)
+        return finished
+
+    def _open(self, width, height, captured_at):
+        """Start a new segment file"""
+        fd, self.path = tempfile.mkstemp(prefix="ddsfocus_timelapse_", suffix=f".{self.file_extension}")
+        os.close(fd)
+        self.writer = cv2.VideoWriter(self.path, cv2.VideoWriter_fourcc(*self.codec), self.fps, (width, height))
+        if not self.writer.isOpened():
+            self.writer = None
+            os.remove(self.path)
+            raise TimelapseWriterError(f"OpenCV could not open a {self.codec} video writer")
+        self.size = (width, height)
+        self.segment_started_at = captured_at
+        self.frame_index = []
+
+    def flush(self):
+        """
+        Close the current segment
+
+        Returns:
+            dict with video_bytes, file_extension, content_type, started_at and the
+            sidecar index, or None if the segment is empty
+        """
+        if self.writer is None:
+            return None
+
+        self.writer.release()
+        self.writer = None
+        try:
+            with open(self.path, 'rb') as f:
+                video_bytes = f.read()
+        finally:
+            os.remove(self.path)
+            self.path = None
+
+        if not self.frame_index:
+            return None
+
+        self.segments_flushed += 1
+        segment = {
+            'video_bytes': video_bytes,
+            'file_extension': self.file_extension,
+            'content_type': self.content_type,
+            'started_at': self.segment_started_at,
+            'index': {
+                'stream': self.stream,
+                'codec': self.codec,
+                'fps': self.fps,
+                'width': self.size[0],
+                'height': self.size[1],
+                'segment_started_at': self.segment_started_at.isoformat(),
+                'segment_ended_at': self.frame_index[-1]['captured_at'],
+                'frames': self.frame_index
+            }
+        }
+        logger.info("🎞️ Timelapse segment flushed: %d frames, %d bytes", len(self.frame_index), len(video_bytes))
+        self.segment_started_at = None
+        self.frame_index = []
+        return segment
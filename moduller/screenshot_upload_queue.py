@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Screenshot Upload Queue
+Decouples screenshot capture from S3 upload: the capture loop pushes encoded
+frames onto a bounded in-memory queue and a small worker pool drains it to S3.
+"""
+
+import time
+import threading
+import logging
+from collections import deque
+
+from .config_manager import config_manager
+
+logger = logging.getLogger(__name__)
+
+# What to do when the queue is full
+BACKPRESSURE_POLICIES = ("drop_oldest", "lower_quality", "pause")
+
+# Lowest quality the lower_quality policy will step down to
+MIN_DEGRADED_QUALITY = 30
+
+
+class ScreenshotUploadQueue:
+    def __init__(self, max_size=8, workers=2, policy="drop_oldest", pause_timeout=30, upload_func=None):
+        if policy not in BACKPRESSURE_POLICIES:
+            logger.warning("⚠️ Unknown backpressure policy '%s', using drop_oldest", policy)
+            policy = "drop_oldest"
+
+        self.max_size = max(1, int(max_size))
+        self.worker_count = max(1, int(workers))
+        self.policy = policy
+        self.pause_timeout = pause_timeout
+        self.upload_func = upload_func
+
+        self.frames = deque()
+        self.condition = threading.Condition()
+        self.workers = []
+        self.running = False
+        self.in_flight = 0
+
+        self.metrics = {
+            'enqueued': 0,
+            'uploaded': 0,
+            'failed': 0,
+            'dropped': 0,
+            'degraded': 0,
+            'paused_seconds': 0.0,
+            'peak_depth': 0,
+            'last_upload_lag': 0.0,
+            'max_upload_lag': 0.0,
+            'total_upload_lag': 0.0
+        }
+
+    def start(self):
+        """Start the upload worker pool"""
+        with self.condition:
+            if self.running:
+                return
+            self.running = True
+
+        for i in range(self.worker_count):
+            worker = threading.Thread(target=self._worker_loop, name=f"screenshot-upload-{i}", daemon=True)
+            self.workers.append(worker)
+            worker.start()
+        logger.info("📤 Screenshot upload queue started (%d workers, size %d, policy %s)",
+                    self.worker_count, self.max_size, self.policy)
+
+    def stop(self, drain=True, timeout=30):
+        """
+        Stop the worker pool
+
+        Args:
+            drain: If True, wait (up to timeout) for queued frames to be uploaded first
+            timeout: Maximum seconds to wait for draining
+        """
+        if drain:
+            deadline = time.monotonic() + timeout
+            with self.condition:
+                while (self.frames or self.in_flight) and time.monotonic() < deadline:
+                    self.condition.wait(0.5)
+
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+
+        for worker in self.workers:
+            worker.join(timeout=5)
+        self.workers = []
+        logger.info("⏹️ Screenshot upload queue stopped (%d frames left)", len(self.frames))
+
+    def put(self, frame):
+        """
+        Add an encoded frame to the queue, applying the backpressure policy when full
+
+        Args:
+            frame: dict with image_bytes, email, task_name, file_extension, captured_at
+                   (and optionally key_suffix, content_type, metadata, degraded, manifest,
+                   keep: never dropped by drop_oldest, e.g. keyframes and timelapse segments,
+                   on_drop: called if the queue drops the frame, e.g. to restart a delta stream)
+
+        Returns:
+            bool: True if the frame was queued, False if it was dropped
+        """
+        frame['enqueued_at'] = time.monotonic()
+        dropped = None
+
+        with self.condition:
+            if len(self.frames) >= self.max_size:
+                if self.policy == "pause":
+                    # Hold the capture loop until a worker frees a slot
+                    pause_started = time.monotonic()
+                    deadline = pause_started + self.pause_timeout
+                    while len(self.frames) >= self.max_size and self.running:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self.condition.wait(remaining)
+                    self.metrics['paused_seconds'] += time.monotonic() - pause_started
+
+                    if len(self.frames) >= self.max_size:
+                        self.metrics['dropped'] += 1
+                        logger.warning("⚠️ Upload queue still full after pause, dropping new frame")
+                        dropped = frame
+                else:
+                    # drop_oldest, and lower_quality once quality reductions didn't keep up.
+                    # Frames others depend on (keyframes, timelapse segments) are kept if possible
+                    dropped = next((queued for queued in self.frames if not queued.get('keep')), self.frames[0])
+                    self.frames.remove(dropped)
+                    self.metrics['dropped'] += 1
+                    logger.warning("⚠️ Upload queue full, dropped oldest frame")
+
+            if dropped is not frame:
+                self.frames.append(frame)
+                self.metrics['enqueued'] += 1
+                if frame.get('degraded'):
+                    self.metrics['degraded'] += 1
+                self.metrics['peak_depth'] = max(self.metrics['peak_depth'], len(self.frames))
+                self.condition.notify()
+
+        if dropped is not None and dropped.get('on_drop'):
+            dropped['on_drop']()
+        return dropped is not frame
+
+    def recommended_quality(self, base_quality):
+        """
+        Get the encoding quality the capture loop should use right now.
+        Only the lower_quality policy reduces it, linearly with queue depth.
+        """
+        if self.policy != "lower_quality":
+            return base_quality
+
+        with self.condition:
+            fill_ratio = len(self.frames) / self.max_size
+
+        if fill_ratio < 0.5:
+            return base_quality
+
+        quality = int(base_quality * (1.5 - fill_ratio))
+        return max(MIN_DEGRADED_QUALITY, min(base_quality, quality))
+
+    def get_metrics(self):
+        """Get queue depth and upload-lag metrics"""
+        with self.condition:
+            depth = len(self.frames)
+            oldest_age = time.monotonic() - self.frames[0]['enqueued_at'] if self.frames else 0.0
+            metrics = dict(self.metrics)
+            in_flight = self.in_flight
+
+        completed = metrics['uploaded'] + metrics['failed']
+        return {
+            'policy': self.policy,
+            'workers': self.worker_count,
+            'running': self.running,
+            'depth': depth,
+            'max_size': self.max_size,
+            'in_flight': in_flight,
+            'peak_depth': metrics['peak_depth'],
+            'enqueued': metrics['enqueued'],
+            'uploaded': metrics['uploaded'],
+            'failed': metrics['failed'],
+            'dropped': metrics['dropped'],
+            'degraded': metrics['degraded'],
+            'paused_seconds': round(metrics['paused_seconds'], 2),
+            'oldest_pending_seconds': round(oldest_age, 2),
+            'last_upload_lag_seconds': round(metrics['last_upload_lag'], 2),
+            'avg_upload_lag_seconds': round(metrics['total_upload_lag'] / completed, 2) if completed else 0.0,
+            'max_upload_lag_seconds': round(metrics['max_upload_lag'], 2)
+        }
+
+    def _worker_loop(self):
+        """Upload frames until the queue is stopped"""
+        while True:
+            with self.condition:
+                while not self.frames and self.running:
+                    self.condition.wait()
+                if not self.running and not self.frames:
+                    return
+                frame = self.frames.popleft()
+                self.in_flight += 1
+                # Wake a paused capture loop
+                self.condition.notify_all()
+
+            success = False
+            try:
+                success = bool(self._upload(frame))
+            except Exception as e:
+                logger.error("❌ Screenshot upload worker error: %s", e)
+
+            lag = time.monotonic() - frame['enqueued_at']
+            with self.condition:
+                self.in_flight -= 1
+                self.metrics['uploaded' if success else 'failed'] += 1
+                self.metrics['last_upload_lag'] = lag
+                self.metrics['total_upload_lag'] += lag
+                self.metrics['max_upload_lag'] = max(self.metrics['max_upload_lag'], lag)
+                self.condition.notify_all()
+
+    def _upload(self, frame):
+        """Upload one frame to S3"""
+        upload_func = self.upload_func
+        if upload_func is None:
+            from .s3_uploader import upload_screenshot_direct
+            upload_func = upload_screenshot_direct
+
+        result_url = upload_func(
+            frame['image_bytes'],
+            frame['email'],
+            frame['task_name'],
+            frame.get('file_extension', 'webp'),
+            captured_at=frame.get('captured_at'),
+            metadata=frame.get('metadata'),
+            key_suffix=frame.get('key_suffix', ""),
+            content_type=frame.get('content_type'),
+            # Sidecar manifest (delta tile positions, timelapse frame index): uploaded after
+            # the object, or spooled behind it when the object's upload has to be retried
+            manifest=frame.get('manifest')
+        )
+        if result_url:
+            logger.info("☁️ Screenshot uploaded to S3: %s", result_url)
+        else:
+            logger.error("❌ Failed to upload screenshot to S3")
+        return result_url
+
+
+# Global queue instance
+_upload_queue_instance = None
+_upload_queue_lock = threading.Lock()
+
+
+def get_screenshot_upload_queue():
+    """Get global screenshot upload queue (started on first use)"""
+    global _upload_queue_instance
+    with _upload_queue_lock:
+        if _upload_queue_instance is None:
+            queue_config = config_manager.get_screenshot_upload_queue_config()
+            _upload_queue_instance = ScreenshotUploadQueue(
+                max_size=queue_config.get('max_size', 8),
+                workers=queue_config.get('workers', 2),
+                policy=queue_config.get('policy', 'drop_oldest'),
+                pause_timeout=queue_config.get('pause_timeout_seconds', 30)
+            )
+            _upload_queue_instance.start()
+    return _upload_queue_instance
+
+
+def get_screenshot_upload_metrics():
+    """Get metrics of the global upload queue, or None if it was never started"""
+    if _upload_queue_instance is None:
+        return None
+    return _upload_queue_instance.get_metrics()
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Session Checkpoints
+Append-only write-ahead logs of in-memory tracking sessions. Every capture or
+focus interval appends one small JSON line (flushed to the OS right away,
+fsynced at most every fsync_interval_seconds), so a crash, kill or power loss
+loses at most the last few seconds. Logs of cleanly finished sessions are
+deleted after their upload; logs left over at startup are replayed to rebuild
+the unfinished sessions, which are then uploaded.
+
+One file per session: {directory}/{kind}_{key}_{started}.wal, where kind is
+"program" (UserProgramTracker) or "activity" (ActiveWindowTracker). The writing
+process holds an exclusive OS lock on its log, so recovery (in this or any other
+process) only picks up logs nobody is writing to.
+
+Checkpoint cost and recovery of a 10-hour session:
+    python -m benchmarks.session_checkpoint
+"""
+
+import os
+import re
+import json
+import glob
+import time
+import logging
+import threading
+
+from .config_manager import config_manager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_SUFFIX = ".wal"
+# Windows locks byte ranges: lock one byte far past the log data so readers aren't blocked
+WINDOWS_LOCK_OFFSET = 0x7FFFFFFF
+
+
+def _lock_file(fd):
+    """Take a non-blocking exclusive lock on fd, False if another owner holds it"""
+    try:
+        if fcntl:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        elif msvcrt:
+            os.lseek(fd, WINDOWS_LOCK_OFFSET, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def _unlock_file(fd):
+    """Release _lock_file's lock (closing the file releases it too)"""
+    try:
+        if fcntl:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        elif msvcrt:
+            os.lseek(fd, WINDOWS_LOCK_OFFSET, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    except OSError:
+        pass
+
+
+class SessionCheckpointLog:
+    def __init__(self, path, fsync_interval=30):
+        """
+        Args:
+            path: Log file, appended to
+            fsync_interval: Most seconds between fsyncs (0 = fsync every record)
+        """
+        self.path = path
+        self.fsync_interval = fsync_interval
+        self.file = open(path, 'a', encoding='utf-8')
+        # Held until close: marks the session as live for recovery in other processes
+        if not _lock_file(self.file.fileno()):
+            self.file.close()
+            raise OSError(f"checkpoint log {path} is locked by another process")
+        self.lock = threading.Lock()
+        self.last_fsync = time.monotonic()
+        self.stats = {'records': 0, 'bytes': 0, 'total_ms': 0.0, 'max_ms': 0.0}
+
+    def append(self, record):
+        """Append one record; flushed immediately, fsynced per fsync_interval"""
+        started = time.perf_counter()
+        line = json.dumps(record, separators=(',', ':')) + "\n"
+        with self.lock:
+            if self.file is None:
+                return
+            self.file.write(line)
+            self.file.flush()
+            if time.monotonic() - self.last_fsync >= self.fsync_interval:
+                os.fsync(self.file.fileno())
+                self.last_fsync = time.monotonic()
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.stats['records'] += 1
+        self.stats['bytes'] += len(line)
+        self.stats['total_ms'] += elapsed_ms
+        self.stats['max_ms'] = max(self.stats['max_ms'], elapsed_ms)
+
+    def close(self, discard=False):
+        """
+        Close the log
+
+        Args:
+            discard: Delete the file (the session was uploaded)
+        """
+        with self.lock:
+            if self.file is None:
+                return
+            if not discard:
+                self.file.flush()
+                os.fsync(self.file.fileno())
+            _unlock_file(self.file.fileno())
+            self.file.close()
+            self.file = None
+        if discard:
+            remove_checkpoint(self.path)
+
+    def get_stats(self):
+        stats = dict(self.stats)
+        stats['avg_ms'] = round(stats['total_ms'] / stats['records'], 4) if stats['records'] else 0.0
+        stats['max_ms'] = round(stats['max_ms'], 4)
+        stats['total_ms'] = round(stats['total_ms'], 2)
+        return stats
+
+
+def _checkpoint_directory():
+    checkpoint_config = config_manager.get_checkpoint_config()
+    if not checkpoint_config.get('enabled', True):
+        return None
+    directory = checkpoint_config.get('directory', 'data/checkpoints')
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def open_checkpoint(kind, key, header):
+    """
+    Start the checkpoint log of a new session
+
+    Args:
+        kind: "program" or "activity"
+        key: Session key (e.g. "email|task")
+        header: First record, must identify the session for recovery
+
+    Returns:
+        SessionCheckpointLog, or None if checkpointing is disabled or unavailable
+    """
+    try:
+        directory = _checkpoint_directory()
+        if directory is None:
+            return None
+        safe_key = re.sub(r'[^A-Za-z0-9_.@-]+', '_', key)[:120]
+        path = os.path.join(directory, f"{kind}_{safe_key}_{time.time_ns()}{CHECKPOINT_SUFFIX}")
+        checkpoint = SessionCheckpointLog(
+            path, config_manager.get_checkpoint_config().get('fsync_interval_seconds', 30)
+        )
+        checkpoint.append(dict(header, type='start'))
+        return checkpoint
+    except OSError as e:
+        logger.error("❌ Session checkpoint unavailable, tracking without it: %s", e)
+        return None
+
+
+def iter_checkpoint(path):
+    """Yield the records of a checkpoint log, stopping at a torn last line"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning("⚠️ Torn checkpoint record in %s ignored", path)
+                return
+
+
+def remove_checkpoint(path):
+    """Delete a checkpoint log, False if it could not be removed (e.g. still open on Windows)"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning("⚠️ Could not remove checkpoint %s: %s", path, e)
+        return False
+    return True
+
+
+def claim_checkpoint(path):
+    """
+    Lock a leftover checkpoint log for recovery
+
+    Returns:
+        int: file descriptor holding the lock, pass it to release_checkpoint;
+             None if a live session (in any process) still writes the log
+    """
+    try:
+        fd = os.open(path, os.O_RDWR)
+    except OSError as e:
+        logger.warning("⚠️ Could not open checkpoint %s: %s", path, e)
+        return None
+    if not _lock_file(fd):
+        os.close(fd)
+        return None
+    return fd
+
+
+def release_checkpoint(path, fd, remove=False):
+    """
+    Unlock a claimed checkpoint log
+
+    Args:
+        path: Log file
+        fd: Descriptor returned by claim_checkpoint
+        remove: Delete the log (its session was uploaded)
+    """
+    _unlock_file(fd)
+    os.close(fd)
+    if remove:
+        remove_checkpoint(path)
+
+
+def list_checkpoints(kind, exclude=()):
+    """Checkpoint logs of a kind left on disk, oldest first"""
+    directory = _checkpoint_directory()
+    if directory is None:
+        return []
+    return sorted(
+        path for path in glob.glob(os.path.join(directory, f"{kind}_*{CHECKPOINT_SUFFIX}"))
+        if os.path.abspath(path) not in exclude
+    )
+
+
+def recover_all_checkpoints():
+    """Rebuild and upload every unfinished session found at startup"""
+    from .user_program_tracker import recover_program_checkpoints
+    from .active_window_tracker import recover_activity_checkpoints
+
+    started = time.perf_counter()
+    recovered = recover_program_checkpoints() + recover_activity_checkpoints()
+    if recovered:
+        logger.info("♻️ Recovered %d unfinished sessions from checkpoints in %.1f ms",
+                    recovered, (time.perf_counter() - started) * 1000)
+    return recovered
+
+
+def start_checkpoint_recovery():
+    """Run recover_all_checkpoints in the background (uploads can be slow)"""
+    thread = threading.Thread(target=recover_all_checkpoints, name="checkpoint-recovery", daemon=True)
+    thread.start()
+    return thread
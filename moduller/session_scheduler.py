@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Session Scheduler
+One thread runs the periodic jobs of all tracking sessions from a min-heap of
+due times, instead of one polling thread per session. Adding a session is a
+heap push, removing one marks its heap entry stale (skipped when popped), so
+both are O(log n). The thread sleeps until the earliest due time and records
+how late each run started, per session.
+"""
+
+import time
+import heapq
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class SessionScheduler:
+    def __init__(self, name="session-scheduler"):
+        """
+        Args:
+            name: Name of the scheduler thread
+        """
+        self.name = name
+        self.heap = []
+        self.jobs = {}
+        self.sequence = 0
+        self.condition = threading.Condition()
+        self.thread = None
+        self.running = False
+
+    def add(self, key, interval, callback, first_delay=None):
+        """
+        Run callback(key) every interval seconds until removed
+
+        Args:
+            key: Session key, replaces a job with the same key
+            interval: Seconds between runs (fixed rate)
+            callback: Called with the key on the scheduler thread
+            first_delay: Seconds until the first run (default: interval)
+        """
+        due = time.monotonic() + (interval if first_delay is None else first_delay)
+        with self.condition:
+            self.sequence += 1
+            self.jobs[key] = {
+                'interval': interval,
+                'callback': callback,
+                'due': due,
+                'generation': self.sequence,
+                'runs': 0,
+                'skipped': 0,
+                'last_lateness': 0.0,
+                'max_lateness': 0.0,
+                'total_lateness': 0.0,
+                'last_duration': 0.0
+            }
+            heapq.heappush(self.heap, (due, self.sequence, key))
+            self._ensure_thread()
+            self.condition.notify()
+
+    def remove(self, key):
+        """Stop running a session's job (its heap entry is dropped lazily)"""
+        with self.condition:
+            return self.jobs.pop(key, None) is not None
+
+    def _ensure_thread(self):
+        """Start the scheduler thread on first use (condition held)"""
+        if self.thread and self.thread.is_alive():
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop the scheduler thread, jobs are kept"""
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        if self.thread:
+            self.thread.join(timeout=5)
+            self.thread = None
+
+    def _next_due(self):
+        """Pop stale heap entries and return the next live one, or None (condition held)"""
+        while self.heap:
+            due, generation, key = self.heap[0]
+            job = self.jobs.get(key)
+            if job is not None and job['generation'] == generation:
+                return due, key, job
+            heapq.heappop(self.heap)
+        return None
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while self.running:
+                    entry = self._next_due()
+                    if entry is not None and entry[0] <= time.monotonic():
+                        break
+                    # No jobs: sleep until one is added
+                    self.condition.wait(None if entry is None else entry[0] - time.monotonic())
+                if not self.running:
+                    return
+
+                due, key, job = entry
+                heapq.heappop(self.heap)
+                started = time.monotonic()
+                lateness = started - due
+                job['runs'] += 1
+                job['last_lateness'] = lateness
+                job['max_lateness'] = max(job['max_lateness'], lateness)
+                job['total_lateness'] += lateness
+
+                # Fixed rate; if a whole interval was missed, skip ahead instead of bursting
+                next_due = due + job['interval']
+                if next_due <= started:
+                    missed = int((started - due) // job['interval'])
+                    job['skipped'] += missed
+                    next_due = due + (missed + 1) * job['interval']
+                self.sequence += 1
+                job['due'] = next_due
+                job['generation'] = self.sequence
+                heapq.heappush(self.heap, (next_due, self.sequence, key))
+                callback = job['callback']
+
+            try:
+                callback(key)
+            except Exception as e:
+                logger.error("❌ Scheduled job for %s failed: %s", key, e)
+            job['last_duration'] = time.monotonic() - started
+
+    def get_stats(self):
+        """Get per-session run counts and start lateness (seconds)"""
+        with self.condition:
+            jobs = {key: dict(job) for key, job in self.jobs.items()}
+            heap_size = len(self.heap)
+
+        now = time.monotonic()
+        sessions = {}
+        for key, job in jobs.items():
+            sessions[key] = {
+                'interval_seconds': job['interval'],
+                'runs': job['runs'],
+                'skipped': job['skipped'],
+                'next_run_in_seconds': round(job['due'] - now, 3),
+                'last_lateness_ms': round(job['last_lateness'] * 1000, 1),
+                'avg_lateness_ms': round(job['total_lateness'] / job['runs'] * 1000, 1) if job['runs'] else 0.0,
+                'max_lateness_ms': round(job['max_lateness'] * 1000, 1),
+                'last_duration_ms': round(job['last_duration'] * 1000, 1)
+            }
+        return {
+            'thread_alive': bool(self.thread and self.thread.is_alive()),
+            'sessions': len(sessions),
+            'heap_entries': heap_size,
+            'per_session': sessions
+        }
@@ -1,15 +1,16 @@
 from datetime import datetime
 from pathlib import Path
 import logging
-import boto3
 import os
 import glob
 import json
-import psutil
 import threading
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 import time
 import requests
+from .s3_uploader import get_s3_client, _timed_s3_call
+from .minute_bitmap import MinuteBitmap, rollup
+from .process_sampler import get_process_sampler
 
 try:
     from .active_window_tracker import get_tracker as get_window_tracker, start_active_window_tracking, get_current_activity_summary
@@ -89,139 +90,535 @@ def send_summary_to_backend(email, task_name):
     except Exception as e:
         logger.error("❌ Error sending summary to backend: %s", e)
 
-def save_raw_program_log(email, task_name, program_data):
+# Raw program logs are append-only JSON Lines, fsynced every N appends
+RAW_LOG_FSYNC_EVERY = int(os.getenv("RAW_LOG_FSYNC_EVERY", 5))
+# Full process list every N snapshots, only start/exit events in between
+RAW_LOG_KEYFRAME_EVERY = int(os.getenv("RAW_LOG_KEYFRAME_EVERY", 60))
+
+# Rows are stamped with the snapshot time: the minute logger needs a fresh one, a
+# stale snapshot falls into the previous minute of the minute bitmaps
+MINUTE_LOG_MAX_AGE_SECONDS = 2
+
+# Raw logs kept open at once (sessions/days logged in turn), least recently used closed first
+RAW_LOG_MAX_OPEN_WRITERS = int(os.getenv("RAW_LOG_MAX_OPEN_WRITERS", 8))
+
+_raw_log_writers = OrderedDict()
+_raw_log_writers_lock = threading.Lock()
+
+
+class ProcessSnapshotDiffer:
     """
-    Appends current minute's program data to raw log file.
-    File: logs/YYYY-MM-DD/email/task_name/task_name_program_raw.json
+    Turns full process snapshots into raw-log records keyed on (pid, create_time):
+    a "keyframe" with every process, then per snapshot only "start"/"exit" events
+    and a small "tick" marking the sampled minute. A keyframe (which is also a
+    tick) is repeated every keyframe_every snapshots.
     """
-    date_str = datetime.now().strftime("%Y-%m-%d")
-    safe_email = sanitize(email)
-    # Keep the original task name but sanitize it for folder/file names
+
+    def __init__(self, keyframe_every=RAW_LOG_KEYFRAME_EVERY):
+        self.keyframe_every = max(1, keyframe_every)
+        self.previous = None
+        self.snapshots_since_keyframe = 0
+
+    def diff(self, snapshot, timestamp):
+        """
+        Args:
+            snapshot: list of {pid, create_time, program, path} (see collect_active_programs)
+            timestamp: ISO time of the snapshot
+
+        Returns:
+            list: raw-log records for this snapshot
+        """
+        current = {(p["pid"], p["create_time"]): p for p in snapshot}
+
+        if self.previous is None or self.snapshots_since_keyframe >= self.keyframe_every - 1:
+            self.previous = current
+            self.snapshots_since_keyframe = 0
+            return [{
+                "event": "keyframe",
+                "timestamp": timestamp,
+                "processes": [_process_record(p) for p in current.values()]
+            }]
+
+        records = [
+            dict(_process_record(self.previous[key]), event="exit", timestamp=timestamp)
+            for key in self.previous.keys() - current.keys()
+        ]
+        records.extend(
+            dict(_process_record(current[key]), event="start", timestamp=timestamp)
+            for key in current.keys() - self.previous.keys()
+        )
+        records.append({"event": "tick", "timestamp": timestamp})
+
+        self.previous = current
+        self.snapshots_since_keyframe += 1
+        return records
+
+
+def _process_record(process):
+    return {
+        "pid": process["pid"],
+        "create_time": process["create_time"],
+        "program": process["program"],
+        "path": process.get("path")
+    }
+
+
+class RawProgramLogWriter:
+    """
+    Buffered append-only writer for one {task}_program_raw.jsonl file.
+    Each append is flushed to the OS so readers see it right away; fsync is
+    batched every RAW_LOG_FSYNC_EVERY appends (and on close).
+    """
+
+    def __init__(self, path, fsync_every=RAW_LOG_FSYNC_EVERY):
+        self.path = path
+        self.fsync_every = max(1, fsync_every)
+        self.unsynced = 0
+        self.lock = threading.RLock()
+        # A new writer (new session, restart) always starts with a keyframe
+        self.differ = ProcessSnapshotDiffer()
+        self.file = open(path, "a", encoding="utf-8", buffering=1024 * 1024)
+
+    def append(self, entries):
+        with self.lock:
+            for entry in entries:
+                self.file.write(json.dumps(entry, ensure_ascii=False))
+                self.file.write("\n")
+            self.file.flush()
+            self.unsynced += 1
+            if self.unsynced >= self.fsync_every:
+                os.fsync(self.file.fileno())
+                self.unsynced = 0
+
+    def append_snapshot(self, snapshot, timestamp):
+        """Diff a full process snapshot against the previous one and append the records"""
+        with self.lock:
+            self.append(self.differ.diff(snapshot, timestamp))
+
+    def close(self):
+        with self.lock:
+            if self.file.closed:
+                return
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.file.close()
+
+
+def get_raw_log_path(email, task_name, date_str=None):
+    """Path of the raw program log of a task for a day (today by default)"""
+    date_str = date_str or datetime.now().strftime("%Y-%m-%d")
     safe_task = sanitize(task_name)[:50]
+    base_folder = os.path.join("logs", date_str, sanitize(email), safe_task)
+    return os.path.join(base_folder, f"{safe_task}_program_raw.jsonl")
 
-    base_folder = os.path.join("logs", date_str, safe_email, safe_task)
-    os.makedirs(base_folder, exist_ok=True)
 
-    filename = os.path.join(base_folder, f"{safe_task}_program_raw.json")
+def _get_raw_log_writer(path):
+    """Get the open writer of a raw log, closing the least recently used one beyond RAW_LOG_MAX_OPEN_WRITERS"""
+    with _raw_log_writers_lock:
+        writer = _raw_log_writers.get(path)
+        if writer is not None:
+            _raw_log_writers.move_to_end(path)
+            return writer
+        while len(_raw_log_writers) >= max(1, RAW_LOG_MAX_OPEN_WRITERS):
+            _raw_log_writers.popitem(last=False)[1].close()
+        writer = RawProgramLogWriter(path)
+        _raw_log_writers[path] = writer
+        return writer
 
-    try:
-        # Load old data if file exists
-        if os.path.exists(filename):
-            with open(filename, "r", encoding="utf-8") as f:
-                old_data = json.load(f)
-        else:
-            old_data = []
 
-        # Append new usage data
-        old_data.extend(program_data)
+def close_raw_program_logs():
+    """Flush, fsync and close all open raw program logs"""
+    with _raw_log_writers_lock:
+        for path in list(_raw_log_writers):
+            _raw_log_writers.pop(path).close()
 
-        # Save back
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(old_data, f, indent=2, ensure_ascii=False)
 
+def save_raw_program_log(email, task_name, program_data):
+    """
+    Appends current minute's program data to raw log file.
+    File: logs/YYYY-MM-DD/email/task_name/task_name_program_raw.jsonl (one record per line)
+    Snapshots from collect_active_programs are stored as start/exit events plus
+    periodic keyframes, entries without pid/create_time are stored as they are.
+    """
+    filename = get_raw_log_path(email, task_name)
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+
+    try:
+        # Migrate a legacy .json log of the same day before appending to it
+        legacy_file = filename[:-1]
+        if os.path.exists(legacy_file):
+            convert_raw_program_log(legacy_file)
+
+        writer = _get_raw_log_writer(filename)
+        if all("pid" in p and "create_time" in p for p in program_data):
+            writer.append_snapshot(program_data, datetime.now().isoformat())
+        else:
+            writer.append(program_data)
         logger.info("📦 Appended raw log data to: %s", filename)
     except Exception as e:
         logger.error("❌ Error saving raw program log: %s", e)
 
     return filename
 
-def update_summary_log(email, task_name, _program_data=None):
+
+def iter_raw_program_log(path):
     """
-    Summarizes all raw log entries by:
-    - Program name (with aliases)
-    - Grouped by category (e.g., Browsers, Communication)
-    - ✅ FIXED: Only counts unique minutes per program
+    Stream the entries of a raw program log without loading it whole.
+    Reads .jsonl line by line, legacy .json lists are loaded at once.
+    A truncated last line (crash mid-write) is skipped.
     """
-    date_str = datetime.now().strftime("%Y-%m-%d")
-    safe_email = sanitize(email)
-    safe_task = sanitize(task_name)[:50]
-
-    base_folder = os.path.join("logs", date_str, safe_email, safe_task)
-    raw_file = os.path.join(base_folder, f"{safe_task}_program_raw.json")
-    summary_file = os.path.join(base_folder, f"{safe_task}_program_summary.json")
+    if path.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            yield from json.load(f)
+        return
 
-    program_aliases = {
-        "Code.exe": "VSCode",
-        "chrome.exe": "Chrome",
-        "msedge.exe": "Edge",
-        "explorer.exe": "File Explorer",
-        "Teams.exe": "Teams",
-        "WhatsApp.exe": "WhatsApp",
-        "Zoom.exe": "Zoom",
-        "POWERPNT.EXE": "PowerPoint",
-        "WINWORD.EXE": "Word",
-        "EXCEL.EXE": "Excel"
-    }
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning("⚠️ Skipping unreadable line in %s", path)
 
-    program_categories = {
-        "VSCode": "Development",
-        "Chrome": "Browsers",
-        "Edge": "Browsers",
-        "File Explorer": "Productivity",
-        "Teams": "Communication",
-        "WhatsApp": "Communication",
-        "Zoom": "Communication",
-        "PowerPoint": "Productivity",
-        "Word": "Productivity",
-        "Excel": "Productivity"
-    }
 
-    system_processes = {
-        "svchost.exe", "conhost.exe", "csrss.exe", "dllhost.exe", "winlogon.exe",
-        "wininit.exe", "lsass.exe", "services.exe", "smss.exe", "spoolsv.exe",
-        "fontdrvhost.exe", "taskhostw.exe", "RuntimeBroker.exe", "MemCompression",
-        "SearchIndexer.exe", "SearchProtocolHost.exe", "SearchFilterHost.exe",
-        "ApplicationFrameHost.exe", "dwm.exe", "ctfmon.exe", "sihost.exe",
-        "ShellExperienceHost.exe", "StartMenuExperienceHost.exe", "LockApp.exe",
-        "SystemSettings.exe", "NVIDIA Web Helper.exe", "MsMpEng.exe", "SecurityHealthService.exe",
-        "SecurityHealthSystray.exe", "MpDefenderCoreService.exe", "vmcompute.exe", "vmms.exe",
-        "vmnetdhcp.exe", "vmnat.exe", "vmware-authd.exe", "vmware-usbarbitrator64.exe", "vmware-tray.exe",
-        "CompPkgSrv.exe", "NisSrv.exe", "WmiPrvSE.exe", "UserOOBEBroker.exe", "PhoneExperienceHost.exe"
-    }
+def read_raw_program_log(path):
+    """Read all entries of a raw program log into a list"""
+    return list(iter_raw_program_log(path))
 
-    try:
-        with open(raw_file, "r", encoding="utf-8") as f:
-            raw_data = json.load(f)
-    except Exception as e:
-        logger.error("❌ Error reading raw file: %s", e)
-        return
 
-    # ✅ Build program → set of unique minute timestamps
-    program_time_map = defaultdict(set)
+def get_program_intervals(path):
+    """
+    Rebuild process run intervals from a raw program log
 
-    for entry in raw_data:
-        raw_name = entry.get("program", "Unknown")
-        timestamp = entry.get("timestamp")
+    Returns:
+        list of {program, path, pid, start, end} sorted by start; a process still
+        running at the end of the log ends at the last sampled time. Legacy
+        per-minute rows become zero-length intervals.
+    """
+    intervals = []
+    open_intervals = {}
+    last_seen = None
+
+    def close(key, end):
+        interval = open_intervals.pop(key)
+        interval["end"] = end
+        intervals.append(interval)
+
+    def open_interval(key, process, start):
+        open_intervals[key] = {
+            "program": process["program"],
+            "path": process.get("path"),
+            "pid": process["pid"],
+            "start": start,
+            "end": None
+        }
 
-        if raw_name in system_processes:
+    for record in iter_raw_program_log(path):
+        event = record.get("event")
+        timestamp = record.get("timestamp")
+        if event is None:
+            intervals.append({"program": record.get("program"), "path": record.get("path"), "pid": None,
+                              "start": timestamp, "end": timestamp})
             continue
 
-        if not timestamp:
-            continue
+        if event == "keyframe":
+            current = {(p["pid"], p["create_time"]): p for p in record["processes"]}
+            for key in list(open_intervals):
+                if key not in current:
+                    close(key, last_seen or timestamp)
+            for key, process in current.items():
+                if key not in open_intervals:
+                    open_interval(key, process, timestamp)
+        elif event == "start":
+            open_interval((record["pid"], record["create_time"]), record, timestamp)
+        elif event == "exit":
+            key = (record["pid"], record["create_time"])
+            if key in open_intervals:
+                close(key, timestamp)
+        last_seen = timestamp
+
+    for key in list(open_intervals):
+        close(key, last_seen)
+    return sorted(intervals, key=lambda interval: interval["start"] or "")
+
+
+def convert_raw_program_log(json_path):
+    """
+    One-shot conversion of a legacy {task}_program_raw.json list into the
+    append-only .jsonl format. Entries already in a .jsonl of the same name are
+    kept after the converted ones. The .json file is removed afterwards.
+
+    Returns:
+        str: path of the .jsonl file
+    """
+    jsonl_path = json_path + "l"
+    temp_path = jsonl_path + ".tmp"
+
+    with _raw_log_writers_lock:
+        writer = _raw_log_writers.pop(jsonl_path, None)
+        if writer:
+            writer.close()
+
+        count = 0
+        with open(temp_path, "w", encoding="utf-8") as out:
+            for entry in iter_raw_program_log(json_path):
+                out.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                count += 1
+            if os.path.exists(jsonl_path):
+                with open(jsonl_path, "r", encoding="utf-8") as existing:
+                    for line in existing:
+                        out.write(line)
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(temp_path, jsonl_path)
+        os.remove(json_path)
+
+    logger.info("🔁 Converted %d raw log entries: %s → %s", count, json_path, jsonl_path)
+    return jsonl_path
+
+
+def convert_all_raw_program_logs(logs_base_path="logs"):
+    """Convert every legacy *_program_raw.json below the logs directory"""
+    converted = []
+    for json_path in glob.glob(os.path.join(logs_base_path, "**", "*_program_raw.json"), recursive=True):
+        try:
+            converted.append(convert_raw_program_log(json_path))
+        except Exception as e:
+            logger.error("❌ Could not convert %s: %s", json_path, e)
+    return converted
+
+PROGRAM_ALIASES = {
+    "Code.exe": "VSCode",
+    "chrome.exe": "Chrome",
+    "msedge.exe": "Edge",
+    "explorer.exe": "File Explorer",
+    "Teams.exe": "Teams",
+    "WhatsApp.exe": "WhatsApp",
+    "Zoom.exe": "Zoom",
+    "POWERPNT.EXE": "PowerPoint",
+    "WINWORD.EXE": "Word",
+    "EXCEL.EXE": "Excel"
+}
+
+PROGRAM_CATEGORIES = {
+    "VSCode": "Development",
+    "Chrome": "Browsers",
+    "Edge": "Browsers",
+    "File Explorer": "Productivity",
+    "Teams": "Communication",
+    "WhatsApp": "Communication",
+    "Zoom": "Communication",
+    "PowerPoint": "Productivity",
+    "Word": "Productivity",
+    "Excel": "Productivity"
+}
+
+SYSTEM_PROCESSES = {
+    "svchost.exe", "conhost.exe", "csrss.exe", "dllhost.exe", "winlogon.exe",
+    "wininit.exe", "lsass.exe", "services.exe", "smss.exe", "spoolsv.exe",
+    "fontdrvhost.exe", "taskhostw.exe", "RuntimeBroker.exe", "MemCompression",
+    "SearchIndexer.exe", "SearchProtocolHost.exe", "SearchFilterHost.exe",
+    "ApplicationFrameHost.exe", "dwm.exe", "ctfmon.exe", "sihost.exe",
+    "ShellExperienceHost.exe", "StartMenuExperienceHost.exe", "LockApp.exe",
+    "SystemSettings.exe", "NVIDIA Web Helper.exe", "MsMpEng.exe", "SecurityHealthService.exe",
+    "SecurityHealthSystray.exe", "MpDefenderCoreService.exe", "vmcompute.exe", "vmms.exe",
+    "vmnetdhcp.exe", "vmnat.exe", "vmware-authd.exe", "vmware-usbarbitrator64.exe", "vmware-tray.exe",
+    "CompPkgSrv.exe", "NisSrv.exe", "WmiPrvSE.exe", "UserOOBEBroker.exe", "PhoneExperienceHost.exe"
+}
+
+SUMMARY_STATE_VERSION = 3
+
+
+def _add_entry_minute(program_time_map, entry):
+    """Record the minute of one raw entry in its program's day bitmap (system processes are ignored)"""
+    raw_name = entry.get("program", "Unknown")
+    timestamp = entry.get("timestamp")
+
+    if raw_name in SYSTEM_PROCESSES:
+        return
+
+    if not timestamp:
+        return
+
+    # Minute-level: one bit per minute of the day, a minute counts once per program
+    program_name = PROGRAM_ALIASES.get(raw_name, raw_name)
+    try:
+        program_time_map[program_name].add(timestamp)
+    except ValueError:
+        logger.warning("⚠️ Skipping entry with invalid timestamp: %s", timestamp)
 
-        # Normalize to "YYYY-MM-DDTHH:MM" (minute-level)
-        minute_key = timestamp[:16]
-        program_name = program_aliases.get(raw_name, raw_name)
-        program_time_map[program_name].add(minute_key)
 
-    # ✅ Create summary based on unique minutes
-    sorted_programs = dict(sorted(program_time_map.items(), key=lambda x: len(x[1]), reverse=True))
-    program_summary = {prog: f"{len(minutes):.1f} mins" for prog, minutes in sorted_programs.items()}
+def _build_program_summary(program_time_map):
+    """Build the categories/programs summary from program → minute bitmap"""
+    # ✅ Create summary based on unique minutes (popcount of each bitmap)
+    program_minutes = {prog: bitmap.count() for prog, bitmap in program_time_map.items()}
+    sorted_programs = dict(sorted(program_minutes.items(), key=lambda x: x[1], reverse=True))
+    program_summary = {prog: f"{minutes:.1f} mins" for prog, minutes in sorted_programs.items()}
 
-    # ✅ Build category summary
+    # ✅ Build category summary (sum of program minutes, as before)
     category_counts = defaultdict(int)
     for prog, minutes in sorted_programs.items():
-        category = program_categories.get(prog, "Unknown")
-        category_counts[category] += len(minutes)
+        category = PROGRAM_CATEGORIES.get(prog, "Unknown")
+        category_counts[category] += minutes
 
     sorted_categories = dict(sorted(category_counts.items(), key=lambda x: x[1], reverse=True))
     category_summary = {k: f"{v:.1f} mins" for k, v in sorted_categories.items()}
 
-    final_summary = {
+    return {
         "categories": category_summary,
         "programs": program_summary
     }
 
+
+def get_category_active_minutes(program_time_map):
+    """
+    Wall-clock minutes per category: the OR of its programs' bitmaps, so two
+    browsers open in the same minute count once (unlike the summary's sum)
+    """
+    category_bitmaps = defaultdict(list)
+    for prog, bitmap in program_time_map.items():
+        category_bitmaps[PROGRAM_CATEGORIES.get(prog, "Unknown")].append(bitmap)
+    return {category: rollup(bitmaps).count() for category, bitmaps in category_bitmaps.items()}
+
+
+def get_program_overlap_minutes(program_time_map, program_a, program_b):
+    """Minutes in which both programs were running (AND of their bitmaps)"""
+    empty = MinuteBitmap()
+    return (program_time_map.get(program_a, empty) & program_time_map.get(program_b, empty)).count()
+
+
+def _apply_raw_record(program_time_map, alive, record):
+    """
+    Fold one raw-log record into the minute bitmaps
+
+    Snapshot records keep the set of running processes in `alive`
+    ("pid:create_time" -> program); every keyframe/tick marks its minute for each
+    running program, so the unique-minute counts match one row per process per minute.
+    Legacy rows (no "event") count their own minute.
+    """
+    event = record.get("event")
+    if event is None:
+        _add_entry_minute(program_time_map, record)
+        return
+
+    if event == "keyframe":
+        alive.clear()
+        alive.update({f"{p['pid']}:{p['create_time']}": p["program"] for p in record["processes"]})
+    elif event == "start":
+        alive[f"{record['pid']}:{record['create_time']}"] = record["program"]
+        return
+    elif event == "exit":
+        alive.pop(f"{record['pid']}:{record['create_time']}", None)
+        return
+
+    # keyframe or tick: one sampled minute
+    for program in set(alive.values()):
+        _add_entry_minute(program_time_map, {"program": program, "timestamp": record["timestamp"]})
+
+
+def build_summary_from_raw(raw_file):
+    """Summarize a whole raw log in one pass (full rescan, used to rebuild/verify)"""
+    program_time_map = defaultdict(MinuteBitmap)
+    alive = {}
+    for record in iter_raw_program_log(raw_file):
+        _apply_raw_record(program_time_map, alive, record)
+    return _build_program_summary(program_time_map)
+
+
+def _load_summary_state(state_file, raw_file):
+    """
+    Load the persisted per-program minutes, running processes and raw-log offset.
+    Starts over when the raw log was replaced (e.g. by the .json converter) or truncated.
+    """
+    raw_stat = os.stat(raw_file)
+    try:
+        with open(state_file, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        if (state.get("version") == SUMMARY_STATE_VERSION
+                and state.get("raw_inode") == raw_stat.st_ino
+                and state.get("offset", 0) <= raw_stat.st_size):
+            return state["offset"], defaultdict(MinuteBitmap, {
+                p: MinuteBitmap.from_json(days) for p, days in state["programs"].items()
+            }), state["alive"]
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.warning("⚠️ Summary state unreadable, rebuilding: %s", e)
+    return 0, defaultdict(MinuteBitmap), {}
+
+
+def _save_summary_state(state_file, raw_file, offset, program_time_map, alive):
+    temp_file = state_file + ".tmp"
+    with open(temp_file, "w", encoding="utf-8") as f:
+        json.dump({
+            "version": SUMMARY_STATE_VERSION,
+            "raw_inode": os.stat(raw_file).st_ino,
+            "offset": offset,
+            "programs": {p: bitmap.to_json() for p, bitmap in program_time_map.items()},
+            "alive": alive
+        }, f, ensure_ascii=False)
+    os.replace(temp_file, state_file)
+
+
+def update_summary_state(raw_file, state_file):
+    """
+    Fold the raw-log entries appended since the last call into the persisted state
+
+    Only complete lines after the stored byte offset are read, a line still being
+    written is left for the next tick.
+
+    Returns:
+        dict: the summary, identical to build_summary_from_raw(raw_file)
+    """
+    offset, program_time_map, alive = _load_summary_state(state_file, raw_file)
+
+    with open(raw_file, "rb") as f:
+        f.seek(offset)
+        chunk = f.read()
+    complete = chunk[:chunk.rfind(b"\n") + 1]
+
+    for line in complete.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            _apply_raw_record(program_time_map, alive, json.loads(line))
+        except json.JSONDecodeError:
+            logger.warning("⚠️ Skipping unreadable line in %s", raw_file)
+
+    _save_summary_state(state_file, raw_file, offset + len(complete), program_time_map, alive)
+    return _build_program_summary(program_time_map)
+
+
+def update_summary_log(email, task_name, _program_data=None):
+    """
+    Summarizes all raw log entries by:
+    - Program name (with aliases)
+    - Grouped by category (e.g., Browsers, Communication)
+    - ✅ FIXED: Only counts unique minutes per program
+    Only entries appended since the last call are read, see update_summary_state.
+    """
+    date_str = datetime.now().strftime("%Y-%m-%d")
+    safe_email = sanitize(email)
+    safe_task = sanitize(task_name)[:50]
+
+    base_folder = os.path.join("logs", date_str, safe_email, safe_task)
+    raw_file = os.path.join(base_folder, f"{safe_task}_program_raw.jsonl")
+    summary_file = os.path.join(base_folder, f"{safe_task}_program_summary.json")
+    state_file = os.path.join(base_folder, f"{safe_task}_program_summary_state.json")
+
+    if not os.path.exists(raw_file):
+        logger.error("❌ Error reading raw file: %s not found", raw_file)
+        return
+
+    try:
+        final_summary = update_summary_state(raw_file, state_file)
+    except Exception as e:
+        logger.error("❌ Error reading raw file: %s", e)
+        return
+
     try:
         with open(summary_file, "w", encoding="utf-8") as f:
             json.dump(final_summary, f, indent=2, ensure_ascii=False)
@@ -229,6 +626,7 @@ def update_summary_log(email, task_name, _program_data=None):
     except Exception as e:
         logger.error("❌ Error saving summary file: %s", e)
 
+
 def save_text_log():
     """
     Session info ko ek plain text (.txt) file mein save karta hai.
@@ -258,25 +656,32 @@ def get_program_history_and_save(email: str, task_name: str) -> str:
     Programs ka usage collect kar ke raw log save karta hai.
     File path return karta hai.
     """
-    usage_data = collect_active_programs()
+    usage_data = collect_active_programs(max_age=MINUTE_LOG_MAX_AGE_SECONDS)
     file_path = save_raw_program_log(email, task_name, usage_data)
     return file_path
 
-def collect_active_programs():
-    """System ke current active programs ka simple snapshot."""
-    active_programs = []
-    for proc in psutil.process_iter(['pid', 'name', 'exe']):
-        try:
-            info = proc.info
-            if info['name'] and info['exe']:
-                active_programs.append({
-                    "program": info['name'],
-                    "path": info['exe'],
-                    "timestamp": datetime.now().isoformat()
-                })
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            continue
-    return active_programs
+def collect_active_programs(max_age=None):
+    """
+    System ke current active programs ka simple snapshot.
+
+    Shared process sampler se aata hai, har caller apna psutil scan nahi karta.
+
+    Args:
+        max_age: Snapshot is se purana ho to rescan (default: configured staleness)
+    """
+    snapshot = get_process_sampler().get_snapshot(max_age=max_age)
+    timestamp = snapshot['taken_at'].isoformat()
+    return [
+        {
+            "program": proc['program'],
+            "path": proc['path'],
+            "pid": proc['pid'],
+            "create_time": proc['create_time'],
+            "timestamp": timestamp
+        }
+        for proc in snapshot['processes']
+        if proc['program'] and proc['path']
+    ]
 
 def collect_program_usage():
     """Alias for collect_active_programs for backward compatibility"""
@@ -290,7 +695,7 @@ def auto_log_every_minute():
             session = get_current_session()
             if session:
                 email, task_name = session
-                usage = collect_active_programs()
+                usage = collect_active_programs(max_age=MINUTE_LOG_MAX_AGE_SECONDS)
 
                 # 🛠 Save actual usage to raw file
                 save_raw_program_log(email=email, task_name=task_name, program_data=usage)
@@ -344,7 +749,7 @@ def logs_file(local_path, email, task_name):
     date_folder = datetime.now().strftime("%Y-%m-%d")
     safe_email = email.replace("@", "_at_")
     safe_task = task_name.replace(" ", "_").replace("/", "_")
-    s3_key = f"users_logs/{date_folder}/{safe_email}/{safe_task}/program_{timestamp}.json"
+    s3_key = f"users_logs/{date_folder}/{safe_email}/{safe_task}/program_{timestamp}{Path(local_path).suffix or '.json'}"
 
     logger.info("📁 Local file: %s", local_path)
     logger.info("👤 Email: %s", email)
@@ -352,13 +757,8 @@ def logs_file(local_path, email, task_name):
     logger.info("☁️ S3 key: %s", s3_key)
 
     try:
-        session = boto3.Session(
-            aws_access_key_id=access_key,
-            aws_secret_access_key=secret_key,
-            region_name=region
-        )
-        s3 = session.client('s3')
-        s3.upload_file(str(local_path), bucket, s3_key)
+        s3 = get_s3_client(access_key, secret_key, region)
+        _timed_s3_call("logs_file", s3.upload_file, str(local_path), bucket, s3_key)
 
         url = f"https://{bucket}.s3.{region}.amazonaws.com/{s3_key}"
         logger.info("✅ Upload successful: %s", url)
@@ -386,9 +786,10 @@ def upload_tracker_logs(logs_base_path=None):
     
     uploaded_files = []
     
-    # Find all JSON files in the logs directory structure
-    json_pattern = str(logs_base_path / "**" / "*.json")
-    json_files = glob.glob(json_pattern, recursive=True)
+    # Find all JSON / JSON Lines files in the logs directory structure
+    json_files = []
+    for pattern in ("*.json", "*.jsonl"):
+        json_files.extend(glob.glob(str(logs_base_path / "**" / pattern), recursive=True))
     
     for json_file in json_files:
         json_path = Path(json_file)
@@ -558,6 +959,7 @@ def stop_logging():
     """
     global _logging_active
     _logging_active = False
+    close_raw_program_logs()
     logger.info("🛑 Logging system stopped")
 
 def upload_logs_on_app_close():
@@ -566,6 +968,7 @@ def upload_logs_on_app_close():
     """
     try:
         logger.info("📤 Uploading logs on app close...")
+        close_raw_program_logs()
         uploaded_files = upload_tracker_logs()
         logger.info(f"✅ Upload complete: {len(uploaded_files)} files uploaded")
         return uploaded_files
@@ -577,7 +980,11 @@ if __name__ == "__main__":
     # Example usage
     import sys
     
-    if len(sys.argv) > 1:
+    if len(sys.argv) > 1 and sys.argv[1] == "--convert-raw-logs":
+        # Migrate legacy *_program_raw.json files to .jsonl
+        converted = convert_all_raw_program_logs(sys.argv[2] if len(sys.argv) > 2 else "logs")
+        print(f"🔁 Converted {len(converted)} raw program logs")
+    elif len(sys.argv) > 1:
         # Upload specific file
         specific_file = sys.argv[1]
         logger.info("🎯 Uploading specific file: %s", specific_file)
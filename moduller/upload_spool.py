@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Upload Spool
+Durable, disk-backed spool for S3-bound payloads (one immutable file per
+payload, written to a temp name, fsynced and atomically renamed). High-priority
+payloads (logs, program tracking) are spooled before their upload, the rest
+only once their upload failed. Payloads whose upload fails stay on disk and a background drainer retries them with exponential
+backoff, highest priority first. The spool is bounded by a disk quota, the
+oldest payloads are evicted when it is exceeded.
+
+Spool file layout: one JSON header line (bucket, key, content type, ...) followed
+by the raw body bytes.
+"""
+
+import os
+import json
+import time
+import random
+import threading
+import logging
+from datetime import datetime
+
+from .config_manager import config_manager
+
+logger = logging.getLogger(__name__)
+
+# Lower number = uploaded first
+SPOOL_PRIORITY_HIGH = 0      # program tracking, activity and session logs
+SPOOL_PRIORITY_NORMAL = 5    # default
+SPOOL_PRIORITY_LOW = 9       # screenshots, timelapse segments and their sidecar manifests
+
+SPOOL_FILE_SUFFIX = ".spool"
+SPOOL_TEMP_SUFFIX = ".tmp"
+
+
+class UploadSpool:
+    def __init__(self, directory="data/upload_spool", max_bytes=500 * 1024 * 1024,
+                 base_backoff=5, max_backoff=600):
+        """
+        Args:
+            directory: Spool directory
+            max_bytes: Disk quota, oldest payloads are evicted beyond it
+            base_backoff: Seconds before the first retry, doubled per failed attempt
+            max_backoff: Upper bound of the retry delay
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+
+        self.entries = {}
+        self.total_bytes = 0
+        self.sequence = 0
+        self.paused_until = 0.0
+        self.condition = threading.Condition()
+        self.running = False
+        self.drainer = None
+
+        self.metrics = {
+            'spooled': 0,
+            'uploaded': 0,
+            'retried': 0,
+            'failed_attempts': 0,
+            'evicted': 0,
+            'evicted_bytes': 0,
+            'last_error': None
+        }
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        """Index payloads left over from a previous run, drop incomplete writes"""
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith(SPOOL_TEMP_SUFFIX):
+                os.remove(path)
+                continue
+            if not name.endswith(SPOOL_FILE_SUFFIX):
+                continue
+            try:
+                with open(path, 'rb') as f:
+                    header = json.loads(f.readline())
+                self._index(name, header, os.path.getsize(path))
+            except Exception as e:
+                logger.warning("⚠️ Unreadable spool file %s removed: %s", name, e)
+                os.remove(path)
+
+        if self.entries:
+            logger.info("📦 Upload spool holds %d payloads (%d bytes) from a previous run",
+                        len(self.entries), self.total_bytes)
+
+    def _index(self, entry_id, header, size):
+        self.entries[entry_id] = {
+            'priority': header.get('priority', SPOOL_PRIORITY_NORMAL),
+            'created': header.get('created', time.time()),
+            'operation': header.get('operation', 'spool'),
+            'after': header.get('after'),
+            'size': size,
+            'attempts': 0,
+            'next_attempt': 0.0,
+            'in_flight': False
+        }
+        self.total_bytes += size
+
+    def _fsync_directory(self):
+        """Persist the rename itself (not supported on Windows)"""
+        try:
+            fd = os.open(self.directory, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def write(self, bucket, key, body, content_type, metadata=None, region=None,
+              priority=SPOOL_PRIORITY_NORMAL, operation="spool", claim=True, after=None):
+        """
+        Durably store a payload before it is uploaded
+
+        Args:
+            bucket, key, body, content_type, metadata: The S3 put_object arguments
+            region: Region of the client to upload with
+            priority: SPOOL_PRIORITY_* value, lower is uploaded first
+            operation: Name used for S3 latency stats when the drainer uploads it
+            claim: Keep the drainer away, the caller uploads right away and reports back
+                   with remove() or mark_failed()
+            after: Entry id that must be uploaded first (e.g. the object a manifest points at)
+
+        Returns:
+            str: spool entry id
+        """
+        header = {
+            'bucket': bucket,
+            'key': key,
+            'content_type': content_type,
+            'metadata': metadata or {},
+            'region': region,
+            'priority': priority,
+            'operation': operation,
+            'created': time.time(),
+            'after': after
+        }
+
+        with self.condition:
+            self.sequence += 1
+            entry_id = f"{priority}-{time.time_ns()}-{self.sequence}{SPOOL_FILE_SUFFIX}"
+
+        path = os.path.join(self.directory, entry_id)
+        temp_path = path + SPOOL_TEMP_SUFFIX
+        with open(temp_path, 'wb') as f:
+            f.write(json.dumps(header).encode('utf-8') + b"\n")
+            f.write(body)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+        self._fsync_directory()
+
+        with self.condition:
+            self._index(entry_id, header, os.path.getsize(path))
+            self.entries[entry_id]['in_flight'] = claim
+            self.metrics['spooled'] += 1
+            self._enforce_quota()
+            self.condition.notify_all()
+        return entry_id
+
+    def _enforce_quota(self):
+        """Evict the oldest payloads until the spool fits its quota (condition held)"""
+        while self.total_bytes > self.max_bytes:
+            candidates = [(entry['created'], entry_id) for entry_id, entry in self.entries.items()
+                          if not entry['in_flight']]
+            if not candidates:
+                break
+            _, entry_id = min(candidates)
+            # Payloads that depend on it (manifests of an object) would point at nothing
+            dependents = [dependent_id for dependent_id, entry in self.entries.items()
+                          if entry['after'] == entry_id and not entry['in_flight']]
+            for evicted_id in [entry_id] + dependents:
+                size = self.entries[evicted_id]['size']
+                self._delete(evicted_id)
+                self.metrics['evicted'] += 1
+                self.metrics['evicted_bytes'] += size
+                logger.warning("⚠️ Upload spool over quota, evicted %s (%d bytes)", evicted_id, size)
+
+    def _delete(self, entry_id):
+        """Forget a payload and remove its file (condition held)"""
+        entry = self.entries.pop(entry_id, None)
+        if entry is None:
+            return
+        self.total_bytes -= entry['size']
+        try:
+            os.remove(os.path.join(self.directory, entry_id))
+        except FileNotFoundError:
+            pass
+
+    def remove(self, entry_id):
+        """Drop a payload after it was uploaded"""
+        with self.condition:
+            self._delete(entry_id)
+            self.metrics['uploaded'] += 1
+
+    def mark_failed(self, entry_id, error=None):
+        """Hand a payload whose upload failed to the drainer, with backoff"""
+        with self.condition:
+            entry = self.entries.get(entry_id)
+            if entry is None:
+                return
+            entry['in_flight'] = False
+            entry['attempts'] += 1
+            delay = self._backoff(entry['attempts'])
+            entry['next_attempt'] = time.monotonic() + delay
+            self.metrics['failed_attempts'] += 1
+            self.metrics['last_error'] = str(error) if error else None
+            self.condition.notify_all()
+        logger.warning("📦 Upload failed, payload kept in spool, retry in %.0fs", delay)
+
+    def _backoff(self, attempts):
+        """Exponential backoff with jitter, so many clients don't retry in lockstep"""
+        delay = min(self.max_backoff, self.base_backoff * (2 ** (attempts - 1)))
+        return delay * random.uniform(0.8, 1.2)
+
+    def start(self):
+        """Start the background drainer"""
+        with self.condition:
+            if self.running:
+                return
+            self.running = True
+        self.drainer = threading.Thread(target=self._drain_loop, name="upload-spool-drainer", daemon=True)
+        self.drainer.start()
+        logger.info("📦 Upload spool drainer started (%s)", self.directory)
+
+    def stop(self):
+        """Stop the drainer, spooled payloads stay on disk for the next run"""
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        if self.drainer:
+            self.drainer.join(timeout=5)
+            self.drainer = None
+
+    def _next_ready(self):
+        """Pick the highest-priority, oldest payload that is due and not waiting for another (condition held)"""
+        now = time.monotonic()
+        ready = [
+            (entry['priority'], entry['created'], entry_id)
+            for entry_id, entry in self.entries.items()
+            if not entry['in_flight'] and entry['next_attempt'] <= now and entry['after'] not in self.entries
+        ]
+        return min(ready)[2] if ready else None
+
+    def _next_wait(self):
+        """Seconds until something could be due (condition held)"""
+        now = time.monotonic()
+        pending = [entry['next_attempt'] for entry in self.entries.values() if not entry['in_flight']]
+        wait = max(min(pending) - now, self.paused_until - now) if pending else None
+        return None if wait is None else max(0.1, wait)
+
+    def _drain_loop(self):
+        """Upload spooled payloads until stopped"""
+        while True:
+            with self.condition:
+                while self.running:
+                    entry_id = self._next_ready() if time.monotonic() >= self.paused_until else None
+                    if entry_id:
+                        break
+                    self.condition.wait(self._next_wait())
+                if not self.running:
+                    return
+                self.entries[entry_id]['in_flight'] = True
+                self.metrics['retried'] += 1
+
+            try:
+                self._upload(entry_id)
+                self.remove(entry_id)
+            except Exception as e:
+                self.mark_failed(entry_id, e)
+                # The network is probably down: hold off everything, not just this payload
+                with self.condition:
+                    entry = self.entries.get(entry_id)
+                    if entry:
+                        self.paused_until = entry['next_attempt']
+
+    def _upload(self, entry_id):
+        """Upload one spooled payload to S3"""
+        from .s3_uploader import get_s3_client, _timed_s3_call
+
+        with open(os.path.join(self.directory, entry_id), 'rb') as f:
+            header = json.loads(f.readline())
+            body = f.read()
+
+        s3 = get_s3_client(region=header.get('region'))
+        if s3 is None:
+            raise RuntimeError("S3 client unavailable")
+        _timed_s3_call(
+            header.get('operation', 'spool'),
+            s3.put_object,
+            Bucket=header['bucket'],
+            Key=header['key'],
+            Body=body,
+            ContentType=header['content_type'],
+            Metadata=header.get('metadata') or {}
+        )
+        logger.info("☁️ Spooled payload uploaded: %s", header['key'])
+
+    def get_status(self):
+        """Get spool size, age of the oldest payload and drain counters"""
+        with self.condition:
+            entries = list(self.entries.values())
+            total_bytes = self.total_bytes
+            metrics = dict(self.metrics)
+            paused_for = max(0.0, self.paused_until - time.monotonic())
+
+        now = time.time()
+        by_priority = {}
+        for entry in entries:
+            by_priority[entry['priority']] = by_priority.get(entry['priority'], 0) + 1
+        oldest = min((entry['created'] for entry in entries), default=None)
+        retrying = [entry for entry in entries if entry['attempts']]
+
+        return {
+            'directory': os.path.abspath(self.directory),
+            'running': self.running,
+            'entries': len(entries),
+            'bytes': total_bytes,
+            'max_bytes': self.max_bytes,
+            'usage_ratio': round(total_bytes / self.max_bytes, 3) if self.max_bytes else 0.0,
+            'oldest_age_seconds': round(now - oldest, 1) if oldest else 0.0,
+            'oldest_created_at': datetime.fromtimestamp(oldest).isoformat() if oldest else None,
+            'by_priority': by_priority,
+            'retrying': len(retrying),
+            'max_attempts': max((entry['attempts'] for entry in entries), default=0),
+            'paused_seconds': round(paused_for, 1),
+            **metrics
+        }
+
+
+# Global spool instance
+_spool_instance = None
+_spool_lock = threading.Lock()
+
+
+def get_upload_spool():
+    """Get global upload spool (drainer started on first use), None if disabled"""
+    global _spool_instance
+    with _spool_lock:
+        if _spool_instance is None:
+            spool_config = config_manager.get_upload_spool_config()
+            if not spool_config.get('enabled', True):
+                return None
+            try:
+                _spool_instance = UploadSpool(
+                    directory=spool_config.get('directory', 'data/upload_spool'),
+                    max_bytes=int(spool_config.get('max_megabytes', 500)) * 1024 * 1024,
+                    base_backoff=spool_config.get('base_backoff_seconds', 5),
+                    max_backoff=spool_config.get('max_backoff_seconds', 600)
+                )
+            except OSError as e:
+                logger.error("❌ Upload spool unavailable, uploading without it: %s", e)
+                return None
+            _spool_instance.start()
+    return _spool_instance
+
+
+def get_upload_spool_status():
+    """Get status of the global upload spool, or None if it is not running"""
+    if _spool_instance is None:
+        return None
+    return _spool_instance.get_status()
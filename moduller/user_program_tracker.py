@@ -3,20 +3,75 @@
 Per-User Program Tracker
 Tracks programs and time usage for each user, following the same pattern as users_screenshots
 Structure: logs/{date}/{email}/{task}/program_tracking_{timestamp}.json
+
+All sessions share one scheduler thread (see session_scheduler) that captures
+each session every CAPTURE_INTERVAL_SECONDS. Every capture is appended to the
+session's checkpoint log (see session_checkpoint), so sessions cut short by a
+crash are rebuilt and uploaded on the next start.
+
+During the session the programs that changed are uploaded as a rolling segment
+every segment_minutes; the end-of-session upload is a small manifest with the
+final totals and the list of segments. Segment uploads run on one worker thread
+so a slow upload never delays the captures on the scheduler thread; each
+session's lock keeps captures, segments and the end of the session apart.
 """
 
+import os
 import json
 import time
+import queue
 import threading
+from concurrent.futures import Future
 from datetime import datetime
 from collections import defaultdict
 from moduller.active_window_tracker import get_tracker as get_window_tracker
+from moduller.session_scheduler import SessionScheduler
+from moduller.session_checkpoint import (open_checkpoint, iter_checkpoint, list_checkpoints,
+                                         claim_checkpoint, release_checkpoint)
+from moduller.config_manager import config_manager
+
+# Capture program data every 10 seconds per session
+CAPTURE_INTERVAL_SECONDS = 10
+
+def _new_user_session(email, task_name, session_start):
+    """Empty in-memory tracking session"""
+    return {
+        'email': email,
+        'task_name': task_name,
+        'session_start': session_start,
+        'last_capture': time.time(),
+        'program_data': defaultdict(lambda: {
+            'total_time': 0,
+            'last_time': 0,
+            'sessions': [],
+            'browser_domains': [],
+            'window_titles': []
+        }),
+        'tracking_active': True,
+        # Last checkpointed state per program, captures only log what changed
+        'checkpointed': {},
+        'checkpoint': None,
+        # Rolling segments: uploaded segment index and per-program totals at the last segment
+        'segments': [],
+        'segment_totals': {},
+        'segment_start': session_start,
+        'next_segment': 1,
+        # Segment upload handed to the worker and not finished yet
+        'segment_task': None,
+        # Held while captures, segments and stop touch the session data
+        'lock': threading.Lock()
+    }
 
 class UserProgramTracker:
     def __init__(self):
         # Per-user tracking sessions
         self.user_sessions = {}
-        self.tracking_threads = {}
+        # One thread captures every session when it is due
+        self.scheduler = SessionScheduler(name="user-program-tracker")
+        # Segment uploads run on their own thread, off the scheduler
+        self.segment_queue = queue.Queue()
+        self.segment_thread = None
+        self.segment_thread_lock = threading.Lock()
         
     def start_user_tracking(self, email, task_name="general"):
         """Start tracking programs for a specific user"""
@@ -32,29 +87,20 @@ class UserProgramTracker:
             return
         
         # Initialize user session
-        self.user_sessions[user_key] = {
+        session = _new_user_session(email, task_name, datetime.now().isoformat())
+        session['checkpoint'] = open_checkpoint('program', user_key, {
             'email': email,
             'task_name': task_name,
-            'session_start': datetime.now().isoformat(),
-            'last_capture': time.time(),
-            'program_data': defaultdict(lambda: {
-                'total_time': 0,
-                'last_time': 0,
-                'sessions': [],
-                'browser_domains': set(),
-                'window_titles': set()
-            }),
-            'tracking_active': True
-        }
+            'session_start': session['session_start']
+        })
+        self.user_sessions[user_key] = session
         
-        # Start tracking thread for this user
-        thread = threading.Thread(
-            target=self._user_tracking_loop, 
-            args=(user_key,), 
-            daemon=True
-        )
-        self.tracking_threads[user_key] = thread
-        thread.start()
+        # Schedule captures and rolling segment uploads for this user
+        self.scheduler.add(user_key, CAPTURE_INTERVAL_SECONDS, self._scheduled_capture)
+        segment_seconds = config_manager.get_program_tracking_config().get('segment_minutes', 15) * 60
+        if segment_seconds > 0:
+            self.scheduler.add(f"{user_key}#segment", segment_seconds,
+                               lambda key: self._scheduled_segment(user_key))
         
         print(f"🔍 Started program tracking for {email} - {task_name}")
     
@@ -71,19 +117,37 @@ class UserProgramTracker:
             return None
         
         # Stop tracking
-        self.user_sessions[user_key]['tracking_active'] = False
-        self.user_sessions[user_key]['session_end'] = datetime.now().isoformat()
+        session = self.user_sessions[user_key]
+        self.scheduler.remove(user_key)
+        self.scheduler.remove(f"{user_key}#segment")
+        with session['lock']:
+            session['tracking_active'] = False
+            session['session_end'] = datetime.now().isoformat()
+            pending = session['segment_task']
+        
+        # A segment still uploading on the worker comes before the last one
+        if pending:
+            try:
+                pending.result()
+            except Exception as e:
+                print(f"❌ Error uploading program segment for {user_key}: {e}")
+        
+        # Last segment: whatever changed since the previous one
+        self._upload_segment(user_key)
         
         # Generate final report
         final_report = self._generate_user_report(user_key)
         
-        # Upload final report to S3 (only once per session)
-        print(f"📤 Uploading final session data to S3...")
-        self._upload_program_data_to_s3(user_key)
+        # Upload final manifest to S3 (only once per session)
+        print(f"📤 Uploading final session manifest to S3...")
+        uploaded = self._upload_program_data_to_s3(user_key)
+        
+        # Checkpoint no longer needed once uploaded or spooled; otherwise it is retried on next start
+        checkpoint = self.user_sessions[user_key].get('checkpoint')
+        if checkpoint:
+            checkpoint.close(discard=bool(uploaded))
         
         # Cleanup
-        if user_key in self.tracking_threads:
-            del self.tracking_threads[user_key]
         del self.user_sessions[user_key]
         
         print(f"⏹️ Stopped program tracking for {email} - {task_name}")
@@ -104,31 +168,62 @@ class UserProgramTracker:
         
         print("✅ All tracking sessions stopped")
     
-    def _user_tracking_loop(self, user_key):
-        """Main tracking loop for a specific user"""
-        capture_interval = 10  # Capture program data every 10 seconds (faster for testing)
+    def _scheduled_capture(self, user_key):
+        """Scheduler callback: capture one session if it is still active"""
+        session = self.user_sessions.get(user_key)
+        if not session or not session.get('tracking_active', False):
+            return
         
-        session = self.user_sessions[user_key]
+        print(f"⏰ Time to capture data for {user_key}")
+        self._capture_user_program_data(user_key)
+        session['last_capture'] = time.time()
+    
+    def _scheduled_segment(self, user_key):
+        """Scheduler callback: hand the session's next segment to the upload worker"""
+        session = self.user_sessions.get(user_key)
+        if not session:
+            return
         
-        print(f"🔄 Starting tracking loop for {user_key}")
+        with session['lock']:
+            if not session.get('tracking_active', False):
+                return
+            pending = session['segment_task']
+            if pending and not pending.done():
+                # Still uploading the previous one: the next segment carries these changes
+                return
+            session['segment_task'] = self._submit_segment(user_key)
+    
+    def _submit_segment(self, user_key):
+        """
+        Queue a segment upload on the worker thread
         
-        while session.get('tracking_active', False):
+        Returns:
+            Future: resolves to the segment URL (None if there was nothing to upload)
+        """
+        task = Future()
+        self.segment_queue.put((task, user_key))
+        with self.segment_thread_lock:
+            if self.segment_thread is None or not self.segment_thread.is_alive():
+                self.segment_thread = threading.Thread(target=self._segment_worker,
+                                                       name="program-segments", daemon=True)
+                self.segment_thread.start()
+        return task
+    
+    def _segment_worker(self):
+        """Upload queued segments one at a time"""
+        while True:
+            task, user_key = self.segment_queue.get()
+            if not task.set_running_or_notify_cancel():
+                continue
             try:
-                current_time = time.time()
-                
-                # Check if it's time to capture (every 10 seconds for testing)
-                if current_time - session['last_capture'] >= capture_interval:
-                    print(f"⏰ Time to capture data for {user_key}")
-                    self._capture_user_program_data(user_key)
-                    session['last_capture'] = current_time
-                
-                time.sleep(1)  # Check every second
-                
+                task.set_result(self._upload_segment(user_key))
             except Exception as e:
-                print(f"❌ Error in user tracking loop for {user_key}: {e}")
-                import traceback
-                traceback.print_exc()
-                time.sleep(5)
+                print(f"❌ Error uploading program segment for {user_key}: {e}")
+                task.set_exception(e)
+    
+    def get_scheduler_stats(self):
+        """Get per-session capture counts and lateness of the shared scheduler"""
+        return self.scheduler.get_stats()
     
     def _capture_user_program_data(self, user_key):
         """Capture current program data for user (like taking a screenshot)"""
@@ -156,24 +251,25 @@ class UserProgramTracker:
                 return
             
             # Update session data with aggregated program information
-            for program in program_summary['programs']:
-                process_name = program['program']
-                
-                # Store the current total time (this comes from the aggregator)
-                session['program_data'][process_name]['total_time'] = program['total_time_seconds']
-                session['program_data'][process_name]['last_time'] = program['total_time_seconds']
-                
-                # Store recent window titles (limited to avoid bloat)
-                if program.get('window_titles'):
-                    for title in program['window_titles']:
-                        session['program_data'][process_name]['window_titles'].add(title)
-                
-                # Store browser domains if available
-                if program.get('browser_domains'):
-                    for domain in program['browser_domains']:
-                        session['program_data'][process_name]['browser_domains'].add(domain)
+            with session['lock']:
+                for program in program_summary['programs']:
+                    process_name = program['program']
+                    
+                    # Store the current total time (this comes from the aggregator)
+                    session['program_data'][process_name]['total_time'] = program['total_time_seconds']
+                    session['program_data'][process_name]['last_time'] = program['total_time_seconds']
+                    
+                    # Store the top window titles / domains by focus time (bounded, session-wide ranking)
+                    if program.get('window_titles'):
+                        session['program_data'][process_name]['window_titles'] = list(program['window_titles'])
+                    
+                    # Store browser domains if available
+                    if program.get('browser_domains'):
+                        session['program_data'][process_name]['browser_domains'] = list(program['browser_domains'])
+                    
+                    print(f"📊 {process_name}: {program['time_formatted']}")
                 
-                print(f"📊 {process_name}: {program['time_formatted']}")
+                self._checkpoint_capture(session)
             
             # DON'T upload during session - only upload when session ends
             print(f"📝 Data updated for {user_key} (will upload when session ends)")
@@ -183,8 +279,92 @@ class UserProgramTracker:
             import traceback
             traceback.print_exc()
     
+    def _checkpoint_capture(self, session):
+        """Append the programs that changed since the last capture to the session's checkpoint log"""
+        checkpoint = session.get('checkpoint')
+        if not checkpoint:
+            return
+        
+        changed = {}
+        for process_name, data in session['program_data'].items():
+            state = {
+                'total_time': data['total_time'],
+                'window_titles': list(data['window_titles']),
+                'browser_domains': list(data['browser_domains'])
+            }
+            if session['checkpointed'].get(process_name) != state:
+                session['checkpointed'][process_name] = state
+                changed[process_name] = state
+        
+        try:
+            checkpoint.append({'type': 'capture', 't': time.time(), 'programs': changed})
+        except OSError as e:
+            print(f"❌ Error writing program checkpoint: {e}")
+    
+    def _upload_segment(self, user_key):
+        """Upload the programs whose time changed since the previous segment"""
+        session = self.user_sessions.get(user_key)
+        if not session:
+            return None
+        
+        # Build the segment and reserve its sequence number under the session lock
+        with session['lock']:
+            segment_end = session.get('session_end') or datetime.now().isoformat()
+            programs = []
+            for process_name, data in list(session['program_data'].items()):
+                previous = session['segment_totals'].get(process_name, 0)
+                if data['total_time'] != previous:
+                    programs.append({
+                        'process_name': process_name,
+                        'total_time_seconds': round(data['total_time'], 2),
+                        'delta_seconds': round(data['total_time'] - previous, 2),
+                        'window_titles': list(data['window_titles']),
+                        'browser_domains': list(data['browser_domains']) or None
+                    })
+            if not programs:
+                return None
+            
+            sequence = session['next_segment']
+            session['next_segment'] += 1
+            segment_start = session['segment_start']
+            segment = {
+                'user_email': session['email'],
+                'task_name': session['task_name'],
+                'session_start': session['session_start'],
+                'sequence': sequence,
+                'segment_start': segment_start,
+                'segment_end': segment_end,
+                'programs': programs
+            }
+        
+        # Upload outside the lock, captures keep running meanwhile
+        from moduller.s3_uploader import upload_program_tracking_segment
+        url, key = upload_program_tracking_segment(session['email'], segment, session['task_name'], sequence)
+        if not url:
+            # Not even spooled, this sequence stays unused: the next segment carries these changes too
+            return None
+        
+        with session['lock']:
+            for program in programs:
+                session['segment_totals'][program['process_name']] = program['total_time_seconds']
+            entry = {'sequence': sequence, 'key': key, 'segment_start': segment_start,
+                     'segment_end': segment_end, 'programs': len(programs)}
+            session['segments'].append(entry)
+            session['segment_start'] = segment_end
+            if session.get('checkpoint'):
+                try:
+                    session['checkpoint'].append(dict(entry, type='segment'))
+                except OSError as e:
+                    print(f"❌ Error writing program checkpoint: {e}")
+        return url
+    
     def _upload_program_data_to_s3(self, user_key):
-        """Upload current program tracking data to S3 (following screenshot pattern)"""
+        """
+        Upload current program tracking data to S3 (following screenshot pattern)
+        
+        Returns:
+            str: S3 URL if successful, None if failed
+        """
         session = self.user_sessions[user_key]
         
         try:
@@ -206,11 +386,13 @@ class UserProgramTracker:
                 print(f"📊 Program tracking data uploaded: {result_url}")
             else:
                 print(f"❌ Failed to upload program tracking data")
+            return result_url
                 
         except Exception as e:
             print(f"❌ Error uploading program data to S3: {e}")
             import traceback
             traceback.print_exc()
+            return None
     
     def _generate_user_report(self, user_key):
         """Generate program tracking report for user"""
@@ -218,7 +400,7 @@ class UserProgramTracker:
         
         # Calculate session duration
         start_time = datetime.fromisoformat(session['session_start'])
-        end_time = datetime.now()
+        end_time = datetime.fromisoformat(session['session_end']) if session.get('session_end') else datetime.now()
         session_duration = (end_time - start_time).total_seconds()
         
         # Format program data
@@ -236,7 +418,7 @@ class UserProgramTracker:
         # Sort by time spent (descending)
         programs.sort(key=lambda x: x['total_time_seconds'], reverse=True)
         
-        return {
+        report = {
             'user_email': session['email'],
             'task_name': session['task_name'],
             'date': datetime.now().strftime("%Y-%m-%d"),
@@ -248,6 +430,13 @@ class UserProgramTracker:
             'programs': programs,
             'capture_timestamp': datetime.now().isoformat()
         }
+        if session.get('segments'):
+            # Rolling segments uploaded during the session, in order
+            report['segments'] = list(session['segments'])
+        if session.get('recovered'):
+            # Rebuilt from a checkpoint after the app stopped without ending the session
+            report['recovered_from_checkpoint'] = True
+        return report
     
     def _format_duration(self, seconds):
         """Format duration in human readable format"""
@@ -307,6 +496,80 @@ def stop_all_user_tracking():
     tracker = get_user_program_tracker()
     tracker.stop_all_tracking()
 
+def rebuild_program_session(path):
+    """
+    Replay a program checkpoint log into a session (as built by start_user_tracking)
+    
+    Returns:
+        dict: the session, ended at its last capture, or None if the log has no start record
+    """
+    session = None
+    for record in iter_checkpoint(path):
+        if record.get('type') == 'start':
+            session = _new_user_session(record['email'], record['task_name'], record['session_start'])
+            session['session_end'] = record['session_start']
+        elif session and record.get('type') == 'capture':
+            for process_name, data in record['programs'].items():
+                session['program_data'][process_name].update(data)
+                session['program_data'][process_name]['last_time'] = data['total_time']
+            session['session_end'] = datetime.fromtimestamp(record['t']).isoformat()
+        elif session and record.get('type') == 'segment':
+            session['segments'].append({k: v for k, v in record.items() if k != 'type'})
+            session['segment_start'] = record['segment_end']
+            session['next_segment'] = max(session['next_segment'], record['sequence'] + 1)
+    
+    if session:
+        session['tracking_active'] = False
+        session['recovered'] = True
+    return session
+
+def recover_program_checkpoints():
+    """
+    Upload sessions left in checkpoint logs by a previous run
+    
+    Returns:
+        int: number of sessions recovered and uploaded
+    """
+    tracker = get_user_program_tracker()
+    active = {
+        os.path.abspath(session['checkpoint'].path)
+        for session in list(tracker.user_sessions.values()) if session.get('checkpoint')
+    }
+    
+    recovered = 0
+    for path in list_checkpoints('program', exclude=active):
+        # Locked: a running session (possibly in another process) still writes it
+        fd = claim_checkpoint(path)
+        if fd is None:
+            continue
+        uploaded = False
+        try:
+            session = rebuild_program_session(path)
+            if session is None:
+                # Nothing but a torn header, nothing to upload
+                uploaded = True
+                continue
+            
+            print(f"♻️ Recovering program tracking session {session['email']} - {session['task_name']}")
+            user_key = f"recovered|{os.path.basename(path)}"
+            tracker.user_sessions[user_key] = session
+            try:
+                uploaded = bool(tracker._upload_program_data_to_s3(user_key))
+            finally:
+                del tracker.user_sessions[user_key]
+            if uploaded:
+                recovered += 1
+        except Exception as e:
+            print(f"❌ Could not recover program checkpoint {path}: {e}")
+        finally:
+            release_checkpoint(path, fd, remove=uploaded)
+    return recovered
+
+def get_user_tracking_scheduler_stats():
+    """Get capture lateness per session of the shared scheduler"""
+    tracker = get_user_program_tracker()
+    return tracker.get_scheduler_stats()
+
 if __name__ == "__main__":
     # Test the user program tracker
     print("🧪 Testing User Program Tracker")
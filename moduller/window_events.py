@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+Window Event Sources
+Pluggable sources of foreground-window changes for ActiveWindowTracker:
+
+- PollingWindowSource: probes the foreground window adaptively, fast right
+  after a switch and backing off during long stable focus
+- WinEventHookSource: push notifications from SetWinEventHook (Windows), for
+  foreground switches and title changes of the foreground window
+- TraceReplaySource: replays a recorded JSON Lines trace, optionally faster
+  than real time, with the trace's own clock
+
+Every source calls emit(event) with a dict {timestamp, window_title,
+process_name, process_id} and exposes now(), the clock the tracker measures
+durations with. RecordingSource wraps any source and writes its events to a
+trace file. Sources count their wakeups and the CPU time of their thread.
+
+Replay a recorded (or synthetic) day at 1000x:
+    python -m moduller.window_events --synthesize day.jsonl --hours 8
+    python -m moduller.window_events --replay day.jsonl --speed 1000
+"""
+
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Trace record marking where recording stopped (closes the last window on replay)
+TRACE_STOP_EVENT = "stop"
+
+
+def window_event(window_title, process_name, process_id=None, timestamp=None):
+    """Build a window event dict"""
+    return {
+        'timestamp': time.time() if timestamp is None else timestamp,
+        'window_title': window_title,
+        'process_name': process_name,
+        'process_id': process_id
+    }
+
+
+class WindowEventSource:
+    """Base class: run() blocks in the tracker thread and calls emit() per window change"""
+
+    name = "base"
+
+    def __init__(self):
+        self.stop_event = threading.Event()
+        self.stats = {
+            'wakeups': 0,
+            'events': 0,
+            'cpu_seconds': 0.0,
+            'started': None
+        }
+        self._cpu_started = None
+
+    def now(self):
+        """Current time on this source's clock (epoch seconds)"""
+        return time.time()
+
+    def run(self, emit):
+        raise NotImplementedError
+
+    def stop(self):
+        self.stop_event.set()
+
+    def _begin(self):
+        """Start wakeup/CPU accounting (call from the thread that runs the source)"""
+        self.stats['started'] = time.monotonic()
+        self._cpu_started = time.thread_time()
+
+    def _wakeup(self):
+        """Count one wakeup of the source thread and refresh its CPU time"""
+        self.stats['wakeups'] += 1
+        if self._cpu_started is not None:
+            self.stats['cpu_seconds'] = time.thread_time() - self._cpu_started
+
+    def get_stats(self):
+        """Get wakeups, events and thread CPU time, absolute and per hour of running"""
+        stats = dict(self.stats)
+        hours = (time.monotonic() - stats['started']) / 3600 if stats['started'] else 0
+        return {
+            'source': self.name,
+            'wakeups': stats['wakeups'],
+            'events': stats['events'],
+            'cpu_seconds': round(stats['cpu_seconds'], 3),
+            'running_seconds': round(hours * 3600, 1),
+            'wakeups_per_hour': round(stats['wakeups'] / hours, 1) if hours else 0.0,
+            'cpu_seconds_per_hour': round(stats['cpu_seconds'] / hours, 3) if hours else 0.0
+        }
+
+
+class PollingWindowSource(WindowEventSource):
+    name = "polling"
+
+    def __init__(self, probe, interval=1, max_interval=None, backoff=1.5):
+        """
+        Args:
+            probe: Callable returning (window_title, process_name, process_id) of the foreground window
+            interval: Seconds between probes right after a window switch
+            max_interval: Accuracy bound, the longest a switch can go unnoticed (default: interval, no backoff)
+            backoff: Factor the interval grows by per probe that saw the same window
+        """
+        super().__init__()
+        self.probe = probe
+        self.interval = interval
+        self.max_interval = max(interval, max_interval or interval)
+        self.backoff = max(1.0, backoff)
+        self.current_interval = interval
+
+    def run(self, emit):
+        self._begin()
+        last = None
+        while not self.stop_event.is_set():
+            self._wakeup()
+            try:
+                window_title, process_name, process_id = self.probe()
+                if window_title and process_name and (process_name, window_title) != last:
+                    last = (process_name, window_title)
+                    self.stats['events'] += 1
+                    emit(window_event(window_title, process_name, process_id))
+                    # Switches come in bursts: look again soon
+                    self.current_interval = self.interval
+                else:
+                    self.current_interval = min(self.max_interval, self.current_interval * self.backoff)
+            except Exception as e:
+                logger.error("❌ Error polling foreground window: %s", e)
+            self.stop_event.wait(self.current_interval)
+
+    def get_stats(self):
+        stats = super().get_stats()
+        stats['current_interval_seconds'] = round(self.current_interval, 2)
+        stats['max_interval_seconds'] = self.max_interval
+        return stats
+
+
+class WinEventHookSource(WindowEventSource):
+    name = "hook"
+
+    EVENT_SYSTEM_FOREGROUND = 0x0003
+    EVENT_OBJECT_NAMECHANGE = 0x800C
+    WINEVENT_OUTOFCONTEXT = 0x0000
+    WINEVENT_SKIPOWNPROCESS = 0x0002
+    OBJID_WINDOW = 0
+    WM_QUIT = 0x0012
+
+    def __init__(self, probe):
+        """
+        Args:
+            probe: Callable returning (window_title, process_name, process_id) of the foreground window
+        """
+        super().__init__()
+        self.probe = probe
+        self.thread_id = None
+
+    @staticmethod
+    def available():
+        """True on Windows, where user32 event hooks exist"""
+        if sys.platform != "win32":
+            return False
+        try:
+            import ctypes
+            return hasattr(ctypes, "windll")
+        except ImportError:
+            return False
+
+    def run(self, emit):
+        import ctypes
+        from ctypes import wintypes
+
+        user32 = ctypes.windll.user32
+        kernel32 = ctypes.windll.kernel32
+        self.thread_id = kernel32.GetCurrentThreadId()
+        self._begin()
+        last = [None]
+
+        WinEventProc = ctypes.WINFUNCTYPE(
+            None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+            wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD
+        )
+
+        def callback(hook, event, hwnd, id_object, id_child, thread, event_time):
+            self._wakeup()
+            # Title changes only matter for the foreground window itself (e.g. tab switches)
+            if event == self.EVENT_OBJECT_NAMECHANGE and (
+                    id_object != self.OBJID_WINDOW or hwnd != user32.GetForegroundWindow()):
+                return
+            try:
+                window_title, process_name, process_id = self.probe()
+                if window_title and process_name and (process_name, window_title) != last[0]:
+                    last[0] = (process_name, window_title)
+                    self.stats['events'] += 1
+                    emit(window_event(window_title, process_name, process_id))
+            except Exception as e:
+                logger.error("❌ Error handling window event: %s", e)
+
+        # Keep a reference, the hook calls into it until unhooked
+        self._callback = WinEventProc(callback)
+        flags = self.WINEVENT_OUTOFCONTEXT | self.WINEVENT_SKIPOWNPROCESS
+        hooks = [
+            user32.SetWinEventHook(event, event, 0, self._callback, 0, 0, flags)
+            for event in (self.EVENT_SYSTEM_FOREGROUND, self.EVENT_OBJECT_NAMECHANGE)
+        ]
+        if not all(hooks):
+            for hook in hooks:
+                if hook:
+                    user32.UnhookWinEvent(hook)
+            raise RuntimeError("SetWinEventHook failed")
+
+        # Report the window that already has focus
+        callback(None, self.EVENT_SYSTEM_FOREGROUND, None, 0, 0, 0, 0)
+
+        msg = wintypes.MSG()
+        try:
+            while not self.stop_event.is_set() and user32.GetMessageW(ctypes.byref(msg), 0, 0, 0) > 0:
+                user32.TranslateMessage(ctypes.byref(msg))
+                user32.DispatchMessageW(ctypes.byref(msg))
+        finally:
+            for hook in hooks:
+                user32.UnhookWinEvent(hook)
+
+    def stop(self):
+        super().stop()
+        if self.thread_id:
+            import ctypes
+            ctypes.windll.user32.PostThreadMessageW(self.thread_id, self.WM_QUIT, 0, 0)
+
+
+class TraceReplaySource(WindowEventSource):
+    name = "replay"
+
+    def __init__(self, path, speed=1000.0):
+        """
+        Args:
+            path: JSON Lines trace written by RecordingSource
+            speed: Replay speed factor, 0 replays without sleeping
+        """
+        super().__init__()
+        self.path = path
+        self.speed = speed
+        self.clock = None
+        self.events_replayed = 0
+
+    def now(self):
+        # Trace time, so durations are those of the recording
+        return self.clock if self.clock is not None else time.time()
+
+    def run(self, emit):
+        self._begin()
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if self.stop_event.is_set():
+                    return
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                if self.clock is not None and self.speed:
+                    self.stop_event.wait(max(0.0, record['timestamp'] - self.clock) / self.speed)
+                self._wakeup()
+                self.clock = record['timestamp']
+                if record.get('event') == TRACE_STOP_EVENT:
+                    return
+                emit(record)
+                self.events_replayed += 1
+                self.stats['events'] += 1
+
+
+class RecordingSource(WindowEventSource):
+    """Pass events of another source through and append them to a trace file"""
+
+    def __init__(self, source, path):
+        super().__init__()
+        self.source = source
+        self.path = path
+        self.name = f"{source.name}+record"
+
+    def now(self):
+        return self.source.now()
+
+    def run(self, emit):
+        with open(self.path, 'a', encoding='utf-8') as trace:
+            def record(event):
+                trace.write(json.dumps(event) + "\n")
+                trace.flush()
+                emit(event)
+
+            try:
+                self.source.run(record)
+            finally:
+                trace.write(json.dumps({'timestamp': self.source.now(), 'event': TRACE_STOP_EVENT}) + "\n")
+
+    def stop(self):
+        self.source.stop()
+
+    def get_stats(self):
+        return self.source.get_stats()
+
+
+def create_window_event_source(probe, has_win32=True):
+    """
+    Build the configured window event source
+
+    Args:
+        probe: Foreground-window probe of the tracker (title, process name, pid)
+        has_win32: Whether pywin32 is importable (the probe needs it)
+
+    Returns:
+        WindowEventSource, or None if this platform can't observe windows
+    """
+    from .config_manager import config_manager
+
+    window_config = config_manager.get_window_tracking_config()
+    kind = window_config.get('event_source', 'auto')
+
+    if kind == 'replay':
+        source = TraceReplaySource(window_config['replay_trace'], window_config.get('replay_speed', 1000))
+    elif not has_win32:
+        logger.warning("⚠️ No foreground-window API on %s, active window tracking records nothing "
+                       "(set WINDOW_EVENT_SOURCE=replay to replay a trace)", sys.platform)
+        return None
+    elif kind in ('auto', 'hook') and WinEventHookSource.available():
+        source = WinEventHookSource(probe)
+    else:
+        source = PollingWindowSource(
+            probe,
+            interval=window_config.get('poll_interval_seconds', 1),
+            max_interval=window_config.get('max_poll_interval_seconds', 5),
+            backoff=window_config.get('poll_backoff', 1.5)
+        )
+
+    if window_config.get('record_trace'):
+        source = RecordingSource(source, window_config['record_trace'])
+    logger.info("🪟 Window event source: %s", source.name)
+    return source
+
+
+def generate_synthetic_trace(path, hours=8, seed=11):
+    """
+    Write a synthetic work day as a trace: bursts of tab switching between
+    long stretches in the editor
+
+    Returns:
+        int: number of window events written
+    """
+    rng = random.Random(seed)
+    windows = (
+        [("chrome.exe", f"Ticket {i} - Jira") for i in range(40)]
+        + [("chrome.exe", f"Inbox ({i}) - Gmail") for i in range(5)]
+        + [("code.exe", f"module_{i}.py - project - Visual Studio Code") for i in range(30)]
+        + [("slack.exe", f"#channel-{i} | Slack") for i in range(10)]
+        + [("explorer.exe", "File Explorer")]
+    )
+    pids = {process_name: 1000 + i for i, process_name in enumerate(sorted({w[0] for w in windows}))}
+    clock = time.time() - hours * 3600
+    end = clock + hours * 3600
+    events = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        while clock < end:
+            process_name, window_title = rng.choice(windows)
+            f.write(json.dumps(window_event(window_title, process_name, pids[process_name], clock)) + "\n")
+            events += 1
+            clock += rng.expovariate(1 / 4) if rng.random() < 0.8 else rng.expovariate(1 / 300)
+        f.write(json.dumps({'timestamp': end, 'event': TRACE_STOP_EVENT}) + "\n")
+    return events
+
+
+def replay_trace(path, speed=1000.0):
+    """
+    Run an ActiveWindowTracker against a trace and report wall time and totals
+
+    Returns:
+        dict: events replayed, trace and wall duration, tracked time, summary
+    """
+    from .active_window_tracker import ActiveWindowTracker
+
+    source = TraceReplaySource(path, speed)
+    tracker = ActiveWindowTracker(event_source=source, verbose=False)
+    started = time.perf_counter()
+    tracker.run_event_source()
+    wall_seconds = time.perf_counter() - started
+
+    summary = tracker.get_session_summary()
+    return {
+        'events': source.events_replayed,
+        'intervals': len(tracker.intervals),
+        'speed': speed,
+        'wall_seconds': round(wall_seconds, 2),
+        'tracked_seconds': summary['total_session_time'],
+        'applications': [(app['process_name'], app['total_time_formatted']) for app in summary['applications']]
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Synthesize and replay foreground-window traces")
+    parser.add_argument("--synthesize", help="Write a synthetic day trace to this path")
+    parser.add_argument("--hours", type=float, default=8, help="Length of the synthetic day")
+    parser.add_argument("--replay", help="Replay this trace through ActiveWindowTracker")
+    parser.add_argument("--speed", type=float, default=1000, help="Replay speed factor (0 = no sleeping)")
+    args = parser.parse_args()
+
+    if not args.synthesize and not args.replay:
+        parser.error("--synthesize and/or --replay is required")
+    if args.synthesize:
+        count = generate_synthetic_trace(args.synthesize, args.hours)
+        print(f"✅ Synthetic trace written: {args.synthesize} ({count} events)")
+    if args.replay:
+        print(f"🧪 Replaying {args.replay} at {args.speed:g}x")
+        print(json.dumps(replay_trace(args.replay, args.speed), indent=2))
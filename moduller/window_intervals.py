@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Window Interval Store
+Run-length store for active-window focus time. Every window ("process|title")
+is interned once with its metadata; each focus interval is then three entries
+in array-backed columns (key id, start epoch, end epoch) instead of a dict of
+ISO strings. Appends are O(1), per-window totals and per-program running
+aggregates (time, first titles seen, browser info, interval count) are kept as
+intervals arrive. Each program also keeps bounded Space-Saving top-K counters of
+its titles and domains, weighted by focus seconds. Every per-program part is
+bounded, so a program summary costs O(number of programs).
+
+Memory and summary cost against the old list-of-dicts layout:
+    python -m benchmarks.window_intervals
+"""
+
+from array import array
+from datetime import datetime
+
+from .heavy_hitters import SpaceSaving
+
+# Titles / domains tracked per program by the Space-Saving counters
+TOP_ITEMS_PER_PROGRAM = 10
+# Distinct titles listed per program (first seen), keeps summaries O(programs)
+WINDOW_TITLES_PER_PROGRAM = 50
+
+
+class WindowIntervalStore:
+    __slots__ = ("key_ids", "windows", "totals", "counts", "programs", "interval_keys", "starts", "ends")
+
+    def __init__(self):
+        # "process|title" -> key id, and per key id its metadata, total focus seconds and interval count
+        self.key_ids = {}
+        self.windows = []
+        self.totals = array('d')
+        self.counts = array('I')
+
+        # process name -> running aggregate, see program_aggregate()
+        self.programs = {}
+
+        # One entry per focus interval
+        self.interval_keys = array('I')
+        self.starts = array('d')
+        self.ends = array('d')
+
+    def intern(self, window_key, process_name, window_title, process_id=None, browser_info=None):
+        """
+        Get the key id of a window, registering it on first sight
+
+        Metadata (pid, browser info) is refreshed on every call, like the old
+        session_data.update() did when a window regained focus.
+
+        Returns:
+            int: key id
+        """
+        key_id = self.key_ids.get(window_key)
+        if key_id is None:
+            key_id = len(self.windows)
+            self.key_ids[window_key] = key_id
+            self.windows.append({
+                'window_key': window_key,
+                'process_name': process_name,
+                'window_title': window_title
+            })
+            self.totals.append(0.0)
+            self.counts.append(0)
+        window = self.windows[key_id]
+        window['process_id'] = process_id
+        window['browser_info'] = browser_info or {}
+        return key_id
+
+    def append(self, key_id, start, end):
+        """Record one focus interval (epoch seconds)"""
+        self.interval_keys.append(key_id)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.totals[key_id] += end - start
+        self.counts[key_id] += 1
+
+        window = self.windows[key_id]
+        program = self.programs.get(window['process_name'])
+        if program is None:
+            program = self.programs[window['process_name']] = self.program_aggregate()
+        program['total_time'] += end - start
+        program['session_count'] += 1
+        if end > start:
+            if len(program['window_titles']) < WINDOW_TITLES_PER_PROGRAM:
+                program['window_titles'][window['window_title']] = None
+            program['top_titles'].offer(window['window_title'], end - start)
+            if window['browser_info'].get('is_browser'):
+                program['browser_info'] = window['browser_info']
+            if window['browser_info'].get('domain'):
+                program['top_domains'].offer(window['browser_info']['domain'], end - start)
+
+    @staticmethod
+    def program_aggregate():
+        """
+        Empty running aggregate of one program (window_titles is an insertion-ordered
+        set of the first WINDOW_TITLES_PER_PROGRAM titles, top_titles / top_domains are
+        focus-second weighted top-K counters)
+        """
+        return {
+            'total_time': 0.0,
+            'window_titles': {},
+            'browser_info': {},
+            'session_count': 0,
+            'top_titles': SpaceSaving(TOP_ITEMS_PER_PROGRAM),
+            'top_domains': SpaceSaving(TOP_ITEMS_PER_PROGRAM)
+        }
+
+    def __len__(self):
+        return len(self.interval_keys)
+
+    def clear(self):
+        self.key_ids.clear()
+        self.windows.clear()
+        self.programs.clear()
+        del self.totals[:], self.counts[:], self.interval_keys[:], self.starts[:], self.ends[:]
+
+    def focused_windows(self):
+        """Yield (key_id, window, total_seconds) of windows that had focus time, in first-seen order"""
+        for key_id, window in enumerate(self.windows):
+            if self.totals[key_id] > 0:
+                yield key_id, window, self.totals[key_id]
+
+    def intervals_by_key(self):
+        """
+        Group interval positions by window in one pass
+
+        Returns:
+            list: per key id, the interval positions in chronological order
+        """
+        grouped = [[] for _ in self.windows]
+        for position, key_id in enumerate(self.interval_keys):
+            grouped[key_id].append(position)
+        return grouped
+
+    def session(self, position):
+        """One interval in the legacy session format (ISO start/end, duration)"""
+        start, end = self.starts[position], self.ends[position]
+        return {
+            'start_time': datetime.fromtimestamp(start).isoformat(),
+            'end_time': datetime.fromtimestamp(end).isoformat(),
+            'duration': end - start
+        }
+
+    def totals_by_process(self):
+        """Total focus seconds per process name"""
+        return {name: program['total_time'] for name, program in self.programs.items() if program['total_time'] > 0}
+
+    def totals_by_domain(self):
+        """Total focus seconds per browser domain"""
+        totals = {}
+        for _, window, seconds in self.focused_windows():
+            domain = window['browser_info'].get('domain')
+            if domain:
+                totals[domain] = totals.get(domain, 0.0) + seconds
+        return totals
+
+    def memory_bytes(self):
+        """Approximate memory of the interval columns"""
+        return sum(column.itemsize * len(column) for column in (self.interval_keys, self.starts, self.ends))
@@ -0,0 +1,62 @@
+import random
+
+import pytest
+
+from moduller.heavy_hitters import SpaceSaving
+
+
+def _skewed_stream(count=100000, seed=5):
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield f"Title {int(rng.paretovariate(1.2))}", rng.expovariate(1 / 20)
+
+
+def test_exact_while_items_fit():
+    sketch = SpaceSaving(3)
+    for item, weight in [("a", 5), ("b", 2), ("a", 1), ("c", 4)]:
+        sketch.offer(item, weight)
+    assert sketch.top() == [("a", 6, 0.0), ("c", 4, 0.0), ("b", 2, 0.0)]
+    assert sketch.total == 12
+
+
+def test_new_item_inherits_the_smallest_counter_as_error():
+    sketch = SpaceSaving(2)
+    sketch.offer("a", 10)
+    sketch.offer("b", 3)
+    sketch.offer("c", 1)
+
+    assert "b" not in sketch
+    assert sketch.top() == [("a", 10, 0.0), ("c", 4, 3)]
+
+
+def test_non_positive_weights_are_ignored():
+    sketch = SpaceSaving(2)
+    sketch.offer("a", 0)
+    sketch.offer("b", -5)
+    assert len(sketch) == 0
+    assert sketch.total == 0
+
+
+def test_error_bounds_on_a_skewed_stream():
+    capacity = 10
+    sketch = SpaceSaving(capacity)
+    exact = {}
+    for item, weight in _skewed_stream():
+        exact[item] = exact.get(item, 0.0) + weight
+        sketch.offer(item, weight)
+
+    assert len(sketch) == capacity
+    assert sketch.total == pytest.approx(sum(exact.values()))
+    bound = sketch.total / capacity
+    for item, weight, error in sketch.top():
+        # The true weight lies in [weight - error, weight], errors never exceed total / capacity
+        assert weight - error - 1e-6 <= exact[item] <= weight + 1e-6
+        assert error <= bound + 1e-6
+
+    # Every item heavier than total / capacity is kept
+    heavy = {item for item, weight in exact.items() if weight > bound}
+    assert heavy and heavy <= {item for item, _, _ in sketch.top()}
+
+    # And the top of the sketch is the true top
+    true_top = sorted(exact, key=exact.get, reverse=True)[:3]
+    assert [item for item, _, _ in sketch.top(3)] == true_top
@@ -0,0 +1,58 @@
+import gzip
+import io
+import json
+
+import pytest
+
+from moduller import json_stream
+from moduller.json_stream import iter_json, write_json_gzip, gzip_json_body
+
+DOCUMENT = {
+    'user': 'düzenleyici',
+    'count': 3,
+    'ratio': 0.25,
+    'active': True,
+    'missing': None,
+    'tags': ('a', 'b'),
+    'nested': {'empty_list': [], 'empty_dict': {}, 'numbers': [1, [2, 3]]},
+    1: 'non-string key',
+}
+
+
+def _compact(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+
+
+def test_matches_json_dumps():
+    assert ''.join(iter_json(DOCUMENT)) == _compact(DOCUMENT)
+
+
+def test_generators_are_written_as_arrays():
+    records = [{'process_name': f"app_{i}.exe", 'duration': i * 1.5} for i in range(5)]
+    doc = {'records': (record for record in records), 'empty': iter(())}
+
+    assert json.loads(''.join(iter_json(doc))) == {'records': records, 'empty': []}
+
+
+def test_unsupported_types_fail_like_json_dumps():
+    with pytest.raises(TypeError):
+        ''.join(iter_json({'value': object()}))
+
+
+def test_gzip_body_round_trips(monkeypatch):
+    # Small chunks so the body is written in several pieces
+    monkeypatch.setattr(json_stream, 'STREAM_CHUNK_CHARS', 16)
+    doc = {'records': iter([{'title': 'Pencere – düzenleniyor', 'i': i} for i in range(100)])}
+
+    body, raw_bytes = gzip_json_body(doc)
+    text = gzip.decompress(body)
+
+    assert raw_bytes == len(text)
+    assert json.loads(text) == {'records': [{'title': 'Pencere – düzenleniyor', 'i': i} for i in range(100)]}
+
+
+def test_gzip_output_is_deterministic():
+    first, second = io.BytesIO(), io.BytesIO()
+    write_json_gzip(DOCUMENT, first)
+    write_json_gzip(DOCUMENT, second)
+    assert first.getvalue() == second.getvalue()
@@ -0,0 +1,38 @@
+import random
+from datetime import datetime, timedelta
+
+from moduller.minute_bitmap import MinuteBitmap, minute_index, rollup, overlap_minutes
+
+
+def test_minute_index():
+    assert minute_index("2026-01-05T00:00:59") == ("2026-01-05", 0)
+    assert minute_index("2026-01-05T23:59:00.123") == ("2026-01-05", 1439)
+
+
+def test_counts_match_sets_of_minute_strings():
+    rng = random.Random(7)
+    start = datetime(2026, 1, 5, 20, 0)
+    bitmaps = {}
+    sets = {}
+    for _ in range(5000):
+        program = f"program_{rng.randint(0, 9)}"
+        timestamp = (start + timedelta(seconds=rng.randint(0, 8 * 3600))).isoformat()
+        bitmaps.setdefault(program, MinuteBitmap()).add(timestamp)
+        sets.setdefault(program, set()).add(timestamp[:16])
+
+    for program, minutes in sets.items():
+        assert bitmaps[program].count() == len(minutes)
+        assert bitmaps[program].minutes() == sorted(minutes)
+
+    programs = sorted(sets)
+    assert rollup(bitmaps[p] for p in programs[:4]).count() == len(set().union(*(sets[p] for p in programs[:4])))
+    assert overlap_minutes(bitmaps[programs[0]], bitmaps[programs[1]]) == len(sets[programs[0]] & sets[programs[1]])
+
+
+def test_json_round_trip():
+    bitmap = MinuteBitmap()
+    for timestamp in ("2026-01-05T09:00:10", "2026-01-05T09:00:50", "2026-01-05T23:59:00", "2026-01-06T00:00:00"):
+        bitmap.add(timestamp)
+    restored = MinuteBitmap.from_json(bitmap.to_json())
+    assert restored.days == bitmap.days
+    assert len(restored) == 3
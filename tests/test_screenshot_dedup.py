@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+from PIL import Image
+
+from moduller.screenshot_dedup import compute_perceptual_hash, hamming_distance, ScreenshotDeduplicator
+
+START = datetime(2026, 1, 5, 9, 0)
+
+
+def _gradient(width=320, height=200, shift=0):
+    row = (np.arange(width) * 255 // width + shift) % 256
+    return Image.fromarray(np.tile(row, (height, 1)).astype(np.uint8))
+
+
+def test_hash_ignores_small_changes_but_not_different_screens():
+    base = _gradient()
+    noisy = np.asarray(base).copy()
+    noisy[10:12, 10:40] = 0  # a blinking cursor sized change
+    reversed_screen = _gradient().transpose(Image.Transpose.FLIP_LEFT_RIGHT)
+
+    base_hash = compute_perceptual_hash(base)
+    assert base_hash.bit_length() <= 64
+    assert hamming_distance(base_hash, compute_perceptual_hash(Image.fromarray(noisy))) <= 4
+    assert hamming_distance(base_hash, compute_perceptual_hash(reversed_screen)) > 4
+
+
+def test_threshold_is_inclusive():
+    dedup = ScreenshotDeduplicator(max_distance=4)
+    dedup.record_upload(0b0, 1000, START)
+
+    assert dedup.is_duplicate(0b1111, START + timedelta(seconds=10))
+    assert not dedup.is_duplicate(0b11111, START + timedelta(seconds=20))
+
+
+def test_first_frame_is_never_a_duplicate():
+    dedup = ScreenshotDeduplicator()
+    assert not dedup.is_duplicate(0, START)
+    assert dedup.get_stats()['frames'] == 1
+
+
+def test_skipped_frames_compare_against_the_last_upload_not_the_last_frame():
+    dedup = ScreenshotDeduplicator(max_distance=2)
+    dedup.record_upload(0b000, 500, START)
+
+    # Each frame drifts one more bit away from the uploaded reference
+    assert dedup.is_duplicate(0b001, START + timedelta(seconds=10))
+    assert dedup.is_duplicate(0b011, START + timedelta(seconds=20))
+    assert not dedup.is_duplicate(0b111, START + timedelta(seconds=30))
+
+    dedup.record_upload(0b111, 700, START + timedelta(seconds=30))
+    assert dedup.is_duplicate(0b111, START + timedelta(seconds=40))
+
+    markers = dedup.get_markers()
+    assert [marker['unchanged_since'] for marker in markers] == [
+        START.isoformat(), START.isoformat(), (START + timedelta(seconds=30)).isoformat()]
+    stats = dedup.get_stats()
+    assert (stats['uploaded'], stats['skipped'], stats['bytes_saved']) == (2, 3, 1700)
+    assert stats['skip_ratio'] == 0.75
+
+
+def test_discarded_reference_stops_skipping():
+    dedup = ScreenshotDeduplicator()
+    dedup.record_upload(42, 100, START)
+
+    # A stale drop (an older reference) leaves the current one alone
+    dedup.discard_reference(7)
+    assert dedup.is_duplicate(42, START + timedelta(seconds=10))
+
+    dedup.discard_reference(42)
+    assert not dedup.is_duplicate(42, START + timedelta(seconds=20))
+    assert dedup.reference()[0] is None
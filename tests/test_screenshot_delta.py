@@ -0,0 +1,99 @@
+import io
+import json
+
+import numpy as np
+from PIL import Image
+
+from moduller.screenshot_delta import TileDeltaEncoder, reconstruct_frame
+
+
+def _screen(width=200, height=130, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+
+
+def _png_round_trip(img):
+    buffer = io.BytesIO()
+    img.save(buffer, format='PNG')
+    buffer.seek(0)
+    return Image.open(buffer)
+
+
+def test_delta_round_trip_rebuilds_the_frame_exactly():
+    encoder = TileDeltaEncoder(tile_size=32)
+    base = _screen()
+    keyframe = encoder.encode(Image.fromarray(base))
+    assert keyframe == {'type': 'keyframe', 'keyframe_id': 1}
+
+    changed = base.copy()
+    changed[5:20, 40:50] = 255      # tile (0, 1)
+    changed[100:110, 196:200] = 0   # padded edge tile (3, 6)
+    delta = encoder.encode(Image.fromarray(changed))
+
+    assert delta['type'] == 'delta'
+    assert delta['manifest']['tiles'] == [[0, 1], [3, 6]]
+    assert delta['tiles_image'].size == (2 * 32, 32)
+
+    # Stored and fetched as separate files, like on S3
+    manifest = json.loads(json.dumps(delta['manifest']))
+    frame = reconstruct_frame(_png_round_trip(Image.fromarray(base)),
+                              _png_round_trip(delta['tiles_image']), manifest)
+    assert frame.size == (200, 130)
+    assert np.array_equal(np.asarray(frame), changed)
+
+
+def test_changes_within_the_pixel_threshold_are_ignored():
+    encoder = TileDeltaEncoder(tile_size=32, pixel_threshold=12)
+    base = np.full((64, 64, 3), 100, dtype=np.uint8)
+    encoder.encode(Image.fromarray(base))
+
+    noisy = base.copy()
+    noisy[::2, ::2] += 12
+    delta = encoder.encode(Image.fromarray(noisy))
+    assert delta['manifest']['tiles'] == []
+
+    noisy[0, 0] = 113
+    assert encoder.encode(Image.fromarray(noisy))['manifest']['tiles'] == [[0, 0]]
+
+
+def test_keyframe_every_interval():
+    encoder = TileDeltaEncoder(tile_size=32, keyframe_interval=3)
+    frame = Image.fromarray(_screen())
+    types = [encoder.encode(frame)['type'] for _ in range(7)]
+    assert types == ['keyframe', 'delta', 'delta', 'keyframe', 'delta', 'delta', 'keyframe']
+    assert encoder.get_stats()['keyframes'] == 3
+
+
+def test_large_change_or_new_geometry_sends_a_keyframe():
+    encoder = TileDeltaEncoder(tile_size=32, max_changed_ratio=0.5)
+    encoder.encode(Image.fromarray(_screen(seed=1)))
+
+    assert encoder.encode(Image.fromarray(_screen(seed=2)))['type'] == 'keyframe'
+    assert encoder.encode(Image.fromarray(_screen(width=180, seed=2)))['type'] == 'keyframe'
+    assert encoder.keyframe_id == 3
+
+
+def test_reset_forces_a_keyframe():
+    encoder = TileDeltaEncoder(tile_size=32)
+    frame = Image.fromarray(_screen())
+    encoder.encode(frame)
+    encoder.encode(frame)
+
+    encoder.reset()
+    result = encoder.encode(frame)
+    assert result == {'type': 'keyframe', 'keyframe_id': 2}
+
+
+def test_downscaled_keyframe_is_scaled_back():
+    encoder = TileDeltaEncoder(tile_size=32)
+    base = np.full((128, 128, 3), 80, dtype=np.uint8)
+    encoder.encode(Image.fromarray(base))
+    changed = base.copy()
+    changed[:32, :32] = 200
+    delta = encoder.encode(Image.fromarray(changed))
+
+    stored_keyframe = Image.fromarray(base).resize((64, 64))
+    frame = np.asarray(reconstruct_frame(stored_keyframe, delta['tiles_image'], delta['manifest']))
+    assert frame.shape == (128, 128, 3)
+    assert (frame[:32, :32] == 200).all()
+    assert (frame[64:, 64:] == 80).all()
@@ -0,0 +1,82 @@
+import io
+
+import numpy as np
+from PIL import Image
+from mss.screenshot import ScreenShot
+
+from moduller.screenshot_encoder import (FrameEncoder, ProfiledFrameEncoder, screenshot_to_image, process_screenshot,
+                                         AUTO_STEP_DOWN_FRAMES)
+from moduller.screenshot_dedup import compute_perceptual_hash
+
+PROFILES = {
+    'high': {'format': 'WEBP', 'quality': 80, 'method': 0, 'scale': 1.0},
+    'small': {'format': 'JPEG', 'quality': 60, 'scale': 0.5, 'grayscale': True},
+}
+
+
+def _grab(width=64, height=48, seed=0):
+    rng = np.random.default_rng(seed)
+    raw = bytearray(rng.integers(0, 256, width * height * 4, dtype=np.uint8).tobytes())
+    return ScreenShot.from_size(raw, width, height)
+
+
+def test_frombuffer_matches_the_legacy_rgb_copy():
+    sct_img = _grab()
+    legacy = Image.frombytes('RGB', sct_img.size, sct_img.rgb)
+    assert np.array_equal(np.asarray(screenshot_to_image(sct_img)), np.asarray(legacy))
+
+
+def test_reused_buffer_returns_independent_bytes():
+    encoder = FrameEncoder()
+    first = encoder.encode(screenshot_to_image(_grab(seed=1)), "PNG")
+    second = encoder.encode(screenshot_to_image(_grab(width=16, height=16, seed=2)), "PNG")
+
+    assert Image.open(io.BytesIO(first)).size == (64, 48)
+    assert Image.open(io.BytesIO(second)).size == (16, 16)
+
+
+def test_profile_settings_are_applied():
+    encoder = ProfiledFrameEncoder(PROFILES, profile="small")
+    img_bytes, extension = encoder.encode_frame(screenshot_to_image(_grab()))
+    encoded = Image.open(io.BytesIO(img_bytes))
+
+    assert extension == "jpeg"
+    assert (encoded.format, encoded.mode, encoded.size) == ("JPEG", "L", (32, 24))
+    assert encoder.get_status()['measured']['small']['frames'] == 1
+
+
+def test_auto_mode_steps_down_after_consecutive_frames_over_budget():
+    encoder = ProfiledFrameEncoder(PROFILES, profile="auto", cpu_budget_ms=100)
+    for _ in range(AUTO_STEP_DOWN_FRAMES - 1):
+        encoder._record_cost('high', 150, 1000)
+    encoder._record_cost('high', 50, 1000)  # one frame within budget resets the streak
+    for _ in range(AUTO_STEP_DOWN_FRAMES - 1):
+        encoder._record_cost('high', 150, 1000)
+    assert encoder.active_profile_name == 'high'
+
+    encoder._record_cost('high', 150, 1000)
+    assert encoder.active_profile_name == 'small'
+    # Last profile: nothing further to step down to
+    for _ in range(AUTO_STEP_DOWN_FRAMES):
+        encoder._record_cost('small', 150, 1000)
+    assert encoder.active_profile_name == 'small'
+
+
+def test_unknown_profile_falls_back_to_auto():
+    encoder = ProfiledFrameEncoder(PROFILES, profile="missing")
+    assert encoder.get_status()['mode'] == 'auto'
+
+
+def test_duplicate_frames_are_not_encoded():
+    img = screenshot_to_image(_grab())
+    encoder = ProfiledFrameEncoder(PROFILES, profile="high")
+    reference = (compute_perceptual_hash(img), 4, 8)
+
+    result = process_screenshot(encoder, img, dedup_reference=reference)
+    assert result['duplicate'] and result['image_bytes'] is None
+    assert encoder.costs == {}
+
+    result = process_screenshot(encoder, img, dedup_reference=(None, 4, 8))
+    assert not result['duplicate']
+    assert result['file_extension'] == "webp"
+    assert result['hash'] == reference[0]
@@ -0,0 +1,58 @@
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+from mss.screenshot import ScreenShot
+
+from moduller.screenshot_encoder_process import ScreenshotEncoderProcess
+
+PROFILES = {'standard': {'format': 'PNG', 'scale': 1.0}}
+
+
+@pytest.fixture
+def worker():
+    process = ScreenshotEncoderProcess(PROFILES, profile="standard", max_frame_bytes=64 * 48 * 4)
+    assert process.start()
+    yield process
+    process.stop()
+
+
+def _grab(width=64, height=48, seed=0):
+    rng = np.random.default_rng(seed)
+    raw = bytearray(rng.integers(0, 256, width * height * 4, dtype=np.uint8).tobytes())
+    return ScreenShot.from_size(raw, width, height)
+
+
+def test_worker_encodes_the_shared_memory_frame(worker):
+    sct_img = _grab()
+    result = worker.process_frame(sct_img)
+
+    decoded = Image.open(io.BytesIO(result['image_bytes']))
+    expected = Image.frombytes('RGB', sct_img.size, sct_img.rgb)
+    assert result['file_extension'] == "png"
+    assert np.array_equal(np.asarray(decoded.convert('RGB')), np.asarray(expected))
+
+    status = worker.get_status()
+    assert status['active_profile'] == 'standard'
+    assert status['process']['alive'] and status['process']['frames'] == 1
+
+
+def test_duplicate_frame_is_reported_without_bytes(worker):
+    first = worker.process_frame(_grab(), dedup_reference=(None, 4, 8))
+    second = worker.process_frame(_grab(), dedup_reference=(first['hash'], 4, 8))
+    assert second['duplicate'] and second['image_bytes'] is None
+
+
+def test_oversized_frame_is_rejected(worker):
+    with pytest.raises(ValueError):
+        worker.process_frame(_grab(width=128, height=96))
+    # The worker is still usable afterwards
+    assert not worker.process_frame(_grab())['duplicate']
+
+
+def test_stopped_worker_refuses_frames(worker):
+    worker.stop()
+    assert not worker.get_status()['process']['alive']
+    with pytest.raises(RuntimeError):
+        worker.process_frame(_grab())
@@ -0,0 +1,87 @@
+import pytest
+
+from moduller import screenshot_scheduler
+from moduller.screenshot_scheduler import MonotonicTickScheduler, tick_metadata
+
+
+class FakeClock:
+    """Stands in for the time module: sleep() advances monotonic()"""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(screenshot_scheduler, 'time', fake)
+    return fake
+
+
+def test_ticks_stay_on_the_grid_despite_work_time(clock):
+    scheduler = MonotonicTickScheduler(interval=10)
+    scheduler.start()
+
+    planned = []
+    for work in (0, 3.5, 9.9, 0.2, 7):
+        tick = scheduler.wait_next_tick()
+        planned.append(clock.now - tick['lateness_seconds'] - 1000.0)
+        clock.now += work  # encode + upload time of this capture
+
+    # No drift: work time never pushes the next capture back
+    assert planned == [0, 10, 20, 30, 40]
+    assert scheduler.get_stats()['skipped_ticks'] == 0
+
+
+def test_stall_skips_missed_ticks_instead_of_bursting(clock):
+    scheduler = MonotonicTickScheduler(interval=10)
+    scheduler.start()
+    scheduler.wait_next_tick()
+
+    clock.now += 35  # capture stalled past ticks 1-3
+    tick = scheduler.wait_next_tick()
+    assert tick['tick_index'] == 3
+    assert tick['skipped_ticks'] == 2
+    assert tick['lateness_seconds'] == pytest.approx(5)
+
+    tick = scheduler.wait_next_tick()
+    assert tick['tick_index'] == 4
+    assert clock.now == pytest.approx(1040)
+
+    stats = scheduler.get_stats()
+    assert stats['ticks'] == 3
+    assert stats['skipped_ticks'] == 2
+    assert stats['max_lateness_ms'] == pytest.approx(5000)
+
+
+def test_wait_aborts_when_stopped(clock):
+    scheduler = MonotonicTickScheduler(interval=10)
+    scheduler.start()
+    scheduler.wait_next_tick()
+
+    checks = []
+
+    def should_continue():
+        checks.append(clock.now)
+        return len(checks) < 3
+
+    assert scheduler.wait_next_tick(should_continue) is None
+    # Sleeps in slices, so a stop is noticed within MAX_SLEEP_SLICE
+    assert clock.now - 1000 == pytest.approx(2 * screenshot_scheduler.MAX_SLEEP_SLICE)
+
+
+def test_metadata_carries_planned_and_actual_time(clock):
+    scheduler = MonotonicTickScheduler(interval=10)
+    scheduler.start()
+    clock.now += 0.25
+    metadata = tick_metadata(scheduler.wait_next_tick())
+
+    assert metadata['tick-index'] == 0
+    assert metadata['capture-lateness-ms'] == "250.0"
+    assert metadata['planned-capture-time'] < metadata['actual-capture-time']
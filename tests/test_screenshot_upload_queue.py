@@ -0,0 +1,84 @@
+import threading
+
+from moduller.screenshot_upload_queue import ScreenshotUploadQueue, MIN_DEGRADED_QUALITY
+
+
+def _frame(name, **extra):
+    return dict({'image_bytes': name.encode(), 'email': "a@x.com", 'task_name': "task"}, **extra)
+
+
+def _names(queue):
+    return [frame['image_bytes'].decode() for frame in queue.frames]
+
+
+def test_drop_oldest_keeps_frames_others_depend_on():
+    queue = ScreenshotUploadQueue(max_size=3, policy="drop_oldest")
+    dropped = []
+    queue.put(_frame("key", keep=True))
+    queue.put(_frame("d1", on_drop=lambda: dropped.append("d1")))
+    queue.put(_frame("d2"))
+
+    assert queue.put(_frame("d3"))
+    assert _names(queue) == ["key", "d2", "d3"]
+    assert dropped == ["d1"]
+    assert queue.get_metrics()['dropped'] == 1
+
+
+def test_oldest_kept_frame_goes_when_all_are_kept():
+    queue = ScreenshotUploadQueue(max_size=2, policy="drop_oldest")
+    for name in ("k1", "k2", "k3"):
+        queue.put(_frame(name, keep=True))
+    assert _names(queue) == ["k2", "k3"]
+
+
+def test_pause_drops_the_new_frame_after_the_timeout():
+    queue = ScreenshotUploadQueue(max_size=1, policy="pause", pause_timeout=0.05)
+    queue.running = True
+    dropped = []
+    queue.put(_frame("first"))
+
+    assert not queue.put(_frame("second", on_drop=lambda: dropped.append("second")))
+    assert _names(queue) == ["first"]
+    assert dropped == ["second"]
+    assert queue.get_metrics()['paused_seconds'] > 0
+
+
+def test_lower_quality_steps_down_with_depth():
+    queue = ScreenshotUploadQueue(max_size=10, policy="lower_quality")
+    assert queue.recommended_quality(80) == 80
+    for i in range(5):
+        queue.put(_frame(str(i)))
+    assert queue.recommended_quality(80) == 80
+    for i in range(4):
+        queue.put(_frame(str(i)))
+    assert queue.recommended_quality(80) == 48
+    queue.put(_frame("full"))
+    assert queue.recommended_quality(40) == MIN_DEGRADED_QUALITY
+
+    # Other policies never lower it
+    assert ScreenshotUploadQueue(policy="drop_oldest").recommended_quality(80) == 80
+
+
+def test_workers_drain_and_count_results():
+    uploaded = []
+    lock = threading.Lock()
+
+    def upload(image_bytes, email, task_name, file_extension, **kwargs):
+        with lock:
+            uploaded.append((image_bytes, kwargs['manifest']))
+        return None if image_bytes == b"bad" else f"https://bucket/{image_bytes.decode()}"
+
+    queue = ScreenshotUploadQueue(max_size=8, workers=2, upload_func=upload)
+    queue.start()
+    for name in ("a", "bad", "c"):
+        queue.put(_frame(name, manifest={'frame': name}))
+    queue.stop(drain=True, timeout=5)
+
+    assert sorted(uploaded) == [(b"a", {'frame': "a"}), (b"bad", {'frame': "bad"}), (b"c", {'frame': "c"})]
+    metrics = queue.get_metrics()
+    assert (metrics['uploaded'], metrics['failed'], metrics['depth']) == (2, 1, 0)
+    assert not metrics['running']
+
+
+def test_unknown_policy_falls_back_to_drop_oldest():
+    assert ScreenshotUploadQueue(policy="bogus").policy == "drop_oldest"
@@ -0,0 +1,134 @@
+import os
+import json
+
+import pytest
+
+from moduller import session_checkpoint, s3_uploader
+from moduller.session_checkpoint import (SessionCheckpointLog, open_checkpoint, iter_checkpoint, list_checkpoints,
+                                         claim_checkpoint, release_checkpoint, CHECKPOINT_SUFFIX)
+from moduller.user_program_tracker import rebuild_program_session, recover_program_checkpoints
+from moduller.active_window_tracker import rebuild_activity_tracker
+
+T0 = 1767600000.0
+
+
+@pytest.fixture
+def checkpoint_dir(tmp_path, monkeypatch):
+    directory = str(tmp_path / "checkpoints")
+    monkeypatch.setattr(session_checkpoint.config_manager, 'get_checkpoint_config',
+                        lambda: {'enabled': True, 'directory': directory, 'fsync_interval_seconds': 0})
+    return directory
+
+
+def _tear(path, partial):
+    """Simulate a crash in the middle of writing the last record"""
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(partial)
+
+
+def _program_log(path):
+    log = SessionCheckpointLog(path, fsync_interval=0)
+    log.append({'type': 'start', 'email': "a@x.com", 'task_name': "task", 'session_start': "2026-01-05T09:00:00"})
+    log.append({'type': 'capture', 't': T0, 'programs': {
+        "code.exe": {'total_time': 30, 'window_titles': ["main.py"], 'browser_domains': []}}})
+    log.append({'type': 'segment', 'sequence': 1, 'key': "logs/segment_001.json",
+                'segment_start': "2026-01-05T09:00:00", 'segment_end': "2026-01-05T09:15:00", 'programs': 1})
+    log.append({'type': 'capture', 't': T0 + 10, 'programs': {
+        "chrome.exe": {'total_time': 10, 'window_titles': ["Docs"], 'browser_domains': ["docs.com"]}}})
+    return log
+
+
+def test_reader_stops_at_a_torn_last_record(tmp_path):
+    path = str(tmp_path / f"program_a{CHECKPOINT_SUFFIX}")
+    _program_log(path).close()
+    _tear(path, '{"type":"capture","t":1767600020,"programs":{"code.exe":{"total_ti')
+
+    records = list(iter_checkpoint(path))
+    assert [record['type'] for record in records] == ["start", "capture", "segment", "capture"]
+
+
+def test_program_session_is_rebuilt_up_to_the_torn_record(tmp_path):
+    path = str(tmp_path / f"program_a{CHECKPOINT_SUFFIX}")
+    _program_log(path).close()
+    _tear(path, '{"type":"capture","t":1767600020,"progr')
+
+    session = rebuild_program_session(path)
+    assert session['recovered'] and not session['tracking_active']
+    assert session['program_data']["code.exe"]['total_time'] == 30
+    assert session['program_data']["chrome.exe"]['browser_domains'] == ["docs.com"]
+    assert [segment['sequence'] for segment in session['segments']] == [1]
+    assert session['segment_start'] == "2026-01-05T09:15:00"
+    # A resumed session numbers its next segment after the recovered ones
+    assert session['next_segment'] == 2
+
+
+def test_torn_header_rebuilds_nothing(tmp_path):
+    path = str(tmp_path / f"program_a{CHECKPOINT_SUFFIX}")
+    _tear(path, '{"type":"start","email":"a@x')
+    assert rebuild_program_session(path) is None
+
+
+def test_activity_tracker_is_rebuilt_up_to_the_torn_record(tmp_path):
+    path = str(tmp_path / f"activity_a{CHECKPOINT_SUFFIX}")
+    log = SessionCheckpointLog(path, fsync_interval=0)
+    log.append({'type': 'start', 'email': "a@x.com", 'task_name': "task", 'tracking_started': "2026-01-05T09:00:00"})
+    log.append({'type': 'window', 'k': 0, 'process': "code.exe", 'title': "main.py", 'pid': 1})
+    log.append({'type': 'interval', 'k': 0, 's': T0, 'e': T0 + 60})
+    log.append({'type': 'interval', 'k': 0, 's': T0 + 90, 'e': T0 + 100})
+    log.close()
+    _tear(path, '{"type":"interval","k":0,"s":1767600200')
+
+    tracker, header = rebuild_activity_tracker(path)
+    assert header['email'] == "a@x.com"
+    assert len(tracker.intervals) == 2
+    assert tracker.intervals.totals_by_process() == pytest.approx({"code.exe": 70})
+
+
+def test_live_log_cannot_be_claimed(tmp_path):
+    path = str(tmp_path / f"program_a{CHECKPOINT_SUFFIX}")
+    log = _program_log(path)
+    assert claim_checkpoint(path) is None
+    with pytest.raises(OSError):
+        SessionCheckpointLog(path)
+
+    log.close()
+    fd = claim_checkpoint(path)
+    assert fd is not None
+    assert claim_checkpoint(path) is None
+    release_checkpoint(path, fd, remove=True)
+    assert not os.path.exists(path)
+
+
+def test_open_checkpoint_writes_the_header_and_discard_removes_it(checkpoint_dir):
+    log = open_checkpoint('program', "a@x.com|my task", {'email': "a@x.com"})
+    assert os.path.basename(log.path).startswith("program_a@x.com_my_task_")
+    assert list_checkpoints('program') == [log.path]
+    assert list_checkpoints('program', exclude={os.path.abspath(log.path)}) == []
+
+    with open(log.path, encoding='utf-8') as f:
+        assert json.loads(f.readline()) == {'email': "a@x.com", 'type': 'start'}
+    log.close(discard=True)
+    assert list_checkpoints('program') == []
+
+
+def test_recovery_uploads_leftover_logs_and_skips_live_ones(checkpoint_dir, monkeypatch):
+    uploads = []
+    monkeypatch.setattr(s3_uploader, 'upload_program_tracking_to_s3',
+                        lambda email, report, task_name: uploads.append(report) or "https://bucket/report.json")
+    os.makedirs(checkpoint_dir)
+    leftover = os.path.join(checkpoint_dir, f"program_old{CHECKPOINT_SUFFIX}")
+    _program_log(leftover).close()
+    _tear(leftover, '{"type":"capt')
+    live = _program_log(os.path.join(checkpoint_dir, f"program_live{CHECKPOINT_SUFFIX}"))
+
+    try:
+        assert recover_program_checkpoints() == 1
+    finally:
+        live.close()
+
+    assert not os.path.exists(leftover)
+    assert os.path.exists(live.path)
+    report = uploads[0]
+    assert report['recovered_from_checkpoint'] is True
+    assert {program['process_name'] for program in report['programs']} == {"code.exe", "chrome.exe"}
+    assert [segment['sequence'] for segment in report['segments']] == [1]
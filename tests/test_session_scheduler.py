@@ -0,0 +1,106 @@
+import threading
+
+import pytest
+
+from moduller import session_scheduler
+from moduller.session_scheduler import SessionScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    """A scheduler run on the test thread with a fake clock: waiting jumps the clock ahead"""
+    clock = FakeClock()
+    monkeypatch.setattr(session_scheduler, 'time', clock)
+    scheduler = SessionScheduler()
+    scheduler._ensure_thread = lambda: None
+    scheduler.running = True
+    scheduler.clock = clock
+
+    def wait(timeout=None):
+        assert timeout is not None, "no job left to run"
+        clock.now += max(0.0, timeout)
+    scheduler.condition.wait = wait
+    return scheduler
+
+
+def _run(scheduler, runs):
+    """Run the scheduler loop until `runs` callbacks happened; returns [(key, time)]"""
+    calls = []
+    for key, job in scheduler.jobs.items():
+        callback = job['callback']
+
+        def record(key, callback=callback):
+            calls.append((key, scheduler.clock.now))
+            if len(calls) >= runs:
+                scheduler.running = False
+            callback(key)
+        job['callback'] = record
+    scheduler._run()
+    return calls
+
+
+def test_sessions_run_at_their_own_fixed_rate(scheduler):
+    scheduler.add("a", 10, lambda key: None)
+    scheduler.add("b", 15, lambda key: None)
+
+    calls = _run(scheduler, 6)
+    assert calls == [("a", 10), ("b", 15), ("a", 20), ("b", 30), ("a", 30), ("a", 40)]
+
+
+def test_removed_or_replaced_job_leaves_stale_heap_entries_behind(scheduler):
+    scheduler.add("a", 10, lambda key: None)
+    scheduler.add("b", 10, lambda key: None, first_delay=5)
+    scheduler.add("a", 4, lambda key: None)  # replaces a, its old entry goes stale
+    assert scheduler.remove("b")
+    assert not scheduler.remove("b")
+    assert len(scheduler.heap) == 3
+
+    calls = _run(scheduler, 3)
+    assert calls == [("a", 4), ("a", 8), ("a", 12)]
+    # Stale entries were popped on the way
+    assert [entry[2] for entry in scheduler.heap] == ["a"]
+
+
+def test_overrunning_callback_skips_ahead_instead_of_bursting(scheduler):
+    def slow(key):
+        if scheduler.clock.now == 10:
+            scheduler.clock.now += 35
+
+    scheduler.add("a", 10, slow)
+    calls = _run(scheduler, 3)
+
+    # Due 20 is run late, 30 and 40 were missed entirely
+    assert calls == [("a", 10), ("a", 45), ("a", 50)]
+    stats = scheduler.get_stats()['per_session']['a']
+    assert stats['runs'] == 3
+    assert stats['skipped'] == 2
+    assert stats['max_lateness_ms'] == pytest.approx(25000)
+
+
+def test_failing_callback_keeps_the_job_scheduled(scheduler):
+    def failing(key):
+        raise RuntimeError("boom")
+
+    scheduler.add("a", 10, failing)
+    assert _run(scheduler, 2) == [("a", 10), ("a", 20)]
+
+
+def test_thread_runs_jobs_until_removed():
+    scheduler = SessionScheduler(name="test-scheduler")
+    ran = threading.Event()
+    scheduler.add("a", 60, lambda key: ran.set(), first_delay=0)
+    try:
+        assert ran.wait(5)
+        assert scheduler.get_stats()['thread_alive']
+        assert scheduler.remove("a")
+        assert scheduler.get_stats()['sessions'] == 0
+    finally:
+        scheduler.stop()
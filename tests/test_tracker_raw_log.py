@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from moduller import tracker
+
+
+def _snapshot(*pids):
+    return [{"pid": pid, "create_time": float(pid), "program": f"app{pid}.exe", "path": None} for pid in pids]
+
+
+@pytest.fixture(autouse=True)
+def logs_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    yield tmp_path
+    tracker.close_raw_program_logs()
+
+
+def _events(path):
+    return [record["event"] for record in tracker.iter_raw_program_log(path)]
+
+
+def test_alternating_logs_keep_their_writers():
+    path_a = tracker.save_raw_program_log("a@x.com", "Task A", _snapshot(1, 2))
+    path_b = tracker.save_raw_program_log("b@x.com", "Task B", _snapshot(7))
+    tracker.save_raw_program_log("a@x.com", "Task A", _snapshot(1, 2, 3))
+    tracker.save_raw_program_log("b@x.com", "Task B", _snapshot())
+    tracker.save_raw_program_log("a@x.com", "Task A", _snapshot(2, 3))
+
+    assert set(tracker._raw_log_writers) == {path_a, path_b}
+    # One keyframe per log: switching logs no longer reopens (and re-keyframes) them
+    assert _events(path_a) == ["keyframe", "start", "tick", "exit", "tick"]
+    assert _events(path_b) == ["keyframe", "exit", "tick"]
+
+    intervals = tracker.get_program_intervals(path_a)
+    assert sorted(interval["pid"] for interval in intervals) == [1, 2, 3]
+
+
+def test_least_recently_used_writer_is_closed(monkeypatch):
+    monkeypatch.setattr(tracker, "RAW_LOG_MAX_OPEN_WRITERS", 2)
+    path_a = tracker.save_raw_program_log("a@x.com", "A", _snapshot(1))
+    path_b = tracker.save_raw_program_log("a@x.com", "B", _snapshot(1))
+    tracker.save_raw_program_log("a@x.com", "A", _snapshot(1))
+    path_c = tracker.save_raw_program_log("a@x.com", "C", _snapshot(1))
+
+    assert list(tracker._raw_log_writers) == [path_a, path_c]
+    assert _events(path_b) == ["keyframe"]
+
+    # Reopened later: a new writer starts with a keyframe again
+    tracker.save_raw_program_log("a@x.com", "B", _snapshot(1))
+    assert _events(path_b) == ["keyframe", "keyframe"]
+
+
+def test_legacy_json_is_converted_while_other_logs_stay_open():
+    path_a = tracker.save_raw_program_log("a@x.com", "Task A", _snapshot(1))
+    path_b = tracker.save_raw_program_log("b@x.com", "Task B", _snapshot(5))
+
+    legacy = [{"program": "old.exe", "timestamp": "2024-01-01T09:00:00"},
+              {"program": "older.exe", "timestamp": "2024-01-01T09:01:00"}]
+    with open(path_a[:-1], "w", encoding="utf-8") as f:
+        json.dump(legacy, f)
+
+    tracker.save_raw_program_log("a@x.com", "Task A", _snapshot(1, 2))
+    tracker.save_raw_program_log("b@x.com", "Task B", _snapshot(5, 6))
+
+    records = list(tracker.iter_raw_program_log(path_a))
+    assert records[:2] == legacy
+    # The converter closed A's writer, its new writer starts over with a keyframe
+    assert [record["event"] for record in records[2:]] == ["keyframe", "keyframe"]
+    assert _events(path_b) == ["keyframe", "start", "tick"]
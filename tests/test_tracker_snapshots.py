@@ -0,0 +1,73 @@
+from collections import defaultdict
+
+from moduller.minute_bitmap import MinuteBitmap
+from moduller.tracker import (ProcessSnapshotDiffer, RawProgramLogWriter, get_program_intervals,
+                              iter_raw_program_log, _apply_raw_record)
+
+
+def _process(pid, program, create_time=None):
+    return {"pid": pid, "create_time": create_time if create_time is not None else float(pid),
+            "program": program, "path": f"C:\\{program}"}
+
+
+def _by_event(records):
+    return [(record["event"], record.get("pid")) for record in records]
+
+
+def test_first_snapshot_is_a_keyframe_then_only_changes():
+    differ = ProcessSnapshotDiffer(keyframe_every=60)
+    first = differ.diff([_process(1, "a.exe"), _process(2, "b.exe")], "2026-01-05T09:00:00")
+    assert first[0]["event"] == "keyframe"
+    assert sorted(p["pid"] for p in first[0]["processes"]) == [1, 2]
+
+    unchanged = differ.diff([_process(1, "a.exe"), _process(2, "b.exe")], "2026-01-05T09:01:00")
+    assert _by_event(unchanged) == [("tick", None)]
+
+    changed = differ.diff([_process(2, "b.exe"), _process(3, "c.exe")], "2026-01-05T09:02:00")
+    assert _by_event(changed) == [("exit", 1), ("start", 3), ("tick", None)]
+    assert changed[0]["program"] == "a.exe"
+    assert all(record["timestamp"] == "2026-01-05T09:02:00" for record in changed)
+
+
+def test_reused_pid_is_a_new_process():
+    differ = ProcessSnapshotDiffer()
+    differ.diff([_process(7, "a.exe", create_time=100.0)], "2026-01-05T09:00:00")
+    records = differ.diff([_process(7, "b.exe", create_time=200.0)], "2026-01-05T09:01:00")
+
+    assert _by_event(records) == [("exit", 7), ("start", 7), ("tick", None)]
+    assert (records[0]["program"], records[1]["program"]) == ("a.exe", "b.exe")
+
+
+def test_keyframe_repeats_every_n_snapshots():
+    differ = ProcessSnapshotDiffer(keyframe_every=3)
+    events = [differ.diff([_process(1, "a.exe")], f"2026-01-05T09:0{minute}:00")[0]["event"]
+              for minute in range(7)]
+    assert events == ["keyframe", "tick", "tick", "keyframe", "tick", "tick", "keyframe"]
+
+
+def test_records_replay_into_intervals_and_minutes(tmp_path):
+    path = str(tmp_path / "task_program_raw.jsonl")
+    writer = RawProgramLogWriter(path)
+    snapshots = [
+        [_process(1, "chrome.exe"), _process(2, "code.exe")],
+        [_process(1, "chrome.exe"), _process(2, "code.exe"), _process(3, "slack.exe")],
+        [_process(1, "chrome.exe"), _process(3, "slack.exe")],
+        [_process(1, "chrome.exe")],
+    ]
+    for minute, snapshot in enumerate(snapshots):
+        writer.append_snapshot(snapshot, f"2026-01-05T09:0{minute}:30")
+    writer.close()
+
+    spans = {interval["program"]: (interval["start"][11:16], interval["end"][11:16])
+             for interval in get_program_intervals(path)}
+    assert spans == {"chrome.exe": ("09:00", "09:03"), "code.exe": ("09:00", "09:02"),
+                     "slack.exe": ("09:01", "09:03")}
+
+    program_time_map = defaultdict(MinuteBitmap)
+    alive = {}
+    for record in iter_raw_program_log(path):
+        _apply_raw_record(program_time_map, alive, record)
+    assert alive == {"1:1.0": "chrome.exe"}
+    minutes = {program: bitmap.count() for program, bitmap in program_time_map.items()}
+    assert minutes["slack.exe"] == 2
+    assert minutes["code.exe"] == 2
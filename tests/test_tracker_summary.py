@@ -0,0 +1,153 @@
+import os
+import json
+import random
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import pytest
+
+from moduller.tracker import (RawProgramLogWriter, update_summary_state, build_summary_from_raw,
+                              PROGRAM_ALIASES, SYSTEM_PROCESSES)
+
+
+class SyntheticSession:
+    """One-minute process snapshots with a few starts/exits per minute, plus the per-minute reference"""
+
+    def __init__(self, processes=150, seed=42):
+        self.processes = processes
+        self.rng = random.Random(seed)
+        self.programs = (list(PROGRAM_ALIASES) + sorted(SYSTEM_PROCESSES)[:10]
+                         + [f"tool_{i}.exe" for i in range(40)])
+        self.started = datetime(2026, 1, 5, 8, 0)
+        self.next_pid = 1000
+        self.running = {}
+        # Original accounting: set of minute strings per (aliased) program
+        self.minute_sets = defaultdict(set)
+
+    def _start_process(self, now):
+        self.next_pid += self.rng.randint(1, 8)
+        program = self.rng.choice(self.programs)
+        self.running[self.next_pid] = {"pid": self.next_pid, "create_time": now.timestamp(),
+                                       "program": program, "path": f"C:\\Program Files\\{program}"}
+
+    def snapshot(self, minute):
+        now = self.started + timedelta(minutes=minute, seconds=self.rng.randint(0, 59))
+        while len(self.running) < self.processes:
+            self._start_process(now)
+        for pid in self.rng.sample(sorted(self.running), self.rng.randint(0, 4)):
+            del self.running[pid]
+        for _ in range(self.rng.randint(0, 4)):
+            self._start_process(now)
+
+        timestamp = now.isoformat()
+        for process in self.running.values():
+            if process["program"] not in SYSTEM_PROCESSES:
+                self.minute_sets[PROGRAM_ALIASES.get(process["program"], process["program"])].add(timestamp[:16])
+        return list(self.running.values()), timestamp
+
+    def reference(self):
+        return {program: f"{len(minutes):.1f} mins" for program, minutes in self.minute_sets.items()}
+
+
+@pytest.fixture
+def raw_log(tmp_path):
+    raw_file = str(tmp_path / "task_program_raw.jsonl")
+    state_file = str(tmp_path / "task_program_summary_state.json")
+    writers = []
+
+    def open_writer():
+        writer = RawProgramLogWriter(raw_file)
+        writers.append(writer)
+        return writer
+
+    yield raw_file, state_file, open_writer
+    for writer in writers:
+        writer.close()
+
+
+def _assert_same(incremental, full):
+    assert incremental == full
+    # Same ranking, not just the same minutes
+    assert list(incremental["programs"]) == list(full["programs"])
+
+
+def test_incremental_summary_matches_full_rescan_every_hour(raw_log):
+    raw_file, state_file, open_writer = raw_log
+    session = SyntheticSession()
+    writer = open_writer()
+
+    for minute in range(10 * 60):
+        writer.append_snapshot(*session.snapshot(minute))
+        incremental = update_summary_state(raw_file, state_file)
+
+        if (minute + 1) % 60 == 0:
+            full = build_summary_from_raw(raw_file)
+            _assert_same(incremental, full)
+            assert full["programs"] == session.reference()
+
+
+def test_line_still_being_written_is_left_for_the_next_tick(raw_log):
+    raw_file, state_file, open_writer = raw_log
+    session = SyntheticSession(processes=20)
+    writer = open_writer()
+    writer.append_snapshot(*session.snapshot(0))
+
+    with open(raw_file, "a", encoding="utf-8") as f:
+        f.write('{"event": "tick", "timest')
+    first = update_summary_state(raw_file, state_file)
+    with open(state_file, encoding="utf-8") as f:
+        offset = json.load(f)["offset"]
+    assert offset < os.path.getsize(raw_file)
+
+    with open(raw_file, "a", encoding="utf-8") as f:
+        f.write('amp": "2026-01-05T08:01:30"}\n')
+    second = update_summary_state(raw_file, state_file)
+    _assert_same(second, build_summary_from_raw(raw_file))
+    assert second != first
+
+
+def test_truncated_raw_log_resets_the_offset(raw_log):
+    raw_file, state_file, open_writer = raw_log
+    session = SyntheticSession(processes=40)
+    writer = open_writer()
+    for minute in range(60):
+        writer.append_snapshot(*session.snapshot(minute))
+        update_summary_state(raw_file, state_file)
+    writer.close()
+
+    # Same file, emptied and written again from a keyframe
+    with open(raw_file, "w", encoding="utf-8"):
+        pass
+    writer = open_writer()
+    fresh = SyntheticSession(processes=10, seed=7)
+    for minute in range(3):
+        writer.append_snapshot(*fresh.snapshot(minute))
+
+    incremental = update_summary_state(raw_file, state_file)
+    _assert_same(incremental, build_summary_from_raw(raw_file))
+    assert incremental["programs"] == fresh.reference()
+
+
+def test_replaced_raw_log_resets_the_offset(raw_log, tmp_path):
+    raw_file, state_file, open_writer = raw_log
+    session = SyntheticSession(processes=10)
+    writer = open_writer()
+    for minute in range(5):
+        writer.append_snapshot(*session.snapshot(minute))
+        update_summary_state(raw_file, state_file)
+    writer.close()
+
+    # Rotated: a different, larger file renamed over it (as the .json converter does)
+    other = SyntheticSession(processes=60, seed=3)
+    replacement = str(tmp_path / "replacement.jsonl")
+    other_writer = RawProgramLogWriter(replacement)
+    for minute in range(30):
+        other_writer.append_snapshot(*other.snapshot(minute))
+    other_writer.close()
+    assert os.path.getsize(replacement) > os.path.getsize(raw_file)
+    os.replace(replacement, raw_file)
+
+    incremental = update_summary_state(raw_file, state_file)
+    _assert_same(incremental, build_summary_from_raw(raw_file))
+    assert incremental["programs"] == other.reference()
+
@@ -0,0 +1,136 @@
+import os
+import json
+
+import pytest
+
+from moduller import upload_spool
+from moduller.upload_spool import (UploadSpool, SPOOL_PRIORITY_HIGH, SPOOL_PRIORITY_NORMAL,
+                                   SPOOL_PRIORITY_LOW, SPOOL_TEMP_SUFFIX)
+
+
+@pytest.fixture
+def spool(tmp_path):
+    return UploadSpool(directory=str(tmp_path / "spool"), max_bytes=10 * 1024 * 1024,
+                       base_backoff=5, max_backoff=60)
+
+
+def _write(spool, key, body=b"payload", priority=SPOOL_PRIORITY_NORMAL, **kwargs):
+    return spool.write("bucket", key, body, "application/json", priority=priority, claim=False, **kwargs)
+
+
+def test_write_renames_into_place_and_load_drops_incomplete_writes(spool):
+    entry_id = _write(spool, "logs/a.json", b'{"a": 1}')
+    path = os.path.join(spool.directory, entry_id)
+    assert not os.path.exists(path + SPOOL_TEMP_SUFFIX)
+
+    with open(path, 'rb') as f:
+        header = json.loads(f.readline())
+        assert f.read() == b'{"a": 1}'
+    assert header['key'] == "logs/a.json"
+
+    # A crash between write and rename leaves only the temp file behind
+    torn = os.path.join(spool.directory, "5-1-1.spool" + SPOOL_TEMP_SUFFIX)
+    with open(torn, 'wb') as f:
+        f.write(b'{"bucket": "bucket"')
+
+    reloaded = UploadSpool(directory=spool.directory)
+    assert not os.path.exists(torn)
+    assert list(reloaded.entries) == [entry_id]
+    assert reloaded.total_bytes == os.path.getsize(path)
+
+
+def test_highest_priority_then_oldest_is_drained_first(spool):
+    low = _write(spool, "shot.webp", priority=SPOOL_PRIORITY_LOW)
+    normal = _write(spool, "other.json", priority=SPOOL_PRIORITY_NORMAL)
+    high_first = _write(spool, "log1.json", priority=SPOOL_PRIORITY_HIGH)
+    high_second = _write(spool, "log2.json", priority=SPOOL_PRIORITY_HIGH)
+
+    order = []
+    while spool.entries:
+        entry_id = spool._next_ready()
+        order.append(entry_id)
+        spool.remove(entry_id)
+    assert order == [high_first, high_second, normal, low]
+
+
+def test_claimed_entries_are_left_to_their_uploader(spool):
+    entry_id = spool.write("bucket", "log.json", b"x", "application/json")
+    assert spool._next_ready() is None
+
+    spool.mark_failed(entry_id, RuntimeError("down"))
+    assert not spool.entries[entry_id]['in_flight']
+
+
+def test_backoff_doubles_per_attempt_up_to_the_cap(spool, monkeypatch):
+    monkeypatch.setattr(upload_spool.random, 'uniform', lambda low, high: 1.0)
+    assert [spool._backoff(attempts) for attempts in range(1, 6)] == [5, 10, 20, 40, 60]
+
+
+def test_failed_entry_waits_for_its_backoff(spool, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(upload_spool.time, 'monotonic', lambda: now[0])
+    monkeypatch.setattr(upload_spool.random, 'uniform', lambda low, high: 1.0)
+    entry_id = _write(spool, "log.json")
+
+    spool.mark_failed(entry_id, RuntimeError("down"))
+    spool.mark_failed(entry_id, RuntimeError("down"))
+    assert spool.entries[entry_id]['attempts'] == 2
+    assert spool.metrics['last_error'] == "down"
+
+    now[0] += 9.9
+    assert spool._next_ready() is None
+    now[0] += 0.1
+    assert spool._next_ready() == entry_id
+
+
+def test_quota_evicts_oldest_first(tmp_path):
+    spool = UploadSpool(directory=str(tmp_path / "spool"), max_bytes=2000)
+    first = _write(spool, "a.webp", b"a" * 600, priority=SPOOL_PRIORITY_LOW)
+    second = _write(spool, "b.json", b"b" * 600, priority=SPOOL_PRIORITY_HIGH)
+    third = _write(spool, "c.webp", b"c" * 600, priority=SPOOL_PRIORITY_LOW)
+
+    assert set(spool.entries) == {second, third}
+    assert not os.path.exists(os.path.join(spool.directory, first))
+    assert spool.total_bytes <= spool.max_bytes
+    assert spool.metrics['evicted'] == 1
+
+
+def test_quota_skips_claimed_entries(tmp_path):
+    spool = UploadSpool(directory=str(tmp_path / "spool"), max_bytes=1000)
+    claimed = spool.write("bucket", "a.json", b"a" * 600, "application/json")
+    queued = _write(spool, "b.json", b"b" * 600)
+
+    assert list(spool.entries) == [claimed]
+    assert queued not in spool.entries
+
+
+def test_manifest_waits_for_its_object(spool):
+    image = _write(spool, "shot.webp", priority=SPOOL_PRIORITY_LOW)
+    manifest = _write(spool, "shot.json", priority=SPOOL_PRIORITY_HIGH, after=image)
+
+    # Higher priority, still held back until its object is uploaded
+    assert spool._next_ready() == image
+    spool.remove(image)
+    assert spool._next_ready() == manifest
+
+
+def test_manifest_order_survives_a_restart(spool):
+    image = _write(spool, "shot.webp", priority=SPOOL_PRIORITY_LOW)
+    manifest = _write(spool, "shot.json", priority=SPOOL_PRIORITY_LOW, after=image)
+
+    reloaded = UploadSpool(directory=spool.directory)
+    assert reloaded.entries[manifest]['after'] == image
+    assert reloaded._next_ready() == image
+
+
+def test_evicting_an_object_evicts_its_manifest(tmp_path):
+    spool = UploadSpool(directory=str(tmp_path / "spool"), max_bytes=2000)
+    image = _write(spool, "shot.webp", b"i" * 900, priority=SPOOL_PRIORITY_LOW)
+    manifest = _write(spool, "shot.json", b"m" * 100, priority=SPOOL_PRIORITY_LOW, after=image)
+    newest = _write(spool, "log.json", b"l" * 900, priority=SPOOL_PRIORITY_HIGH)
+    _write(spool, "log2.json", b"l" * 200, priority=SPOOL_PRIORITY_HIGH)
+
+    assert image not in spool.entries
+    assert manifest not in spool.entries
+    assert newest in spool.entries
+    assert spool.metrics['evicted'] == 2
@@ -0,0 +1,106 @@
+import json
+
+import pytest
+
+from moduller.window_events import (TraceReplaySource, RecordingSource, PollingWindowSource, WindowEventSource,
+                                    window_event, generate_synthetic_trace, replay_trace, TRACE_STOP_EVENT)
+
+T0 = 1767600000.0
+
+
+def _write_trace(path, records):
+    with open(path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+
+
+def test_replay_uses_the_trace_clock(tmp_path):
+    trace = str(tmp_path / "day.jsonl")
+    _write_trace(trace, [
+        window_event("main.py - Visual Studio Code", "code.exe", 10, T0),
+        window_event("Ticket 1 - Jira", "chrome.exe", 20, T0 + 100),
+        window_event("main.py - Visual Studio Code", "code.exe", 10, T0 + 130),
+        {'timestamp': T0 + 200, 'event': TRACE_STOP_EVENT},
+        window_event("after the stop", "ignored.exe", 30, T0 + 500),
+    ])
+
+    result = replay_trace(trace, speed=0)
+    assert result['events'] == 3
+    assert result['intervals'] == 3
+    assert result['tracked_seconds'] == pytest.approx(200)
+    assert dict(result['applications']) == {"code.exe": "2m 50s", "chrome.exe": "30s"}
+
+
+def test_replay_speed_scales_the_waits(tmp_path):
+    trace = str(tmp_path / "day.jsonl")
+    _write_trace(trace, [window_event("A", "a.exe", 1, T0), window_event("B", "b.exe", 2, T0 + 50)])
+    source = TraceReplaySource(trace, speed=1000)
+    waits = []
+    source.stop_event.wait = lambda seconds: waits.append(seconds)
+
+    emitted = []
+    source.run(emitted.append)
+    assert waits == [pytest.approx(0.05)]
+    assert source.now() == T0 + 50
+    assert [event['window_title'] for event in emitted] == ["A", "B"]
+
+
+class ScriptedSource(WindowEventSource):
+    name = "scripted"
+
+    def __init__(self, events, end):
+        super().__init__()
+        self.events = events
+        self.end = end
+        self.clock = T0
+
+    def now(self):
+        return self.clock
+
+    def run(self, emit):
+        for event in self.events:
+            self.clock = event['timestamp']
+            emit(event)
+        self.clock = self.end
+
+
+def test_recorded_trace_replays_the_same_events(tmp_path):
+    trace = str(tmp_path / "recorded.jsonl")
+    events = [window_event(f"Window {i}", f"app{i % 3}.exe", i, T0 + i * 7) for i in range(10)]
+    seen = []
+    RecordingSource(ScriptedSource(events, T0 + 100), trace).run(seen.append)
+    assert seen == events
+
+    replayed = []
+    source = TraceReplaySource(trace, speed=0)
+    source.run(replayed.append)
+    assert replayed == events
+    # The stop marker carries the recording's end time
+    assert source.now() == T0 + 100
+
+
+def test_synthetic_trace_replays_to_its_length(tmp_path):
+    trace = str(tmp_path / "synthetic.jsonl")
+    count = generate_synthetic_trace(trace, hours=1, seed=3)
+
+    result = replay_trace(trace, speed=0)
+    assert result['events'] <= count
+    assert result['tracked_seconds'] == pytest.approx(3600, abs=1)
+
+
+def test_polling_backs_off_while_focus_is_stable():
+    windows = iter([("A", "a.exe", 1)] * 5 + [("B", "b.exe", 2)] + [("B", "b.exe", 2)] * 2)
+    source = PollingWindowSource(lambda: next(windows), interval=1, max_interval=3, backoff=2)
+    waits = []
+
+    def wait(seconds):
+        waits.append(seconds)
+        if len(waits) == 8:
+            source.stop_event.set()
+    source.stop_event.wait = wait
+
+    emitted = []
+    source.run(emitted.append)
+    assert [event['window_title'] for event in emitted] == ["A", "B"]
+    assert waits == [1, 2, 3, 3, 3, 1, 2, 3]
+    assert source.get_stats()['wakeups'] == 8
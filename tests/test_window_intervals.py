@@ -0,0 +1,101 @@
+import random
+from datetime import datetime
+
+import pytest
+
+from moduller.window_intervals import WindowIntervalStore, WINDOW_TITLES_PER_PROGRAM
+from moduller.active_window_tracker import ActiveWindowTracker
+
+T0 = datetime(2026, 1, 5, 9, 0).timestamp()
+
+
+def _log(store, process_name, title, start, end, browser_info=None):
+    key_id = store.intern(f"{process_name}|{title}", process_name, title, 1, browser_info)
+    store.append(key_id, T0 + start, T0 + end)
+    return key_id
+
+
+def test_refocused_window_is_merged_into_one_key():
+    store = WindowIntervalStore()
+    editor = _log(store, "code.exe", "main.py", 0, 60)
+    _log(store, "chrome.exe", "Docs", 60, 90)
+    assert _log(store, "code.exe", "main.py", 90, 120) == editor
+
+    assert len(store.windows) == 2
+    assert len(store) == 3
+    assert store.totals[editor] == pytest.approx(90)
+    assert store.counts[editor] == 2
+    assert store.intervals_by_key() == [[0, 2], [1]]
+
+    session = store.session(2)
+    assert session['duration'] == pytest.approx(30)
+    assert session['start_time'] == "2026-01-05T09:01:30"
+
+
+def test_program_aggregates_and_domain_totals():
+    store = WindowIntervalStore()
+    github = {'is_browser': True, 'domain': "github.com"}
+    _log(store, "chrome.exe", "PR", 0, 100, github)
+    _log(store, "chrome.exe", "Mail", 100, 130, {'is_browser': True, 'domain': "mail.com"})
+    _log(store, "chrome.exe", "PR", 130, 170, github)
+    _log(store, "code.exe", "main.py", 170, 200)
+
+    chrome = store.programs["chrome.exe"]
+    assert chrome['total_time'] == pytest.approx(170)
+    assert chrome['session_count'] == 3
+    assert list(chrome['window_titles']) == ["PR", "Mail"]
+    assert chrome['browser_info']['domain'] == "github.com"
+    assert [item for item, _, _ in chrome['top_domains'].top()] == ["github.com", "mail.com"]
+
+    assert store.totals_by_process() == pytest.approx({"chrome.exe": 170, "code.exe": 30})
+    assert store.totals_by_domain() == pytest.approx({"github.com": 140, "mail.com": 30})
+
+
+def test_zero_length_interval_adds_no_title():
+    store = WindowIntervalStore()
+    _log(store, "code.exe", "flash", 10, 10)
+    assert store.programs["code.exe"]['window_titles'] == {}
+    assert list(store.focused_windows()) == []
+
+
+def test_titles_per_program_are_bounded():
+    store = WindowIntervalStore()
+    for i in range(WINDOW_TITLES_PER_PROGRAM + 25):
+        _log(store, "chrome.exe", f"Tab {i}", i, i + 1)
+
+    titles = list(store.programs["chrome.exe"]['window_titles'])
+    assert titles == [f"Tab {i}" for i in range(WINDOW_TITLES_PER_PROGRAM)]
+    assert len(store.windows) == WINDOW_TITLES_PER_PROGRAM + 25
+
+
+def test_clear_empties_every_column():
+    store = WindowIntervalStore()
+    _log(store, "code.exe", "main.py", 0, 5)
+    store.clear()
+    assert (len(store), store.windows, store.programs, store.memory_bytes()) == (0, [], {}, 0)
+
+
+def test_session_summary_matches_a_walk_over_every_interval():
+    rng = random.Random(5)
+    tracker = ActiveWindowTracker(verbose=False)
+    store = tracker.intervals
+    windows = [(f"program_{i % 7}.exe", f"Window {i}") for i in range(40)]
+    expected = {}
+    clock = 0.0
+    for _ in range(2000):
+        process_name, title = rng.choice(windows)
+        duration = rng.expovariate(1 / 5.0)
+        _log(store, process_name, title, clock, clock + duration)
+        total, count = expected.get(process_name, (0.0, 0))
+        expected[process_name] = (total + duration, count + 1)
+        clock += duration
+
+    summary = tracker.get_session_summary()
+    applications = {app['process_name']: app for app in summary['applications']}
+    assert set(applications) == set(expected)
+    for process_name, (total, count) in expected.items():
+        assert applications[process_name]['total_time_seconds'] == pytest.approx(total, abs=0.01)
+        assert applications[process_name]['session_count'] == count
+    totals = [app['total_time_seconds'] for app in summary['applications']]
+    assert totals == sorted(totals, reverse=True)
+    assert summary['total_session_time'] == pytest.approx(clock, abs=0.05)